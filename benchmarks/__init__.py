@@ -0,0 +1 @@
+"""Synthetic pocket plate benchmarks for the dogbone pipeline - runs on the headless adsk stand-in, see __main__"""
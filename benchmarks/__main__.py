@@ -0,0 +1,137 @@
+"""
+Dogbone pipeline benchmarks - run from the add-in folder:
+
+    python -m benchmarks                              all generators, 10 to 10,000 edges
+    python -m benchmarks -g pockets stepped -s 10 100 1000
+    python -m benchmarks --api                        adds API calls per edge (timings include counting overhead)
+    python -m benchmarks --csv results.csv
+    python -m benchmarks -m "Single body" "Separate bodies" Auto    compares tool body modes on the same parts
+    python -m benchmarks -b Cylinders "Planar extrusion" "Hole features"    compares tool generation backends
+    python -m benchmarks -o "Group per component" Consolidated    compares timeline output modes
+    python -m benchmarks -d off on                    compares immediate and deferred design compute
+
+Each phase gets its time, time per edge and a scaling exponent against the previous size -
+~1 is linear, ~2 is quadratic. booleanWork is the face count the union booleans have to walk,
+cutWork the face count of the combine cuts (target plus all tool bodies), timeline the timeline objects
+the create command added, recomputes the design recomputes of create and refresh together.
+"""
+import argparse
+import csv
+import itertools
+import math
+import sys
+from typing import List
+
+from .generators import GENERATORS
+from .pipeline import PHASES, Result, constants, runCase
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+TOOL_BODY_MODES = [constants.AUTO_TOOL_BODIES, constants.SINGLE_TOOL_BODY, constants.SEPARATE_TOOL_BODIES]
+TIMELINE_OUTPUTS = [constants.PER_COMPONENT_OUTPUT, constants.CONSOLIDATED_OUTPUT]
+DEFER_MODES = {"off": False, "on": True}
+TOOL_BACKENDS = [constants.AUTO_BACKEND, constants.CYLINDER_BACKEND, constants.EXTRUSION_BACKEND, constants.HOLE_BACKEND]
+
+
+def exponent(previous: Result, current: Result, phase: str) -> str:
+    """local scaling exponent - slope of log(time) against log(edges)"""
+    if not previous or previous.edges == current.edges:
+        return ""
+    before, after = previous.timings[phase], current.timings[phase]
+    if before <= 0 or after <= 0:
+        return ""
+    return f"{math.log(after / before) / math.log(current.edges / previous.edges):.2f}"
+
+
+def printTable(results: List[Result], countApiCalls: bool):
+    print(f"\n{results[0].case}")
+    columns = f"{'ms':>9} {'us/edge':>9} {'exp':>5}" + (f" {'calls/e':>8}" if countApiCalls else "")
+    header = f"{'edges':>7}"
+    for phase in PHASES:
+        header += f" | {phase:^{len(columns)}}"
+    print(header + f" | {'booleanWork':>12} {'cutWork':>9} {'timeline':>8} {'recomputes':>10}")
+    print(f"{'':>7}" + f" | {columns}" * len(PHASES))
+
+    previous = None
+    for result in results:
+        line = f"{result.edges:>7}"
+        for phase in PHASES:
+            seconds = result.timings[phase]
+            perEdge = seconds * 1e6 / max(result.edges, 1)
+            line += f" | {seconds * 1e3:>9.1f} {perEdge:>9.1f} {exponent(previous, result, phase):>5}"
+            if countApiCalls:
+                line += f" {result.apiCalls[phase] / max(result.edges, 1):>8.1f}"
+        work = sum(stats.get("booleanWork", 0) for stats in result.stats.values())
+        cutWork = sum(stats.get("cutWork", 0) for stats in result.stats.values())
+        print(line + f" | {work:>12} {cutWork:>9} {result.timelineObjects:>8} {result.recomputes:>10}")
+        for error in result.errors[:3]:
+            print(f"    error: {error.splitlines()[0]}")
+        previous = result
+
+
+def writeCsv(path: str, results: List[Result]):
+    with open(path, "w", newline="", encoding="UTF-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["case", "edges", "phase", "seconds", "apiCalls", "booleans", "booleanWork", "cuts", "cutWork", "timeline", "recomputes"])
+        for result in results:
+            for phase in PHASES:
+                stats = result.stats.get(phase, {})
+                writer.writerow([
+                    result.case,
+                    result.edges,
+                    phase,
+                    f"{result.timings[phase]:.6f}",
+                    result.apiCalls.get(phase, ""),
+                    stats.get("booleans", 0),
+                    stats.get("booleanWork", 0),
+                    stats.get("cuts", 0),
+                    stats.get("cutWork", 0),
+                    result.timelineObjects,
+                    result.recomputes,
+                ])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument("-g", "--generators", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("-s", "--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="target edge counts")
+    parser.add_argument("-m", "--modes", nargs="+", choices=TOOL_BODY_MODES, default=[constants.AUTO_TOOL_BODIES],
+                        help="tool body modes - each one is run on the same parts")
+    parser.add_argument("-b", "--backends", nargs="+", choices=TOOL_BACKENDS, default=[constants.AUTO_BACKEND],
+                        help="tool generation backends - each one is run on the same parts")
+    parser.add_argument("-o", "--outputs", nargs="+", choices=TIMELINE_OUTPUTS, default=[constants.PER_COMPONENT_OUTPUT],
+                        help="timeline output modes - each one is run on the same parts")
+    parser.add_argument("-d", "--defer", nargs="+", choices=list(DEFER_MODES), default=["off"],
+                        help="deferred design compute - each setting is run on the same parts")
+    parser.add_argument("--api", action="store_true", help="count Fusion API calls per edge and phase")
+    parser.add_argument("--csv", help="also write results to this csv file")
+    args = parser.parse_args(argv)
+
+    allResults = []
+    for name in args.generators:
+        for mode, backend, output, defer in itertools.product(args.modes, args.backends, args.outputs, args.defer):
+            results = []
+            for size in args.sizes:
+                case = GENERATORS[name](size)
+                case.params["toolBodyMode"] = mode
+                case.params["toolBackend"] = backend
+                case.params["timelineOutput"] = output
+                case.params["deferCompute"] = DEFER_MODES[defer]
+                if len(args.modes) > 1:
+                    case.name = f"{case.name} - {mode}"
+                if len(args.backends) > 1:
+                    case.name = f"{case.name} - {backend}"
+                if len(args.outputs) > 1:
+                    case.name = f"{case.name} - {output}"
+                if len(args.defer) > 1:
+                    case.name = f"{case.name} - deferred compute {defer}"
+                results.append(runCase(case, countApiCalls=args.api))
+            printTable(results, args.api)
+            allResults += results
+
+    if args.csv:
+        writeCsv(args.csv, allResults)
+    return 1 if any(result.errors for result in allResults) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Parameterised test parts - each generator builds a fresh design sized to roughly the requested number of dogbone edges"""
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from headless import brep
+
+import adsk.core
+import adsk.fusion
+
+THICKNESS = 1.8
+DEPTH = 1.0
+STEP_DEPTH = 1.4
+POCKET_WIDTH = 2.0
+POCKET_LENGTH = 1.5
+PITCH_X = 3.0
+PITCH_Y = 2.5
+MARGIN = 1.0
+
+
+@dataclass
+class Case:
+    """A built test part - faces are the faces a user would select in the dialog"""
+
+    name: str
+    faces: List[adsk.fusion.BRepFace]
+    params: Dict[str, object] = field(default_factory=dict)  # DbParams overrides
+
+
+def _grid(count: int):
+    """pocket origins on a near square grid, plus the plate outline that holds them"""
+    columns = max(1, math.ceil(math.sqrt(count)))
+    rows = max(1, math.ceil(count / columns))
+    origins = [
+        (MARGIN + (i % columns) * PITCH_X, MARGIN + (i // columns) * PITCH_Y) for i in range(count)
+    ]
+    width = 2 * MARGIN + (columns - 1) * PITCH_X + POCKET_WIDTH
+    length = 2 * MARGIN + (rows - 1) * PITCH_Y + POCKET_LENGTH
+    outline = brep.rectangle(0, 0, width, length)
+    return origins, outline
+
+
+def _topFace(body: adsk.fusion.BRepBody) -> adsk.fusion.BRepFace:
+    return max(
+        (face for face in body.faces if face.evaluator.getNormalAtPoint(face.pointOnFace)[1].z > 0.99),
+        key=lambda face: face.pointOnFace.z,
+    )
+
+
+def _facesAt(body: adsk.fusion.BRepBody, z: float) -> List[adsk.fusion.BRepFace]:
+    return [
+        face
+        for face in body.faces
+        if abs(face.pointOnFace.z - z) < 1e-6 and face.evaluator.getNormalAtPoint(face.pointOnFace)[1].z > 0.99
+    ]
+
+
+def pockets(edges: int) -> Case:
+    """one plate with rectangular pockets - 4 edges per pocket, all from the top face"""
+    design = brep.newDesign()
+    count = max(1, math.ceil(edges / 4))
+    origins, outline = _grid(count)
+    body = brep.addPocketPlate(
+        design.rootComponent,
+        outline,
+        THICKNESS,
+        [brep.Pocket(brep.rectangle(x, y, POCKET_WIDTH, POCKET_LENGTH), DEPTH) for x, y in origins],
+    )
+    return Case("pockets", [_topFace(body)])
+
+
+def stepped(edges: int) -> Case:
+    """rectangular pockets with a smaller pocket in their floor - 8 edges per pocket, top face and step floors selected"""
+    design = brep.newDesign()
+    count = max(1, math.ceil(edges / 8))
+    origins, outline = _grid(count)
+    inset = POCKET_LENGTH / 4
+    body = brep.addPocketPlate(
+        design.rootComponent,
+        outline,
+        THICKNESS,
+        [
+            brep.Pocket(
+                brep.rectangle(x, y, POCKET_WIDTH, POCKET_LENGTH),
+                DEPTH / 2,
+                [
+                    brep.Pocket(
+                        brep.rectangle(x + inset, y + inset, POCKET_WIDTH - 2 * inset, POCKET_LENGTH - 2 * inset),
+                        STEP_DEPTH,
+                    )
+                ],
+            )
+            for x, y in origins
+        ],
+    )
+    return Case("stepped", [_topFace(body)] + _facesAt(body, THICKNESS - DEPTH / 2))
+
+
+def angled(edges: int) -> Case:
+    """parallelogram pockets - 2 acute (60 deg) and 2 obtuse (120 deg) corners each, both detection modes on"""
+    design = brep.newDesign()
+    count = max(1, math.ceil(edges / 4))
+    origins, outline = _grid(count)
+    shear = POCKET_LENGTH / math.tan(math.radians(60))
+    width = POCKET_WIDTH - shear
+    body = brep.addPocketPlate(
+        design.rootComponent,
+        outline,
+        THICKNESS,
+        [
+            brep.Pocket(
+                [(x, y), (x + width, y), (x + width + shear, y + POCKET_LENGTH), (x + shear, y + POCKET_LENGTH)],
+                DEPTH,
+            )
+            for x, y in origins
+        ],
+    )
+    params = dict(acuteAngle=True, obtuseAngle=True, minAngleLimit=50.0, maxAngleLimit=130.0)
+    return Case("angled", [_topFace(body)], params)
+
+
+def multiBody(edges: int, bodies: int = 0) -> Case:
+    """several pocketed plates in one component, placed through an occurrence - one top face selected per body"""
+    design = brep.newDesign()
+    bodies = bodies or max(2, min(20, round(edges / 100)))
+    count = max(1, math.ceil(edges / 4 / bodies))
+    origins, outline = _grid(count)
+    plateWidth = outline[1][0] + MARGIN
+    component = brep.newComponent("plates")
+    for i in range(bodies):
+        brep.addPocketPlate(
+            component,
+            [(x + i * plateWidth, y) for x, y in outline],
+            THICKNESS,
+            [
+                brep.Pocket(brep.rectangle(x + i * plateWidth, y, POCKET_WIDTH, POCKET_LENGTH), DEPTH)
+                for x, y in origins
+            ],
+            name=f"Plate{i}",
+        )
+    occurrence = brep.addOccurrence(component, 0, 0, 10)
+    return Case("multiBody", [_topFace(body) for body in occurrence.bRepBodies])
+
+
+def stacked(edges: int, layers: int = 3) -> Case:
+    """
+    laminated plates stacked in one component, placed through an occurrence - pockets go through the upper layers
+    and stop in the bottom one
+    every layer's top face is selected with "From Top Face", so the dogbones of a corner are coaxial and overlap
+    """
+    design = brep.newDesign()
+    count = max(1, math.ceil(edges / 4 / layers))
+    origins, outline = _grid(count)
+    component = brep.newComponent("laminate")
+    for layer in range(layers):
+        depth = DEPTH if layer == 0 else THICKNESS
+        faces = brep.pocketPlateFaces(
+            outline, THICKNESS, [brep.Pocket(brep.rectangle(x, y, POCKET_WIDTH, POCKET_LENGTH), depth) for x, y in origins]
+        )
+        z = layer * THICKNESS
+        faces = [[[(px, py, pz + z) for px, py, pz in loop] for loop in face] for face in faces]
+        brep.addSolid(component, faces, name=f"Layer{layer}")
+    occurrence = brep.addOccurrence(component)  #bodies are grouped per occurrence - the top layer's top face is the top face for all
+    return Case("stacked", [_topFace(body) for body in reversed(list(occurrence.bRepBodies))], dict(fromTop=True))
+
+
+def instances(edges: int, copies: int = 20) -> Case:
+    """one pocketed shelf component placed through many occurrences - its top face selected in every one"""
+    design = brep.newDesign()
+    count = max(1, math.ceil(edges / 4 / copies))
+    origins, outline = _grid(count)
+    component = brep.newComponent("shelf")
+    brep.addPocketPlate(
+        component,
+        outline,
+        THICKNESS,
+        [brep.Pocket(brep.rectangle(x, y, POCKET_WIDTH, POCKET_LENGTH), DEPTH) for x, y in origins],
+    )
+    occurrences = [brep.addOccurrence(component, 0, 0, i * 2 * THICKNESS) for i in range(copies)]
+    return Case("instances", [_topFace(occurrence.bRepBodies.item(0)) for occurrence in occurrences])
+
+
+def copies(edges: int, count: int = 10) -> Case:
+    """
+    copy pasted parts - the same pocketed plate in distinct components, each drawn at its own place in its component,
+    and placed through its own occurrence
+    """
+    design = brep.newDesign()
+    pocketCount = max(1, math.ceil(edges / 4 / count))
+    origins, outline = _grid(pocketCount)
+    faces = []
+    for i in range(count):
+        dx, dy = i * 7.0, -i * 3.0
+        component = brep.newComponent(f"part{i}")
+        brep.addPocketPlate(
+            component,
+            [(x + dx, y + dy) for x, y in outline],
+            THICKNESS,
+            [brep.Pocket(brep.rectangle(x + dx, y + dy, POCKET_WIDTH, POCKET_LENGTH), DEPTH) for x, y in origins],
+        )
+        occurrence = brep.addOccurrence(component, 0, 0, i * 2 * THICKNESS)
+        faces.append(_topFace(occurrence.bRepBodies.item(0)))
+    return Case("copies", faces)
+
+
+GENERATORS: Dict[str, Callable[[int], Case]] = {
+    "pockets": pockets,
+    "stepped": stepped,
+    "angled": angled,
+    "multiBody": multiBody,
+    "stacked": stacked,
+    "instances": instances,
+    "copies": copies,
+}
@@ -0,0 +1,118 @@
+"""Runs the dogbone pipeline on a generated part, one timed phase at a time"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from typing import Dict, List
+
+from headless import load
+
+import adsk.core
+import adsk.fusion
+
+from .generators import Case
+
+classes = load("lib.classes")
+utils = load("lib.utils")
+constants = load("constants")
+createMain = load("commands.createCommand.main")
+refreshMain = load("commands.refreshCommand.main")
+
+PHASES = ("DbFace", "getToolBody", "createStaticDogbones", "updateDogBones")
+
+
+@dataclass
+class Result:
+    case: str
+    edges: int
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per phase
+    stats: Dict[str, Dict[str, int]] = field(default_factory=dict)  # TemporaryBRepManager work per phase
+    apiCalls: Dict[str, int] = field(default_factory=dict)  # per phase, only when counted
+    errors: List[str] = field(default_factory=list)
+    timelineObjects: int = 0  # added by createStaticDogbones, groups included
+    recomputes: int = 0  # design recomputes during createStaticDogbones and updateDogBones
+
+
+def _params(case: Case) -> "classes.DbParams":
+    """dialog defaults - ignoring any saved defaults.dat - with the case overrides"""
+    params = classes.DbParams()
+    for dataclassField in fields(classes.DbParams):
+        setattr(params, dataclassField.name, dataclassField.default)
+    for name, value in case.params.items():
+        setattr(params, name, value)
+    return params
+
+
+def selectFaces(case: Case, params) -> "classes.Selection":
+    """builds the selection the same way DogboneUi does when the faces are clicked"""
+    selection = classes.Selection()
+    edgeSelect = adsk.core.Command().commandInputs.addSelectionInput(constants.EDGE_SELECT, "Edges", "")
+    for face in case.faces:
+        faceObj = classes.DbFace(face=face, selection=selection, params=params, commandInputsEdgeSelect=edgeSelect)
+        occurrenceId = (
+            hash(face.assemblyContext.entityToken) if face.assemblyContext else hash(face.body.entityToken)
+        )
+        selection.selectedOccurrences.setdefault(occurrenceId, []).append(faceObj)
+        selection.selectedFaces[faceObj.faceId] = faceObj
+        faceObj.selectAll()
+    return selection
+
+
+def makeToolBodies(params, selection) -> int:
+    """tool bodies for every selected component, after the coaxial merge but without the union - returns number of bodies made"""
+    count = 0
+    for occurrenceFaces, _ in selection.componentGroups(params.timelineOutput == constants.CONSOLIDATED_OUTPUT):
+        toolSpecs = classes.occurrenceToolSpecs(occurrenceFaces, classes.groupTopFaces(occurrenceFaces, params.fromTop))
+        backend = classes.chooseBackend(params.toolBackend, toolSpecs, toolBodiesOnly=True)
+        toolBodies, _ = backend.toolBodies(toolSpecs, selection.toolBodyCache)
+        count += len(toolBodies)
+    return count
+
+
+def runCase(case: Case, countApiCalls: bool = False) -> Result:
+    """
+    times each phase on a freshly generated part
+    with countApiCalls the api counter runs throughout - timings then include the counting overhead
+    """
+    app = adsk.core.Application.get()
+    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+    params = _params(case)
+    result = Result(case.name, 0)
+
+    if countApiCalls:
+        utils.apiCounter.start()
+
+    @contextmanager
+    def phase(name: str):
+        stats = dict(tempBrepMgr.stats)
+        calls = utils.apiCounter.total()
+        start = time.perf_counter()
+        yield
+        result.timings[name] = time.perf_counter() - start
+        result.stats[name] = {key: value - stats[key] for key, value in tempBrepMgr.stats.items()}
+        if countApiCalls:
+            result.apiCalls[name] = utils.apiCounter.total() - calls
+
+    try:
+        with phase("DbFace"):
+            selection = selectFaces(case, params)
+        result.edges = sum(len(faceObj.selectedEdges) for faceObj in selection.selectedFaces.values())
+
+        with phase("getToolBody"):
+            makeToolBodies(params, selection)
+
+        design = app.activeProduct
+        timeline = design.timeline
+        before = timeline.count + timeline.timelineGroups.count
+        recomputes = design.recomputeCount
+        with phase("createStaticDogbones"):
+            createMain.createStaticDogbones(params, selection)
+        result.timelineObjects = timeline.count + timeline.timelineGroups.count - before
+
+        with phase("updateDogBones"):
+            refreshMain.updateDogBones(params.deferCompute)
+        result.recomputes = design.recomputeCount - recomputes
+    finally:
+        utils.apiCounter.stop()
+
+    result.errors = list(app.userInterface.messages)
+    return result
@@ -8,12 +8,12 @@ import adsk.core
 import adsk.fusion
 import logging
     
-from ...lib.classes import DbParams, Selection, params
+from ...lib.classes import DbParams, Selection, params, compareBackends
 
 from ...lib.common.log import startLogger, stopLogger
 
 import time
-from ...lib.utils import eventHandler, messageBox
+from ...lib.utils import eventHandler, messageBox, apiCounter
 from .main import createStaticDogbones
 from ... import config
 
@@ -127,9 +127,12 @@ def createDogbones( params: DbParams, selection: Selection):
     ui = app.userInterface
 
 
+    benchmark = params.benchmark and not selection.isPreview  #comparing backends makes and deletes real features - never while previewing
+    backendTimes = compareBackends(params, selection) if benchmark else {}  #before the cut - the selection is of the uncut bodies
+
     start = time.time()
 
-    createStaticDogbones(params, selection)
+    sharedOccurrences = createStaticDogbones(params, selection)
 
     #Remove check after F360 fixes their baseFeature/UI refresh issue  
     if  ui.activeWorkspace.id == "MfgWorkingModelEnv":  
@@ -139,7 +142,16 @@ def createDogbones( params: DbParams, selection: Selection):
         "all dogbones complete\n-------------------------------------------\n"
     )
 
-    if params.benchmark:
+    if benchmark:
         messageBox(
-            f"Benchmark: {time.time() - start:.02f} sec processing {len(selection.edges)} edges"
-        )
\ No newline at end of file
+            f"Benchmark: {time.time() - start:.02f} sec processing {len(selection.edges)} edges\n"
+            f"{sharedOccurrences} occurrences shared the dogbones of another occurrence of their component\n"
+            + "\n".join(f"{name}: {seconds:.02f} sec" for name, seconds in backendTimes.items())
+        )
+
+    if params.apiCount and apiCounter.isActive:
+        # counts cover everything since the last report - including face selection work
+        edgeCount = sum(len(faceObj.selectedEdges) for faceObj in selection.selectedFaces.values())
+        logger.info(f"API calls\n{apiCounter.report(edgeCount)}")
+        messageBox(apiCounter.summary(edgeCount))
+        apiCounter.reset()
\ No newline at end of file
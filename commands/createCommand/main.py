@@ -1,89 +1,113 @@
 import json
+from contextlib import nullcontext
 
 import adsk.core
 import adsk.fusion
 
-from ...lib.utils import debugFace, getTopFace 
-from ...lib.classes import DbParams, Selection, groupContext 
+from ...lib.utils import debugFace, messageBox, apiPhase
+from ...lib.classes import DbParams, Selection, groupContext, deferredCompute, featureErrors, chooseBackend, mergeCoaxial, mergedToolBodies, startFaces, groupTopFaces
 
 from ...lib.common.log import logging
 # from ...lib.utils import makeNative, reValidateFace
-from ...constants import DB_GROUP, DB_NAME
+from ...constants import DB_GROUP, DB_NAME, CONSOLIDATED_OUTPUT
 
 logger = logging.getLogger('dogbone.createCommand.main')
 
-def createStaticDogbones(param: DbParams, selection: Selection):
+@apiPhase("createStaticDogbones")
+def createStaticDogbones(param: DbParams, selection: Selection) -> int:
 
     logger.info("Creating static dogbones")
 
-    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
-
-    for occurrenceFaces in selection.selectedOccurrences.values():
-        with groupContext():
-            topFace = None
-            toolBodies = None
-
-            if param.fromTop:
-                topFace, topFaceRefPoint = getTopFace(occurrenceFaces[0].native)
-                logger.debug(f"topFace ref point: {topFaceRefPoint.asArray()}")
-                logger.info(f"Processing holes from top face - {topFace.tempId}")
-                debugFace(topFace)
-
-            for occurrenceFace in occurrenceFaces:
-                component = occurrenceFace.component
-                occurrenceFace.save()
-                toolCollection = adsk.core.ObjectCollection.create()
-
-                for edgeObj in occurrenceFace.selectedEdges:
-                    edgeObj.save()
-                    if not toolBodies:
-                        toolBodies = edgeObj.getToolBody(
-                            topFace=topFace
-                        )
-                    else:
-                        tempBrepMgr.booleanOperation(
-                            toolBodies,
-                            edgeObj.getToolBody(
-                                topFace=topFace),
-                            adsk.fusion.BooleanTypes.UnionBooleanType,
-                        )
-
-            targetBody: adsk.fusion.BRepBody = occurrenceFace.body
-            baseFeatures: adsk.fusion.BaseFeature = component.features.baseFeatures
-            baseFeature = baseFeatures.add()
-            baseFeature.name = DB_NAME
-
-            baseFeature.startEdit()
-            
-            dbB = component.bRepBodies.add(toolBodies, baseFeature)
-            dbB.name = "dogboneTool"
-
-            baseFeature.finishEdit()
-
-            #multiple bodies in the same occurrrence should normally be an outside use case, but I've added the slightly more compilicated handling just in case
-
-            faces = [f.faceId for f in occurrenceFaces]
-
-            bodies = {face.body.name:face.body for face in occurrenceFaces} #This is just a quickish way of creating of unique set of bodies - body names within the same component are unique!
-
-            for val, targetBody in enumerate(bodies.values()):
-                baseFeature.attributes.add(groupName=DB_GROUP,
-                                    name="basefeature:",
-                                    value=json.dumps(faces))
-
-                [toolCollection.add(body) for body in baseFeature.bodies]  #add baseFeature bodies into toolCollection
-
-                combineFeatureInput = component.features.combineFeatures.createInput(
-                    targetBody=targetBody,
-                    toolBodies=toolCollection
-                )
-
-                combineFeatureInput.isKeepToolBodies = val != len(bodies)-1  #This is a bit of a work around - you want to keep tool bodies = True until the last body is processed.
-                combineFeatureInput.isNewComponent = False
-                combineFeatureInput.operation = (
-                    adsk.fusion.FeatureOperations.CutFeatureOperation
-                )
-                combine:adsk.fusion.CombineFeature = component.features.combineFeatures.add(combineFeatureInput)
-
-            logger.debug(f"combine: {combine.name}")
-
+    consolidated = param.timelineOutput == CONSOLIDATED_OUTPUT
+    sharedOccurrences = 0
+    created = []  #(owner, features) - failures found after the compute are reported against the component they belong to
+    with deferredCompute(param.deferCompute), groupContext() if consolidated else nullcontext():  #consolidated - one timeline group for the whole run
+        for occurrenceFaces, occurrenceCount in selection.componentGroups(consolidated):  #one cut per native component, however many occurrences
+            sharedOccurrences += occurrenceCount - 1
+            owner = ownerName(occurrenceFaces)
+            if occurrenceCount > 1:
+                logger.info(f"{owner}: dogbones made once for {occurrenceCount} occurrences")
+            with nullcontext() if consolidated else groupContext():
+                try:
+                    created.append((owner, createComponentDogbones(param, selection, occurrenceFaces)))
+                except Exception:
+                    logger.exception(f"{owner}: dogbones failed")
+                    raise
+
+    failures = [f"{owner} - {error}" for owner, features in created for error in featureErrors(features)]
+    if failures:
+        logger.error("dogbone features failed to compute:\n" + "\n".join(failures))
+        messageBox("Some dogbones failed to compute:\n" + "\n".join(failures))
+
+    return sharedOccurrences  #occurrences that got their dogbones from another occurrence of the same component
+
+
+def ownerName(occurrenceFaces: list) -> str:
+    """component name of a component group - with the body names when the bodies are outside components"""
+    component = occurrenceFaces[0].component
+    if component != component.parentDesign.rootComponent:
+        return component.name
+    return f"{component.name} ({', '.join(sorted({face.body.name for face in occurrenceFaces}))})"
+
+
+def createComponentDogbones(param: DbParams, selection: Selection, occurrenceFaces: list) -> list:
+    """dogbones of one component group - one base feature, and a combine per target body - returns the features made"""
+    topFaces = groupTopFaces(occurrenceFaces, param.fromTop)
+    [debugFace(topFace) for topFace in topFaces.values()]
+    toolSpecs = []
+    component = occurrenceFaces[0].component
+
+    for occurrenceFace in occurrenceFaces:
+        occurrenceFace.saveOccurrences()
+
+        for edgeObj in occurrenceFace.mergedSelectedEdges:  #selected in any occurrence of the component
+            toolSpecs.append(selection.toolSpec(edgeObj, topFaces.get(occurrenceFace.componentId)))
+
+    toolSpecs = mergeCoaxial(toolSpecs)  #coaxial dogbones merged, duplicate edges dropped
+    backend = chooseBackend(param.toolBackend, toolSpecs, startFaces(occurrenceFaces, topFaces))
+
+    #multiple bodies in the same occurrrence should normally be an outside use case, but I've added the slightly more compilicated handling just in case
+    bodies = {face.body.name:face.body for face in occurrenceFaces} #This is just a quickish way of creating of unique set of bodies - body names within the same component are unique!
+
+    if not backend.makesToolBodies:
+        return backend.cut(toolSpecs, startFaces(occurrenceFaces, topFaces), component, list(bodies.values()))
+
+    toolBodies = mergedToolBodies(backend, toolSpecs, occurrenceFaces, param, selection.toolBodyCache, selection.instances)
+
+    baseFeatures: adsk.fusion.BaseFeature = component.features.baseFeatures
+    baseFeature = baseFeatures.add()
+    baseFeature.name = DB_NAME
+
+    baseFeature.startEdit()
+    
+    for toolBody in toolBodies:
+        dbB = component.bRepBodies.add(toolBody, baseFeature)
+        dbB.name = "dogboneTool"
+
+    baseFeature.finishEdit()
+
+    faces = [f.faceId for f in occurrenceFaces]
+    baseFeature.attributes.add(groupName=DB_GROUP,
+                        name="basefeature:",
+                        value=json.dumps(faces))
+
+    toolCollection = adsk.core.ObjectCollection.create()
+    [toolCollection.add(body) for body in baseFeature.bodies]  #add baseFeature bodies into toolCollection - once, not per target body
+
+    features = [baseFeature]
+    for val, targetBody in enumerate(bodies.values()):
+        combineFeatureInput = component.features.combineFeatures.createInput(
+            targetBody=targetBody,
+            toolBodies=toolCollection
+        )
+
+        combineFeatureInput.isKeepToolBodies = val != len(bodies)-1  #This is a bit of a work around - you want to keep tool bodies = True until the last body is processed.
+        combineFeatureInput.isNewComponent = False
+        combineFeatureInput.operation = (
+            adsk.fusion.FeatureOperations.CutFeatureOperation
+        )
+        combine:adsk.fusion.CombineFeature = component.features.combineFeatures.add(combineFeatureInput)
+        features.append(combine)
+
+    logger.debug(f"combine: {combine.name}")
+    return features
@@ -1,83 +1,109 @@
 """Main calling function for creating static dogbones"""
 import json
+from contextlib import nullcontext
 
 import adsk.core
 import adsk.fusion
 
-from ...lib.utils import debugFace, getTopFace 
-from ...lib.classes import DbParams, Selection, groupContext 
+from ...lib.utils import debugFace, messageBox
+from ...lib.classes import DbParams, Selection, groupContext, deferredCompute, featureErrors, chooseBackend, mergeCoaxial, mergedToolBodies, startFaces, groupTopFaces
 
 from ...lib.common.log import logging
-from ...constants import DB_GROUP, DB_NAME
+from ...constants import DB_GROUP, DB_NAME, CONSOLIDATED_OUTPUT
 logger = logging.getLogger('dogbone.createMfgCommand.main')
 
-def createStaticDogbones(param: DbParams, selection: Selection):
+def createStaticDogbones(param: DbParams, selection: Selection) -> int:
 
     logger.info("Creating static dogbones")
 
-    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
-
-    for occurrenceFaces in selection.selectedOccurrences.values():
-        with groupContext():
-            topFace = None
-            toolBodies = None
-
-            if param.fromTop:
-                topFace, topFaceRefPoint = getTopFace(occurrenceFaces[0].native)
-                logger.debug(f"topFace ref point: {topFaceRefPoint.asArray()}")
-                logger.info(f"Processing holes from top face - {topFace.tempId}")
-                debugFace(topFace)
-
-            for selectedFace in occurrenceFaces:
-                component = selectedFace.component
-                selectedFace.save()
-                toolCollection = adsk.core.ObjectCollection.create()
-
-                for edgeObj in selectedFace.selectedEdges:
-                    edgeObj.save()
-                    if not toolBodies:
-                        toolBodies = edgeObj.getToolBody(
-                            topFace=topFace
-                        )
-                    else:
-                        tempBrepMgr.booleanOperation(
-                            toolBodies,
-                            edgeObj.getToolBody(
-                                topFace=topFace),
-                            adsk.fusion.BooleanTypes.UnionBooleanType,
-                        )
-
-            targetBody: adsk.fusion.BRepBody = selectedFace.body
-            baseFeatures: adsk.fusion.BaseFeature = component.features.baseFeatures
-            baseFeature = baseFeatures.add()
-            baseFeature.name = DB_NAME
-
-            baseFeature.startEdit()
-            
-            dbB = component.bRepBodies.add(toolBodies, baseFeature)
-            dbB.name = "dogboneTool"
-
-            baseFeature.finishEdit()
-
-            faces = [f.faceId for f in occurrenceFaces]
-
-            baseFeature.attributes.add(groupName=DB_GROUP,
-                                name="basefeature:",
-                                value=json.dumps(faces))
-
-            [toolCollection.add(body) for body in baseFeature.bodies]  #add baseFeature bodies into toolCollection
-
-            combineFeatureInput = component.features.combineFeatures.createInput(
-                targetBody=targetBody,
-                toolBodies=toolCollection
-            )
-
-            combineFeatureInput.isKeepToolBodies = False
-            combineFeatureInput.isNewComponent = False
-            combineFeatureInput.operation = (
-                adsk.fusion.FeatureOperations.CutFeatureOperation
-            )
-            combine:adsk.fusion.CombineFeature = component.features.combineFeatures.add(combineFeatureInput)
-
-            logger.debug(f"combine: {combine.name}")
-
+    consolidated = param.timelineOutput == CONSOLIDATED_OUTPUT
+    sharedOccurrences = 0
+    created = []  #(owner, features) - failures found after the compute are reported against the component they belong to
+    with deferredCompute(param.deferCompute), groupContext() if consolidated else nullcontext():  #consolidated - one timeline group for the whole run
+        for occurrenceFaces, occurrenceCount in selection.componentGroups(consolidated):  #one cut per native component, however many occurrences
+            sharedOccurrences += occurrenceCount - 1
+            owner = ownerName(occurrenceFaces)
+            if occurrenceCount > 1:
+                logger.info(f"{owner}: dogbones made once for {occurrenceCount} occurrences")
+            with nullcontext() if consolidated else groupContext():
+                try:
+                    created.append((owner, createComponentDogbones(param, selection, occurrenceFaces)))
+                except Exception:
+                    logger.exception(f"{owner}: dogbones failed")
+                    raise
+
+    failures = [f"{owner} - {error}" for owner, features in created for error in featureErrors(features)]
+    if failures:
+        logger.error("dogbone features failed to compute:\n" + "\n".join(failures))
+        messageBox("Some dogbones failed to compute:\n" + "\n".join(failures))
+
+    return sharedOccurrences  #occurrences that got their dogbones from another occurrence of the same component
+
+
+def ownerName(occurrenceFaces: list) -> str:
+    """component name of a component group - with the body names when the bodies are outside components"""
+    component = occurrenceFaces[0].component
+    if component != component.parentDesign.rootComponent:
+        return component.name
+    return f"{component.name} ({', '.join(sorted({face.body.name for face in occurrenceFaces}))})"
+
+
+def createComponentDogbones(param: DbParams, selection: Selection, occurrenceFaces: list) -> list:
+    """dogbones of one component group - one base feature, and a combine per target body - returns the features made"""
+    topFaces = groupTopFaces(occurrenceFaces, param.fromTop)
+    [debugFace(topFace) for topFace in topFaces.values()]
+    toolSpecs = []
+    component = occurrenceFaces[0].component
+
+    for selectedFace in occurrenceFaces:
+        selectedFace.saveOccurrences()
+
+        for edgeObj in selectedFace.mergedSelectedEdges:  #selected in any occurrence of the component
+            toolSpecs.append(selection.toolSpec(edgeObj, topFaces.get(selectedFace.componentId)))
+
+    toolSpecs = mergeCoaxial(toolSpecs)  #coaxial dogbones merged, duplicate edges dropped
+    backend = chooseBackend(param.toolBackend, toolSpecs, startFaces(occurrenceFaces, topFaces))
+    bodies = {face.body.name: face.body for face in occurrenceFaces}  #a consolidated component can hold several target bodies
+    if not backend.makesToolBodies:
+        return backend.cut(toolSpecs, startFaces(occurrenceFaces, topFaces), component, list(bodies.values()))
+
+    toolBodies = mergedToolBodies(backend, toolSpecs, occurrenceFaces, param, selection.toolBodyCache, selection.instances)
+
+    baseFeatures: adsk.fusion.BaseFeature = component.features.baseFeatures
+    baseFeature = baseFeatures.add()
+    baseFeature.name = DB_NAME
+
+    baseFeature.startEdit()
+    
+    for toolBody in toolBodies:
+        dbB = component.bRepBodies.add(toolBody, baseFeature)
+        dbB.name = "dogboneTool"
+
+    baseFeature.finishEdit()
+
+    faces = [f.faceId for f in occurrenceFaces]
+
+    baseFeature.attributes.add(groupName=DB_GROUP,
+                        name="basefeature:",
+                        value=json.dumps(faces))
+
+    toolCollection = adsk.core.ObjectCollection.create()
+    [toolCollection.add(body) for body in baseFeature.bodies]  #add baseFeature bodies into toolCollection
+
+    features = [baseFeature]
+    for val, targetBody in enumerate(bodies.values()):
+        combineFeatureInput = component.features.combineFeatures.createInput(
+            targetBody=targetBody,
+            toolBodies=toolCollection
+        )
+
+        combineFeatureInput.isKeepToolBodies = val != len(bodies)-1  #keep the tool bodies until the last target body
+        combineFeatureInput.isNewComponent = False
+        combineFeatureInput.operation = (
+            adsk.fusion.FeatureOperations.CutFeatureOperation
+        )
+        combine:adsk.fusion.CombineFeature = component.features.combineFeatures.add(combineFeatureInput)
+        features.append(combine)
+
+    logger.debug(f"combine: {combine.name}")
+    return features
@@ -90,4 +90,4 @@ def stop():
 
 @eventHandler(handler_cls=adsk.core.CommandCreatedEventHandler)
 def onUpdate( args: adsk.core.CommandCreatedEventArgs):
-    updateDogBones()
\ No newline at end of file
+    updateDogBones(params.deferCompute)
\ No newline at end of file
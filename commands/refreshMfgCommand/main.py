@@ -3,51 +3,61 @@ import json
 import adsk.core
 import adsk.fusion
 
-from ...lib.classes import DbFace, baseFeatureContext 
+from ...lib.classes import DbFace, Selection, baseFeatureContext, deferredCompute, featureErrors, chooseBackend, mergeCoaxial 
+from ...lib.utils import mergeToolBodies, messageBox
 
-from ...lib.utils import getTopFace
-from ...constants import DB_GROUP
+from ...lib.common.log import logging
+from ...constants import DB_GROUP, AUTO_BACKEND
 
+logger = logging.getLogger('dogbone.refreshMfgCommand.main')
 
-def updateDogBones():
+
+def updateDogBones(deferCompute: bool = False):
     """
     Recalculates and updates existing dogbones
+    deferCompute suspends design recompute until every base feature is updated
     
     """
     app = adsk.core.Application.get()
     design: adsk.fusion.Design = app.activeProduct 
     baseFeaturesAttrs: adsk.core.Attributes = design.findAttributes(DB_GROUP, "re:basefeature:.*")
 
-    for bfAttr in baseFeaturesAttrs:
-
-        baseFeature: adsk.fusion.BaseFeature = bfAttr.parent
-        faces = json.loads(bfAttr.value)
-        faceList = '|'.join(map(str, faces))
-        regex = "re:face:("+faceList+")"
-        faceAttrs = g._design.findAttributes(DB_GROUP, regex)
-
-        tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
-        toolBodies = None
-        
-        with baseFeatureContext(baseFeature= baseFeature):
-            for faceAtt in faceAttrs:
-                if not faceAtt.parent:
-                    continue
-                selectedFace: DbFace = DbFace(face=faceAtt.parent,
-                            restoreState=True)
-                topFace, _ = getTopFace(selectedFace=selectedFace.face)
-                topFace = topFace.nativeObject if topFace.nativeObject else topFace
-                for edge in selectedFace.selectedEdges:
-                    if not toolBodies:
-                        toolBodies = edge.getToolBody(
-                            topFace=topFace
-                        )
-                    else:
-                        tempBrepMgr.booleanOperation(
-                            toolBodies,
-                            edge.getToolBody(topFace=topFace),
-                            adsk.fusion.BooleanTypes.UnionBooleanType,
-                        )
+    updated = []
+    with deferredCompute(deferCompute):
+        for bfAttr in baseFeaturesAttrs:
+
+            baseFeature: adsk.fusion.BaseFeature = bfAttr.parent
+            updated.append(baseFeature)
+            faces = json.loads(bfAttr.value)
+            faceList = '|'.join(map(str, faces))
+            regex = "re:face:("+faceList+")"
+            faceAttrs = g._design.findAttributes(DB_GROUP, regex)
+
+            toolSpecs = []
+
+            with baseFeatureContext(baseFeature= baseFeature):
+                selection = Selection()  #fresh topology cache - bodies differ at each timeline position
+                for faceAtt in faceAttrs:
+                    if not faceAtt.parent:
+                        continue
+                    selectedFace: DbFace = DbFace(face=faceAtt.parent,
+                                selection=selection,
+                                restoreState=True)
+                    topFace = selectedFace.topFace  #cached per body and direction in the selection's topology snapshot
+                    for edge in selectedFace.selectedEdges:
+                        toolSpecs.append(edge.toolSpec(topFace=topFace))
+
+                toolSpecs = mergeCoaxial(toolSpecs)
+                backend = chooseBackend(AUTO_BACKEND, toolSpecs, toolBodiesOnly=True)  #base feature bodies are updated - tool bodies only
+                toolBodies, centres = backend.toolBodies(toolSpecs, selection.toolBodyCache)
+                sourceBodies = list(baseFeature.sourceBodies)
+                toolBodies = mergeToolBodies(toolBodies, centres, len(sourceBodies))  #same number of tool bodies as the base feature was created with
                 if toolBodies:
-                    [baseFeature.updateBody(body, toolBodies) for body in baseFeature.sourceBodies]
-
+                    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+                    toolBodies += [tempBrepMgr.copy(toolBodies[0]) for _ in range(len(sourceBodies) - len(toolBodies))]  #fewer edges than before - spare bodies repeat a cut
+                    [baseFeature.updateBody(body, toolBody) for body, toolBody in zip(sourceBodies, toolBodies)]
+
+    failures = [f"{feature.parentComponent.name} - {error}" for feature in updated for error in featureErrors([feature])]
+    if failures:
+        logger.error("dogbone features failed to compute:\n" + "\n".join(failures))
+        messageBox("Some dogbones failed to compute:\n" + "\n".join(failures))
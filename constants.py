@@ -6,6 +6,7 @@ UPD_COMMAND_ID = "dogboneUpdateBtn"
 
 ACUTE_ANGLE = "acuteAngle"
 ANGLE_DETECTION_GROUP = "angleDetectionGroup"
+API_COUNT = "apiCount"
 BENCHMARK = "benchmark"
 DEPTH_EXTENT = "depthExtent"
 DOGBONE_TYPE = "dogboneType"
@@ -28,10 +29,29 @@ ON_LONG_SIDE = "On Long Side"
 ON_SHORT_SIDE = "On Short Side"
 PARAMETRIC = "Parametric"
 PREVIEW_ENABLE = "PreviewEnable"
+PREVIEW_BUDGET = "previewBudget"
+PREVIEW_EVENT = "dogbonePreviewBatch"  # custom event that draws the next batch of a progressive preview
 SETTINGS_GROUP = "settingsGroup"
 STATIC = "Static"
 TOOL_DIAMETER = "toolDia"
 TOOL_DIAMETER_OFFSET = "toolDiaOffset"
+TOOL_BODY_MODE = "toolBodyMode"
+
+AUTO_TOOL_BODIES = "Auto"
+SINGLE_TOOL_BODY = "Single body"
+SEPARATE_TOOL_BODIES = "Separate bodies"
+
+TOOL_BACKEND = "toolBackend"
+AUTO_BACKEND = "Auto"
+CYLINDER_BACKEND = "Cylinders"
+EXTRUSION_BACKEND = "Planar extrusion"
+HOLE_BACKEND = "Hole features"
+
+TIMELINE_OUTPUT = "timelineOutput"
+PER_COMPONENT_OUTPUT = "Group per component"
+CONSOLIDATED_OUTPUT = "Consolidated"
+
+DEFER_COMPUTE = "deferCompute"
 
 EDGE_TOOLTIP = "click to SELECT OR de-SELECT an internal edge"
 FACE_TOOLTIP = "click a face to select"
@@ -0,0 +1,49 @@
+"""Runs Dogbone outside Fusion 360
+
+Puts a stand-in adsk package (headless/adsk) on sys.path, backed by an in-memory B-rep of planar faced solids,
+so DbFace, DbEdge, getTopFace, createStaticDogbones etc. run unchanged on any python 3.9+ box.
+Only meant for measuring and regression testing the add-in - Fusion itself never imports this package.
+
+    from headless import load, brep
+    classes = load("lib.classes")
+    design = brep.newDesign()
+    plate = brep.addPocketPlate(design.rootComponent, brep.rectangle(0, 0, 30, 20), 1.8,
+                                [brep.Pocket(brep.rectangle(5, 5, 4, 3), 1.0)])
+"""
+import importlib
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+_headlessPath = os.path.dirname(os.path.abspath(__file__))
+_addinPath = os.path.dirname(_headlessPath)
+
+ADDIN_PACKAGE = "Dogbone"
+
+if _headlessPath not in sys.path:
+    sys.path.insert(0, _headlessPath)  # stand-in adsk has to be the top level adsk package
+
+_packagesPath = os.path.join(_addinPath, "py_packages")
+if _packagesPath not in sys.path:
+    sys.path.insert(0, _packagesPath)  # same as Dogbone.py does at start-up
+
+import adsk  # noqa: E402
+import adsk.core  # noqa: E402
+import adsk.fusion  # noqa: E402
+
+from . import brep  # noqa: E402
+
+
+def load(module: str = ""):
+    """
+    imports an add-in module (eg "lib.classes" or "commands.createCommand.main")
+    the add-in folder is registered as the ADDIN_PACKAGE package, so relative imports work as they do in Fusion
+    """
+    if ADDIN_PACKAGE not in sys.modules:
+        spec = importlib.machinery.ModuleSpec(ADDIN_PACKAGE, None, is_package=True)
+        spec.submodule_search_locations = [_addinPath]
+        sys.modules[ADDIN_PACKAGE] = importlib.util.module_from_spec(spec)
+    if not module:
+        return sys.modules[ADDIN_PACKAGE]
+    return importlib.import_module(f"{ADDIN_PACKAGE}.{module}")
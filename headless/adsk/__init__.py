@@ -0,0 +1,8 @@
+"""Headless stand-in for the Fusion 360 adsk package - see headless/__init__.py"""
+from . import core
+from . import fusion
+from . import cam
+
+
+def terminate():
+    pass
@@ -0,0 +1 @@
+"""Headless stand-in for adsk.cam - imported by DbContext, nothing in it is used"""
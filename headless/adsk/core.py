@@ -0,0 +1,1111 @@
+"""Headless stand-in for adsk.core - just the surface Dogbone uses"""
+import math
+import re
+from typing import List, Optional
+
+
+class Base:
+    """Root of all stand-in API objects"""
+
+    _classType = "adsk::core::Base"
+
+    @classmethod
+    def classType(cls) -> str:
+        return cls._classType
+
+    @property
+    def objectType(self) -> str:
+        return self._classType
+
+    @property
+    def isValid(self) -> bool:
+        return True
+
+
+class ObjectCollection(Base):
+    _classType = "adsk::core::ObjectCollection"
+
+    def __init__(self, items=None) -> None:
+        self._items = list(items or [])
+
+    @staticmethod
+    def create() -> "ObjectCollection":
+        return ObjectCollection()
+
+    def add(self, item) -> bool:
+        self._items.append(item)
+        return True
+
+    def removeByIndex(self, index: int) -> bool:
+        del self._items[index]
+        return True
+
+    def clear(self) -> bool:
+        self._items = []
+        return True
+
+    def item(self, index: int):
+        return self._items[index]
+
+    @property
+    def count(self) -> int:
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+
+class Collection(ObjectCollection):
+    """Read only API collection - BRepFaces, BRepEdges, Attributes..."""
+
+    _classType = "adsk::core::Collection"
+
+
+# ==============================================================================
+#   Geometry
+# ==============================================================================
+
+TOLERANCE = 1e-8
+
+
+class Vector3D(Base):
+    _classType = "adsk::core::Vector3D"
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> "Vector3D":
+        return Vector3D(x, y, z)
+
+    def asArray(self) -> List[float]:
+        return [self.x, self.y, self.z]
+
+    def asPoint(self) -> "Point3D":
+        return Point3D(self.x, self.y, self.z)
+
+    def copy(self) -> "Vector3D":
+        return Vector3D(self.x, self.y, self.z)
+
+    def setWithArray(self, coordinates) -> bool:
+        self.x, self.y, self.z = (float(c) for c in coordinates)
+        return True
+
+    @property
+    def length(self) -> float:
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self) -> bool:
+        length = self.length
+        if length < TOLERANCE:
+            return False
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return True
+
+    def scaleBy(self, scale: float) -> bool:
+        self.x, self.y, self.z = self.x * scale, self.y * scale, self.z * scale
+        return True
+
+    def add(self, vector: "Vector3D") -> bool:
+        self.x, self.y, self.z = self.x + vector.x, self.y + vector.y, self.z + vector.z
+        return True
+
+    def subtract(self, vector: "Vector3D") -> bool:
+        self.x, self.y, self.z = self.x - vector.x, self.y - vector.y, self.z - vector.z
+        return True
+
+    def dotProduct(self, vector: "Vector3D") -> float:
+        return self.x * vector.x + self.y * vector.y + self.z * vector.z
+
+    def crossProduct(self, vector: "Vector3D") -> "Vector3D":
+        return Vector3D(
+            self.y * vector.z - self.z * vector.y,
+            self.z * vector.x - self.x * vector.z,
+            self.x * vector.y - self.y * vector.x,
+        )
+
+    def angleTo(self, vector: "Vector3D") -> float:
+        lengths = self.length * vector.length
+        if lengths < TOLERANCE:
+            return 0.0
+        return math.acos(max(-1.0, min(1.0, self.dotProduct(vector) / lengths)))
+
+    def isParallelTo(self, vector: "Vector3D") -> bool:
+        lengths = self.length * vector.length
+        if lengths < TOLERANCE:
+            return False
+        return self.crossProduct(vector).length / lengths < 1e-6
+
+    def isPerpendicularTo(self, vector: "Vector3D") -> bool:
+        lengths = self.length * vector.length
+        if lengths < TOLERANCE:
+            return False
+        return abs(self.dotProduct(vector)) / lengths < 1e-6
+
+    def isEqualTo(self, vector: "Vector3D") -> bool:
+        return (
+            abs(self.x - vector.x) < 1e-6
+            and abs(self.y - vector.y) < 1e-6
+            and abs(self.z - vector.z) < 1e-6
+        )
+
+    def transformBy(self, matrix: "Matrix3D") -> bool:
+        self.x, self.y, self.z = matrix._apply(self.x, self.y, self.z, 0.0)
+        return True
+
+    def __repr__(self):
+        return f"Vector3D({self.x:g}, {self.y:g}, {self.z:g})"
+
+
+class Point3D(Base):
+    _classType = "adsk::core::Point3D"
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> "Point3D":
+        return Point3D(x, y, z)
+
+    def asArray(self) -> List[float]:
+        return [self.x, self.y, self.z]
+
+    def asVector(self) -> Vector3D:
+        return Vector3D(self.x, self.y, self.z)
+
+    def copy(self) -> "Point3D":
+        return Point3D(self.x, self.y, self.z)
+
+    def setWithArray(self, coordinates) -> bool:
+        self.x, self.y, self.z = (float(c) for c in coordinates)
+        return True
+
+    def vectorTo(self, point: "Point3D") -> Vector3D:
+        return Vector3D(point.x - self.x, point.y - self.y, point.z - self.z)
+
+    def distanceTo(self, point: "Point3D") -> float:
+        return self.vectorTo(point).length
+
+    def isEqualTo(self, point: "Point3D") -> bool:
+        return self.distanceTo(point) < 1e-6
+
+    def translateBy(self, vector: Vector3D) -> bool:
+        self.x, self.y, self.z = self.x + vector.x, self.y + vector.y, self.z + vector.z
+        return True
+
+    def transformBy(self, matrix: "Matrix3D") -> bool:
+        self.x, self.y, self.z = matrix._apply(self.x, self.y, self.z, 1.0)
+        return True
+
+    def __repr__(self):
+        return f"Point3D({self.x:g}, {self.y:g}, {self.z:g})"
+
+
+class Matrix3D(Base):
+    """4x4 row major transformation matrix"""
+
+    _classType = "adsk::core::Matrix3D"
+
+    def __init__(self, rows=None) -> None:
+        self._m = [list(row) for row in rows] if rows else [
+            [1.0 if i == j else 0.0 for j in range(4)] for i in range(4)
+        ]
+
+    @staticmethod
+    def create() -> "Matrix3D":
+        return Matrix3D()
+
+    def copy(self) -> "Matrix3D":
+        return Matrix3D(self._m)
+
+    def asArray(self) -> List[float]:
+        return [value for row in self._m for value in row]
+
+    def setWithArray(self, values) -> bool:
+        self._m = [list(values[i * 4:i * 4 + 4]) for i in range(4)]
+        return True
+
+    def _apply(self, x: float, y: float, z: float, w: float):
+        m = self._m
+        return (
+            m[0][0] * x + m[0][1] * y + m[0][2] * z + m[0][3] * w,
+            m[1][0] * x + m[1][1] * y + m[1][2] * z + m[1][3] * w,
+            m[2][0] * x + m[2][1] * y + m[2][2] * z + m[2][3] * w,
+        )
+
+    @property
+    def translation(self) -> Vector3D:
+        return Vector3D(self._m[0][3], self._m[1][3], self._m[2][3])
+
+    @translation.setter
+    def translation(self, vector: Vector3D):
+        self._m[0][3], self._m[1][3], self._m[2][3] = vector.x, vector.y, vector.z
+
+    def setToIdentity(self) -> bool:
+        self._m = Matrix3D()._m
+        return True
+
+    def setToRotation(self, angle: float, axis: Vector3D, origin: Point3D) -> bool:
+        """Rodrigues rotation about an axis through origin"""
+        u = axis.copy()
+        u.normalize()
+        c, s = math.cos(angle), math.sin(angle)
+        t = 1 - c
+        x, y, z = u.x, u.y, u.z
+        r = [
+            [t * x * x + c, t * x * y - s * z, t * x * z + s * y],
+            [t * x * y + s * z, t * y * y + c, t * y * z - s * x],
+            [t * x * z - s * y, t * y * z + s * x, t * z * z + c],
+        ]
+        o = (origin.x, origin.y, origin.z)
+        self._m = [
+            r[i] + [o[i] - sum(r[i][j] * o[j] for j in range(3))] for i in range(3)
+        ] + [[0.0, 0.0, 0.0, 1.0]]
+        return True
+
+    def setToAlignCoordinateSystems(
+        self, fromOrigin, fromXAxis, fromYAxis, fromZAxis, toOrigin, toXAxis, toYAxis, toZAxis
+    ) -> bool:
+        fromAxes = [fromXAxis, fromYAxis, fromZAxis]
+        toAxes = [toXAxis, toYAxis, toZAxis]
+        # R = To * From^T - axes are assumed orthonormal
+        r = [
+            [sum(toAxes[k].asArray()[i] * fromAxes[k].asArray()[j] for k in range(3)) for j in range(3)]
+            for i in range(3)
+        ]
+        f = fromOrigin.asArray()
+        t = toOrigin.asArray()
+        self._m = [
+            r[i] + [t[i] - sum(r[i][j] * f[j] for j in range(3))] for i in range(3)
+        ] + [[0.0, 0.0, 0.0, 1.0]]
+        return True
+
+    def transformBy(self, matrix: "Matrix3D") -> bool:
+        """self = matrix * self - ie apply self first, then matrix"""
+        a, b = matrix._m, self._m
+        self._m = [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+        return True
+
+    def invert(self) -> bool:
+        r = [row[:3] for row in self._m[:3]]
+        t = [row[3] for row in self._m[:3]]
+        det = (
+            r[0][0] * (r[1][1] * r[2][2] - r[1][2] * r[2][1])
+            - r[0][1] * (r[1][0] * r[2][2] - r[1][2] * r[2][0])
+            + r[0][2] * (r[1][0] * r[2][1] - r[1][1] * r[2][0])
+        )
+        if abs(det) < TOLERANCE:
+            return False
+        inv = [
+            [
+                (r[(j + 1) % 3][(i + 1) % 3] * r[(j + 2) % 3][(i + 2) % 3]
+                 - r[(j + 1) % 3][(i + 2) % 3] * r[(j + 2) % 3][(i + 1) % 3]) / det
+                for j in range(3)
+            ]
+            for i in range(3)
+        ]
+        self._m = [
+            inv[i] + [-sum(inv[i][j] * t[j] for j in range(3))] for i in range(3)
+        ] + [[0.0, 0.0, 0.0, 1.0]]
+        return True
+
+    def isEqualTo(self, matrix: "Matrix3D") -> bool:
+        return all(abs(a - b) < 1e-9 for a, b in zip(self.asArray(), matrix.asArray()))
+
+
+class Curve3DTypes:
+    Line3DCurveType = 0
+    Arc3DCurveType = 1
+    Circle3DCurveType = 2
+    Ellipse3DCurveType = 3
+    EllipticalArc3DCurveType = 4
+    InfiniteLine3DCurveType = 5
+    NurbsCurve3DCurveType = 6
+
+
+class SurfaceTypes:
+    PlaneSurfaceType = 0
+    CylinderSurfaceType = 1
+
+
+class Line3D(Base):
+    _classType = "adsk::core::Line3D"
+    curveType = Curve3DTypes.Line3DCurveType
+
+    def __init__(self, startPoint: Point3D, endPoint: Point3D) -> None:
+        self.startPoint = startPoint
+        self.endPoint = endPoint
+
+    @staticmethod
+    def create(startPoint: Point3D, endPoint: Point3D) -> "Line3D":
+        return Line3D(startPoint.copy(), endPoint.copy())
+
+    def copy(self) -> "Line3D":
+        return Line3D(self.startPoint.copy(), self.endPoint.copy())
+
+    def transformBy(self, matrix: Matrix3D) -> bool:
+        self.startPoint.transformBy(matrix)
+        self.endPoint.transformBy(matrix)
+        return True
+
+
+class Arc3D(Base):
+    _classType = "adsk::core::Arc3D"
+    curveType = Curve3DTypes.Arc3DCurveType
+
+    def __init__(self, center, normal, referenceVector, radius, startAngle, endAngle) -> None:
+        self.center, self.normal, self.referenceVector = center, normal, referenceVector
+        self.radius, self.startAngle, self.endAngle = radius, startAngle, endAngle
+
+    @staticmethod
+    def createByCenter(center, normal, referenceVector, radius, startAngle, endAngle) -> "Arc3D":
+        return Arc3D(center.copy(), normal.copy(), referenceVector.copy(), radius, startAngle, endAngle)
+
+
+class Circle3D(Base):
+    _classType = "adsk::core::Circle3D"
+    curveType = Curve3DTypes.Circle3DCurveType
+
+    def __init__(self, center, normal, radius) -> None:
+        self.center, self.normal, self.radius = center, normal, radius
+
+    @staticmethod
+    def createByCenter(center: Point3D, normal: Vector3D, radius: float) -> "Circle3D":
+        return Circle3D(center.copy(), normal.copy(), radius)
+
+
+class InfiniteLine3D(Base):
+    _classType = "adsk::core::InfiniteLine3D"
+    curveType = Curve3DTypes.InfiniteLine3DCurveType
+
+    def __init__(self, origin: Point3D, direction: Vector3D) -> None:
+        self.origin = origin
+        self.direction = direction
+
+    @staticmethod
+    def create(origin: Point3D, direction: Vector3D) -> "InfiniteLine3D":
+        return InfiniteLine3D(origin.copy(), direction.copy())
+
+
+class Plane(Base):
+    _classType = "adsk::core::Plane"
+    surfaceType = SurfaceTypes.PlaneSurfaceType
+
+    def __init__(self, origin: Point3D, normal: Vector3D) -> None:
+        self.origin = origin
+        self.normal = normal
+
+    @staticmethod
+    def create(origin: Point3D, normal: Vector3D) -> "Plane":
+        normal = normal.copy()
+        normal.normalize()
+        return Plane(origin.copy(), normal)
+
+    def copy(self) -> "Plane":
+        return Plane(self.origin.copy(), self.normal.copy())
+
+    def intersectWithLine(self, line: InfiniteLine3D) -> Optional[Point3D]:
+        denominator = self.normal.dotProduct(line.direction)
+        if abs(denominator) < TOLERANCE:
+            return None
+        t = self.normal.dotProduct(line.origin.vectorTo(self.origin)) / denominator
+        point = line.origin.copy()
+        direction = line.direction.copy()
+        direction.scaleBy(t)
+        point.translateBy(direction)
+        return point
+
+    def isParallelToPlane(self, plane: "Plane") -> bool:
+        return self.normal.isParallelTo(plane.normal)
+
+
+class Cylinder(Base):
+    _classType = "adsk::core::Cylinder"
+    surfaceType = SurfaceTypes.CylinderSurfaceType
+
+    def __init__(self, origin: Point3D, axis: Vector3D, radius: float) -> None:
+        self.origin, self.axis, self.radius = origin, axis, radius
+
+    @staticmethod
+    def create(origin: Point3D, axis: Vector3D, radius: float) -> "Cylinder":
+        return Cylinder(origin.copy(), axis.copy(), radius)
+
+
+class BoundingBox3D(Base):
+    _classType = "adsk::core::BoundingBox3D"
+
+    def __init__(self, minPoint: Point3D, maxPoint: Point3D) -> None:
+        self.minPoint = minPoint
+        self.maxPoint = maxPoint
+
+    @staticmethod
+    def create(minPoint: Point3D, maxPoint: Point3D) -> "BoundingBox3D":
+        return BoundingBox3D(minPoint.copy(), maxPoint.copy())
+
+    def copy(self) -> "BoundingBox3D":
+        return BoundingBox3D(self.minPoint.copy(), self.maxPoint.copy())
+
+    def expand(self, point: Point3D) -> bool:
+        self.minPoint = Point3D(*(min(a, b) for a, b in zip(self.minPoint.asArray(), point.asArray())))
+        self.maxPoint = Point3D(*(max(a, b) for a, b in zip(self.maxPoint.asArray(), point.asArray())))
+        return True
+
+    def combine(self, boundingBox: "BoundingBox3D") -> bool:
+        self.expand(boundingBox.minPoint)
+        self.expand(boundingBox.maxPoint)
+        return True
+
+    def intersects(self, boundingBox: "BoundingBox3D") -> bool:
+        return all(
+            a0 <= b1 + TOLERANCE and b0 <= a1 + TOLERANCE
+            for a0, a1, b0, b1 in zip(
+                self.minPoint.asArray(), self.maxPoint.asArray(),
+                boundingBox.minPoint.asArray(), boundingBox.maxPoint.asArray(),
+            )
+        )
+
+    def contains(self, point: Point3D) -> bool:
+        return all(
+            a - TOLERANCE <= p <= b + TOLERANCE
+            for a, p, b in zip(self.minPoint.asArray(), point.asArray(), self.maxPoint.asArray())
+        )
+
+
+class OrientedBoundingBox3D(Base):
+    _classType = "adsk::core::OrientedBoundingBox3D"
+
+    def __init__(self, centerPoint, lengthDirection, widthDirection, length, width, height) -> None:
+        self.centerPoint = centerPoint
+        self.lengthDirection = lengthDirection
+        self.widthDirection = widthDirection
+        self.heightDirection = lengthDirection.crossProduct(widthDirection)
+        self.heightDirection.normalize()
+        self.length, self.width, self.height = length, width, height
+
+    @staticmethod
+    def create(centerPoint, lengthDirection, widthDirection, length, width, height) -> "OrientedBoundingBox3D":
+        lengthDirection = lengthDirection.copy()
+        widthDirection = widthDirection.copy()
+        lengthDirection.normalize()
+        widthDirection.normalize()
+        return OrientedBoundingBox3D(
+            centerPoint.copy(), lengthDirection, widthDirection, length, width, height
+        )
+
+
+class Color(Base):
+    _classType = "adsk::core::Color"
+
+    def __init__(self, red, green, blue, opacity) -> None:
+        self.red, self.green, self.blue, self.opacity = red, green, blue, opacity
+
+    @staticmethod
+    def create(red: int, green: int, blue: int, opacity: int) -> "Color":
+        return Color(red, green, blue, opacity)
+
+
+# ==============================================================================
+#   Attributes
+# ==============================================================================
+
+
+class Attribute(Base):
+    _classType = "adsk::core::Attribute"
+
+    def __init__(self, owner: "Attributes", groupName: str, name: str, value: str) -> None:
+        self._owner = owner
+        self.groupName = groupName
+        self.name = name
+        self.value = value
+
+    @property
+    def parent(self):
+        return self._owner._parent()
+
+    def deleteMe(self) -> bool:
+        self._owner._remove(self)
+        return True
+
+
+class Attributes(Collection):
+    """Attributes of one entity - the registry keeps track of every attribute for Design.findAttributes"""
+
+    _classType = "adsk::core::Attributes"
+
+    def __init__(self, parent, registry: list) -> None:
+        super().__init__()
+        self._parent = parent  # callable returning the owning entity
+        self._registry = registry
+
+    def add(self, groupName: str, name: str, value: str) -> Attribute:
+        existing = self.itemByName(groupName, name)
+        if existing:
+            existing.value = value
+            return existing
+        attribute = Attribute(self, groupName, name, value)
+        self._items.append(attribute)
+        self._registry.append(attribute)
+        return attribute
+
+    def itemByName(self, groupName: str, name: str) -> Optional[Attribute]:
+        for attribute in self._items:
+            if attribute.groupName == groupName and attribute.name == name:
+                return attribute
+        return None
+
+    def _remove(self, attribute: Attribute):
+        self._items.remove(attribute)
+        self._registry.remove(attribute)
+
+
+def findAttributes(registry: list, groupName: str, attributeName: str) -> List[Attribute]:
+    """Shared implementation of Design.findAttributes - names starting with re: are regular expressions"""
+    if attributeName.startswith("re:"):
+        pattern = re.compile(attributeName[3:])
+        match = lambda name: pattern.fullmatch(name) is not None
+    else:
+        match = lambda name: name == attributeName
+    return [
+        attribute
+        for attribute in registry
+        if attribute.groupName == groupName and match(attribute.name)
+    ]
+
+
+# ==============================================================================
+#   Application, user interface and events
+# ==============================================================================
+
+
+class Event(Base):
+    _classType = "adsk::core::Event"
+
+    def __init__(self, name: str = "event", sender=None) -> None:
+        self.name = name
+        self.sender = sender
+        self._handlers = []
+
+    def add(self, handler) -> bool:
+        self._handlers.append(handler)
+        return True
+
+    def remove(self, handler) -> bool:
+        self._handlers.remove(handler)
+        return True
+
+    def fire(self, eventArgs) -> None:
+        eventArgs.firingEvent = self
+        for handler in list(self._handlers):
+            handler.notify(eventArgs)
+
+
+class EventArgs(Base):
+    _classType = "adsk::core::EventArgs"
+
+    def __init__(self, **kwargs) -> None:
+        self.firingEvent = None
+        self.__dict__.update(kwargs)
+
+
+class EventHandler:
+    def notify(self, eventArgs):
+        pass
+
+
+class CommandCreatedEventHandler(EventHandler):
+    pass
+
+
+class CommandEventHandler(EventHandler):
+    pass
+
+
+class InputChangedEventHandler(EventHandler):
+    pass
+
+
+class ValidateInputsEventHandler(EventHandler):
+    pass
+
+
+class SelectionEventHandler(EventHandler):
+    pass
+
+
+class KeyboardEventHandler(EventHandler):
+    pass
+
+
+class CustomEventHandler(EventHandler):
+    pass
+
+
+class CommandCreatedEventArgs(EventArgs):
+    pass
+
+
+class CommandEventArgs(EventArgs):
+    pass
+
+
+class InputChangedEventArgs(EventArgs):
+    pass
+
+
+class ValidateInputsEventArgs(EventArgs):
+    pass
+
+
+class SelectionEventArgs(EventArgs):
+    pass
+
+
+class KeyboardEventArgs(EventArgs):
+    pass
+
+
+class CustomEventArgs(EventArgs):
+    pass
+
+
+class CustomEvent(Event):
+    _classType = "adsk::core::CustomEvent"
+
+
+class KeyCodes:
+    ControlKeyCode = 16777249
+    ShiftKeyCode = 16777248
+
+
+class MessageBoxButtonTypes:
+    OKButtonType = 0
+    OKCancelButtonType = 1
+    YesNoButtonType = 3
+
+
+class MessageBoxIconTypes:
+    NoIconIconType = 0
+    WarningIconType = 2
+
+
+class DialogResults:
+    DialogError = -1
+    DialogOK = 0
+    DialogCancel = 1
+    DialogYes = 2
+    DialogNo = 3
+
+
+class DropDownStyles:
+    TextListDropDownStyle = 2
+
+
+class Selections(Collection):
+    _classType = "adsk::core::Selections"
+
+    def add(self, entity) -> bool:
+        self._items.append(entity)
+        return True
+
+    def removeByEntity(self, entity) -> bool:
+        if entity in self._items:
+            self._items.remove(entity)
+            return True
+        return False
+
+    def clear(self) -> bool:
+        self._items = []
+        return True
+
+
+class Workspace(Base):
+    _classType = "adsk::core::Workspace"
+
+    def __init__(self, id: str, isActive: bool = False) -> None:
+        self.id = id
+        self.isActive = isActive
+
+
+class Workspaces(Collection):
+    def itemById(self, id: str) -> Workspace:
+        for workspace in self._items:
+            if workspace.id == id:
+                return workspace
+        workspace = Workspace(id)
+        self._items.append(workspace)
+        return workspace
+
+
+class UserInterface(Base):
+    _classType = "adsk::core::UserInterface"
+
+    def __init__(self) -> None:
+        self.messages: List[str] = []  # stand-in only - everything passed to messageBox
+        self.activeSelections = Selections()
+        self.workspaces = Workspaces()
+        self.activeWorkspace = self.workspaces.itemById("FusionSolidEnvironment")
+        self.activeWorkspace.isActive = True
+
+    def messageBox(self, text: str, title: str = "", buttons=0, icon=0):
+        self.messages.append(text)
+        return DialogResults.DialogOK
+
+
+class Application(Base):
+    _classType = "adsk::core::Application"
+    _instance: Optional["Application"] = None
+
+    def __init__(self) -> None:
+        self.userInterface = UserInterface()
+        self.activeProduct = None
+        self.pointTolerance = 1e-8
+        self.vectorAngleTolerance = 1e-8
+        self._customEvents = {}
+        self._eventQueue = []  # stand-in only - fired custom events, waiting for processEvents
+        self.activeViewport = Viewport()
+
+    @staticmethod
+    def get() -> "Application":
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
+
+    @property
+    def activeDocument(self):
+        return self
+
+    @property
+    def design(self):
+        return self.activeProduct
+
+    def registerCustomEvent(self, eventId: str) -> CustomEvent:
+        return self._customEvents.setdefault(eventId, CustomEvent(eventId))
+
+    def unregisterCustomEvent(self, eventId: str) -> bool:
+        return self._customEvents.pop(eventId, None) is not None
+
+    def fireCustomEvent(self, eventId: str, additionalInfo: str = "") -> bool:
+        """Queued, like Fusion - the event fires from processEvents, after the current handler has returned"""
+        if eventId not in self._customEvents:
+            return False
+        self._eventQueue.append((eventId, additionalInfo))
+        return True
+
+    def processEvents(self, limit: Optional[int] = None) -> int:
+        """stand-in only - fires queued custom events, including those fired meanwhile, up to limit. returns the number fired"""
+        fired = 0
+        while self._eventQueue and (limit is None or fired < limit):
+            eventId, additionalInfo = self._eventQueue.pop(0)
+            event = self._customEvents.get(eventId)
+            if event:
+                event.fire(CustomEventArgs(additionalInfo=additionalInfo))
+                fired += 1
+        return fired
+
+
+class Viewport(Base):
+    _classType = "adsk::core::Viewport"
+
+    def __init__(self) -> None:
+        self.refreshCount = 0  # stand-in only
+
+    def refresh(self) -> bool:
+        self.refreshCount += 1
+        return True
+
+
+class ValueInput(Base):
+    _classType = "adsk::core::ValueInput"
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+    @staticmethod
+    def createByReal(value: float) -> "ValueInput":
+        return ValueInput(value)
+
+    @staticmethod
+    def createByString(value: str) -> "ValueInput":
+        return ValueInput(value)
+
+
+# ==============================================================================
+#   Commands and command inputs - enough to drive DogboneUi
+# ==============================================================================
+
+
+class ListItem(Base):
+    _classType = "adsk::core::ListItem"
+
+    def __init__(self, owner: "ListItems", name: str, isSelected: bool, resourceFolder: str) -> None:
+        self._owner = owner
+        self.name = name
+        self._isSelected = isSelected
+        self.resourceFolder = resourceFolder
+
+    @property
+    def index(self) -> int:
+        return self._owner._items.index(self)
+
+    @property
+    def isSelected(self) -> bool:
+        return self._isSelected
+
+    @isSelected.setter
+    def isSelected(self, value: bool):
+        if value:
+            for item in self._owner._items:
+                item._isSelected = False
+        self._isSelected = value
+
+
+class ListItems(Collection):
+    def add(self, name: str, isSelected: bool, resourceFolder: str = "") -> ListItem:
+        item = ListItem(self, name, False, resourceFolder)
+        self._items.append(item)
+        item.isSelected = isSelected
+        return item
+
+
+class CommandInput(Base):
+    _classType = "adsk::core::CommandInput"
+
+    def __init__(self, commandInputs: "CommandInputs", id: str, name: str) -> None:
+        self.commandInputs = commandInputs
+        self.id = id
+        self.name = name
+        self.isVisible = True
+        self.isEnabled = True
+        self.tooltip = ""
+        self.tooltipDescription = ""
+        self.commandPrompt = ""
+
+    @property
+    def parentCommand(self) -> "Command":
+        return self.commandInputs.command
+
+
+class SelectionCommandInput(CommandInput):
+    _classType = "adsk::core::SelectionCommandInput"
+
+    def __init__(self, commandInputs, id, name) -> None:
+        super().__init__(commandInputs, id, name)
+        self._selections: list = []
+        self.hasFocus = False
+        self.filters: List[str] = []
+
+    def addSelectionFilter(self, filter: str) -> bool:
+        self.filters.append(filter)
+        return True
+
+    def setSelectionLimits(self, minimum: int, maximum: int = 0) -> bool:
+        return True
+
+    def addSelection(self, entity) -> bool:
+        self._selections.append(entity)
+        return True
+
+    def removeSelection(self, index: int) -> bool:
+        del self._selections[index]
+        return True
+
+    def clearSelection(self) -> bool:
+        self._selections = []
+        return True
+
+    @property
+    def selectionCount(self) -> int:
+        return len(self._selections)
+
+    def selection(self, index: int) -> EventArgs:
+        return EventArgs(entity=self._selections[index])
+
+
+class ValueCommandInput(CommandInput):
+    _classType = "adsk::core::ValueCommandInput"
+
+    def __init__(self, commandInputs, id, name, unitType: str, initialValue: ValueInput) -> None:
+        super().__init__(commandInputs, id, name)
+        self.unitType = unitType
+        value = initialValue.value
+        self.expression = value if isinstance(value, str) else str(value)
+
+    @property
+    def value(self) -> float:
+        design = Application.get().activeProduct
+        if self.unitType and design:
+            return design.unitsManager.evaluateExpression(self.expression)
+        return float(self.expression)
+
+
+class BoolValueCommandInput(CommandInput):
+    _classType = "adsk::core::BoolValueCommandInput"
+
+    def __init__(self, commandInputs, id, name, value: bool) -> None:
+        super().__init__(commandInputs, id, name)
+        self.value = value
+
+
+class FloatSliderCommandInput(CommandInput):
+    _classType = "adsk::core::FloatSliderCommandInput"
+
+    def __init__(self, commandInputs, id, name, minimumValue: float, maximumValue: float) -> None:
+        super().__init__(commandInputs, id, name)
+        self.minimumValue, self.maximumValue = minimumValue, maximumValue
+        self.valueOne = minimumValue
+
+
+class _ListCommandInput(CommandInput):
+    def __init__(self, commandInputs, id, name) -> None:
+        super().__init__(commandInputs, id, name)
+        self.listItems = ListItems()
+
+    @property
+    def selectedItem(self) -> Optional[ListItem]:
+        for item in self.listItems:
+            if item.isSelected:
+                return item
+        return None
+
+
+class ButtonRowCommandInput(_ListCommandInput):
+    _classType = "adsk::core::ButtonRowCommandInput"
+
+
+class DropDownCommandInput(_ListCommandInput):
+    _classType = "adsk::core::DropDownCommandInput"
+
+
+class GroupCommandInput(CommandInput):
+    _classType = "adsk::core::GroupCommandInput"
+
+    def __init__(self, commandInputs, id, name) -> None:
+        super().__init__(commandInputs, id, name)
+        self.isExpanded = True
+        self.children = CommandInputs(commandInputs.command, commandInputs)
+
+
+class CommandInputs(Collection):
+    """Iterating walks group children too, and itemById searches the whole command"""
+
+    _classType = "adsk::core::CommandInputs"
+
+    def __init__(self, command: "Command", parent: Optional["CommandInputs"] = None) -> None:
+        super().__init__()
+        self.command = command
+        self._parent = parent
+
+    def _root(self) -> "CommandInputs":
+        return self._parent._root() if self._parent else self
+
+    def _all(self):
+        for commandInput in self._items:
+            yield commandInput
+            if isinstance(commandInput, GroupCommandInput):
+                yield from commandInput.children._all()
+
+    def __iter__(self):
+        return iter(list(self._all()))
+
+    def itemById(self, id: str) -> Optional[CommandInput]:
+        for commandInput in self._root()._all():
+            if commandInput.id == id:
+                return commandInput
+        return None
+
+    def _add(self, commandInput: CommandInput) -> CommandInput:
+        self._items.append(commandInput)
+        return commandInput
+
+    def addSelectionInput(self, id: str, name: str, commandPrompt: str) -> SelectionCommandInput:
+        commandInput = self._add(SelectionCommandInput(self, id, name))
+        commandInput.commandPrompt = commandPrompt
+        return commandInput
+
+    def addValueInput(self, id: str, name: str, unitType: str, initialValue: ValueInput) -> ValueCommandInput:
+        return self._add(ValueCommandInput(self, id, name, unitType, initialValue))
+
+    def addBoolValueInput(self, id: str, name: str, isCheckBox: bool, resourceFolder: str = "", initialValue: bool = False) -> BoolValueCommandInput:
+        return self._add(BoolValueCommandInput(self, id, name, initialValue))
+
+    def addFloatSliderCommandInput(self, id: str, name: str, unitType: str, min: float, max: float, hasTwoSliders: bool = False) -> FloatSliderCommandInput:
+        return self._add(FloatSliderCommandInput(self, id, name, min, max))
+
+    def addButtonRowCommandInput(self, id: str, name: str, isMultiSelectEnabled: bool) -> ButtonRowCommandInput:
+        return self._add(ButtonRowCommandInput(self, id, name))
+
+    def addDropDownCommandInput(self, id: str, name: str, dropDownStyle: int) -> DropDownCommandInput:
+        return self._add(DropDownCommandInput(self, id, name))
+
+    def addGroupCommandInput(self, id: str, name: str) -> GroupCommandInput:
+        return self._add(GroupCommandInput(self, id, name))
+
+    def addTextBoxCommandInput(self, id: str, name: str, formattedText: str, numRows: int, isReadOnly: bool) -> CommandInput:
+        commandInput = self._add(CommandInput(self, id, name))
+        commandInput.formattedText = formattedText
+        return commandInput
+
+
+class Command(Base):
+    """Events fire synchronously - doExecutePreview runs the preview handlers straight away
+
+    as in Fusion, the features a preview made are rolled back before the next preview or execute, and execute
+    is skipped when the last preview set isValidResult - its result is kept instead
+    """
+
+    _classType = "adsk::core::Command"
+
+    def __init__(self) -> None:
+        self.commandInputs = CommandInputs(self)
+        self.inputChanged = Event("inputChanged", self)
+        self.validateInputs = Event("validateInputs", self)
+        self.selectionEvent = Event("select", self)
+        self.execute = Event("execute", self)
+        self.executePreview = Event("executePreview", self)
+        self.keyDown = Event("keyDown", self)
+        self.keyUp = Event("keyUp", self)
+        self.destroy = Event("destroy", self)
+        self.isExecutedWhenPreEmpted = True
+        self.previewCount = 0  # stand-in only
+        self._previewArgs: Optional[CommandEventArgs] = None
+        self._previewStart: Optional[int] = None
+
+    def doExecutePreview(self) -> bool:
+        self.previewCount += 1
+        self._rollBackPreview()
+        self._previewStart = Application.get().activeProduct.timeline.count
+        self._previewArgs = CommandEventArgs(isValidResult=False, command=self)
+        self.executePreview.fire(self._previewArgs)
+        return True
+
+    def _rollBackPreview(self):
+        if self._previewStart is not None:
+            Application.get().activeProduct.timeline._rollBack(self._previewStart)
+        self._previewStart = None
+
+    # stand-in only - simulates the user working the dialog
+
+    def changeInput(self, commandInput: CommandInput) -> None:
+        self.inputChanged.fire(InputChangedEventArgs(input=commandInput, inputs=self.commandInputs))
+
+    def pressKey(self, keyCode: int) -> None:
+        self.keyDown.fire(KeyboardEventArgs(keyCode=keyCode, modifierMask=0))
+        self.keyUp.fire(KeyboardEventArgs(keyCode=keyCode, modifierMask=0))
+
+    def doExecute(self) -> None:
+        """runs execute then destroy - same order as Fusion when OK is clicked"""
+        if self._previewArgs is None or not self._previewArgs.isValidResult:
+            self._rollBackPreview()
+            self.execute.fire(CommandEventArgs(command=self))
+        self._previewStart = self._previewArgs = None
+        self.destroy.fire(CommandEventArgs(command=self))
+
+
+class CommandControl(Base):
+    _classType = "adsk::core::CommandControl"
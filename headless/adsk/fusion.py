@@ -0,0 +1,1456 @@
+"""Headless stand-in for adsk.fusion - an in-memory, planar-faced B-rep plus the design objects Dogbone touches
+
+Solid bodies are built by headless.brep from planar face loops. Temporary bodies (tool bodies) don't carry
+topology, they keep a list of primitives instead - booleans and combines just collect primitives and
+count the work done, so the stand-in can be used to measure how many operations a pipeline performs.
+"""
+import itertools
+import math
+from typing import Dict, List, Optional, Tuple
+
+from . import core
+from .core import Base, Collection, ObjectCollection, Point3D, Vector3D, Matrix3D
+
+Vec = Tuple[float, float, float]
+
+_uids = itertools.count(1)
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+
+class FeatureHealthStates:
+    HealthyFeatureHealthState = 0
+    WarningFeatureHealthState = 1
+    ErrorFeatureHealthState = 2
+    SuppressedFeatureHealthState = 3
+    RolledBackFeatureHealthState = 4
+    UnknownFeatureHealthState = 5
+
+
+class BRepEntityTypes:
+    BRepBodyEntityType = 0
+    BRepFaceEntityType = 1
+    BRepEdgeEntityType = 2
+    BRepVertexEntityType = 3
+
+
+# ==============================================================================
+#   B-rep data - one instance per native entity
+# ==============================================================================
+
+
+class _VertexData:
+    __slots__ = ("point", "edges", "attributes")
+
+    def __init__(self, point: Vec) -> None:
+        self.point = point
+        self.edges: List[int] = []
+        self.attributes = None
+
+
+class _EdgeData:
+    __slots__ = ("start", "end", "coEdges", "attributes")
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start = start
+        self.end = end
+        self.coEdges: List[int] = []
+        self.attributes = None
+
+
+class _CoEdgeData:
+    __slots__ = ("edge", "loop", "isOpposed")
+
+    def __init__(self, edge: int, loop: int, isOpposed: bool) -> None:
+        self.edge = edge
+        self.loop = loop
+        self.isOpposed = isOpposed
+
+
+class _LoopData:
+    __slots__ = ("face", "coEdges", "isOuter")
+
+    def __init__(self, face: int, isOuter: bool) -> None:
+        self.face = face
+        self.coEdges: List[int] = []
+        self.isOuter = isOuter
+
+
+class _FaceData:
+    __slots__ = ("loops", "normal", "point", "area", "attributes")
+
+    def __init__(self, normal: Vec, point: Vec, area: float) -> None:
+        self.loops: List[int] = []
+        self.normal = normal
+        self.point = point
+        self.area = area
+        self.attributes = None
+
+
+class _BodyData:
+    def __init__(self, name: str, isTemporary: bool) -> None:
+        self.uid = next(_uids)
+        self.name = name
+        self.isTemporary = isTemporary
+        self.isValid = True
+        self.component: Optional["Component"] = None
+        self.vertices: List[_VertexData] = []
+        self.edges: List[_EdgeData] = []
+        self.coEdges: List[_CoEdgeData] = []
+        self.loops: List[_LoopData] = []
+        self.faces: List[_FaceData] = []
+        self.primitives: List[dict] = []  # temporary bodies only - cylinders, boxes, prisms
+        self.cuts: List[List[dict]] = []  # primitives of every tool body cut from this body
+        self.attributes = None
+
+    def faceCount(self) -> int:
+        return len(self.faces) + sum(_primitiveFaceCount(p) for p in self.primitives)
+
+    def copy(self) -> "_BodyData":
+        body = _BodyData(self.name, True)
+        body.primitives = [_copyPrimitive(p) for p in self.primitives]
+        body.cuts = [list(cut) for cut in self.cuts]
+        body.vertices, body.edges, body.coEdges = self.vertices, self.edges, self.coEdges
+        body.loops, body.faces = self.loops, self.faces
+        return body
+
+
+def _primitiveFaceCount(primitive: dict) -> int:
+    return {"cylinder": 3, "box": 6}.get(primitive["type"], primitive.get("faces", 3))
+
+
+def _copyPrimitive(primitive: dict) -> dict:
+    return dict(primitive)
+
+
+def _transformPrimitive(primitive: dict, matrix: Matrix3D) -> dict:
+    result = dict(primitive)
+    for key, value in primitive.items():
+        if key.startswith("point"):
+            result[key] = matrix._apply(*value, 1.0)
+        elif key.startswith("vector"):
+            result[key] = matrix._apply(*value, 0.0)
+    return result
+
+
+def _primitivePoints(primitive: dict) -> List[Vec]:
+    """Corner points of the primitive hull - used for bounding boxes"""
+    if primitive["type"] == "cylinder":
+        r = max(primitive["radiusOne"], primitive["radiusTwo"])
+        return [
+            tuple(c + d for c, d in zip(p, offset))
+            for p in (primitive["pointOne"], primitive["pointTwo"])
+            for offset in ((-r, -r, -r), (r, r, r))
+        ]
+    if primitive["type"] == "box":
+        c = primitive["pointCentre"]
+        axes = [primitive["vectorLength"], primitive["vectorWidth"], primitive["vectorHeight"]]
+        return [
+            tuple(
+                c[i] + sum(s * a[i] / 2 for s, a in zip(signs, axes))
+                for i in range(3)
+            )
+            for signs in itertools.product((-1, 1), repeat=3)
+        ]
+    return [value for key, value in primitive.items() if key.startswith("point")]
+
+
+# ==============================================================================
+#   Entity views - light objects pointing at the data, optionally in an assembly context
+# ==============================================================================
+
+
+class _Entity(Base):
+    _kind = "x"
+
+    def __init__(self, body: _BodyData, index: int, context: Optional["Occurrence"] = None) -> None:
+        self._bodyData = body
+        self._index = index
+        self._context = context
+
+    def _data(self):
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        return (
+            type(other) is type(self)
+            and other._bodyData is self._bodyData
+            and other._index == self._index
+            and other._context is self._context
+        )
+
+    def __hash__(self):
+        return hash((type(self), self._bodyData.uid, self._index, id(self._context)))
+
+    @property
+    def isValid(self) -> bool:
+        return self._bodyData.isValid
+
+    @property
+    def tempId(self) -> int:
+        return self._index
+
+    @property
+    def assemblyContext(self) -> Optional["Occurrence"]:
+        return self._context
+
+    @property
+    def nativeObject(self):
+        return type(self)(self._bodyData, self._index) if self._context else None
+
+    def createForAssemblyContext(self, occurrence: "Occurrence"):
+        return type(self)(self._bodyData, self._index, occurrence)
+
+    @property
+    def entityToken(self) -> str:
+        token = f"b{self._bodyData.uid}:{self._kind}{self._index}"
+        return f"o{self._context._uid}|{token}" if self._context else token
+
+    @property
+    def body(self) -> "BRepBody":
+        return BRepBody(self._bodyData, 0, self._context)
+
+    @property
+    def attributes(self) -> core.Attributes:
+        data = self._data()
+        if data.attributes is None:
+            native = type(self)(self._bodyData, self._index)
+            data.attributes = core.Attributes(lambda: native, _design()._attributeRegistry)
+        return data.attributes
+
+    def _point(self, point: Vec) -> Point3D:
+        if self._context:
+            return Point3D(*self._context.transform2._apply(*point, 1.0))
+        return Point3D(*point)
+
+    def _vector(self, vector: Vec) -> Vector3D:
+        if self._context:
+            return Vector3D(*self._context.transform2._apply(*vector, 0.0))
+        return Vector3D(*vector)
+
+
+class BRepVertex(_Entity):
+    _classType = "adsk::fusion::BRepVertex"
+    _kind = "v"
+
+    def _data(self) -> _VertexData:
+        return self._bodyData.vertices[self._index]
+
+    @property
+    def geometry(self) -> Point3D:
+        return self._point(self._data().point)
+
+    @property
+    def edges(self) -> Collection:
+        return Collection(BRepEdge(self._bodyData, e, self._context) for e in self._data().edges)
+
+    @property
+    def faces(self) -> Collection:
+        faces = []
+        for edge in self.edges:
+            faces.extend(f for f in edge.faces if f not in faces)
+        return Collection(faces)
+
+
+class BRepEdge(_Entity):
+    _classType = "adsk::fusion::BRepEdge"
+    _kind = "e"
+
+    def _data(self) -> _EdgeData:
+        return self._bodyData.edges[self._index]
+
+    @property
+    def startVertex(self) -> BRepVertex:
+        return BRepVertex(self._bodyData, self._data().start, self._context)
+
+    @property
+    def endVertex(self) -> BRepVertex:
+        return BRepVertex(self._bodyData, self._data().end, self._context)
+
+    @property
+    def vertices(self) -> Collection:
+        return Collection([self.startVertex, self.endVertex])
+
+    @property
+    def coEdges(self) -> Collection:
+        return Collection(BRepCoEdge(self._bodyData, c, self._context) for c in self._data().coEdges)
+
+    @property
+    def faces(self) -> Collection:
+        body = self._bodyData
+        return Collection(
+            BRepFace(body, body.loops[body.coEdges[c].loop].face, self._context)
+            for c in self._data().coEdges
+        )
+
+    @property
+    def geometry(self) -> core.Line3D:
+        return core.Line3D(self.startVertex.geometry, self.endVertex.geometry)
+
+    @property
+    def length(self) -> float:
+        data = self._data()
+        vertices = self._bodyData.vertices
+        return math.dist(vertices[data.start].point, vertices[data.end].point)
+
+    @property
+    def pointOnEdge(self) -> Point3D:
+        data = self._data()
+        vertices = self._bodyData.vertices
+        start, end = vertices[data.start].point, vertices[data.end].point
+        return self._point(tuple((s + e) / 2 for s, e in zip(start, end)))
+
+    @property
+    def isDegenerate(self) -> bool:
+        return False
+
+    @property
+    def isTolerant(self) -> bool:
+        return False
+
+
+class BRepCoEdge(_Entity):
+    _classType = "adsk::fusion::BRepCoEdge"
+    _kind = "c"
+
+    def _data(self) -> _CoEdgeData:
+        return self._bodyData.coEdges[self._index]
+
+    @property
+    def edge(self) -> BRepEdge:
+        return BRepEdge(self._bodyData, self._data().edge, self._context)
+
+    @property
+    def loop(self) -> "BRepLoop":
+        return BRepLoop(self._bodyData, self._data().loop, self._context)
+
+    @property
+    def isOpposedToEdge(self) -> bool:
+        return self._data().isOpposed
+
+
+class BRepLoop(_Entity):
+    _classType = "adsk::fusion::BRepLoop"
+    _kind = "l"
+
+    def _data(self) -> _LoopData:
+        return self._bodyData.loops[self._index]
+
+    @property
+    def face(self) -> "BRepFace":
+        return BRepFace(self._bodyData, self._data().face, self._context)
+
+    @property
+    def coEdges(self) -> Collection:
+        return Collection(BRepCoEdge(self._bodyData, c, self._context) for c in self._data().coEdges)
+
+    @property
+    def edges(self) -> Collection:
+        coEdges = self._bodyData.coEdges
+        return Collection(
+            BRepEdge(self._bodyData, coEdges[c].edge, self._context) for c in self._data().coEdges
+        )
+
+    @property
+    def isOuter(self) -> bool:
+        return self._data().isOuter
+
+
+class SurfaceEvaluator(Base):
+    _classType = "adsk::core::SurfaceEvaluator"
+
+    def __init__(self, face: "BRepFace") -> None:
+        self._face = face
+
+    def getNormalAtPoint(self, point: Point3D) -> Tuple[bool, Vector3D]:
+        return True, self._face._vector(self._face._data().normal)
+
+
+class BRepFace(_Entity):
+    _classType = "adsk::fusion::BRepFace"
+    _kind = "f"
+
+    def _data(self) -> _FaceData:
+        return self._bodyData.faces[self._index]
+
+    @property
+    def geometry(self) -> core.Plane:
+        data = self._data()
+        return core.Plane(self._point(data.point), self._vector(data.normal))
+
+    @property
+    def evaluator(self) -> SurfaceEvaluator:
+        return SurfaceEvaluator(self)
+
+    @property
+    def pointOnFace(self) -> Point3D:
+        return self._point(self._data().point)
+
+    @property
+    def area(self) -> float:
+        return self._data().area
+
+    @property
+    def loops(self) -> Collection:
+        return Collection(BRepLoop(self._bodyData, l, self._context) for l in self._data().loops)
+
+    def _edgeIndices(self) -> List[int]:
+        body = self._bodyData
+        return [body.coEdges[c].edge for l in self._data().loops for c in body.loops[l].coEdges]
+
+    @property
+    def edges(self) -> Collection:
+        return Collection(BRepEdge(self._bodyData, e, self._context) for e in self._edgeIndices())
+
+    @property
+    def vertices(self) -> Collection:
+        body = self._bodyData
+        vertices = {}
+        for e in self._edgeIndices():
+            vertices[body.edges[e].start] = vertices[body.edges[e].end] = None
+        return Collection(BRepVertex(body, v, self._context) for v in vertices)
+
+    @property
+    def isParamReversed(self) -> bool:
+        return False
+
+
+class BRepBody(_Entity):
+    _classType = "adsk::fusion::BRepBody"
+    _kind = "b"
+
+    def _data(self) -> _BodyData:
+        return self._bodyData
+
+    def __eq__(self, other):
+        return (
+            type(other) is BRepBody
+            and other._bodyData is self._bodyData
+            and other._context is self._context
+        )
+
+    def __hash__(self):
+        return hash((BRepBody, self._bodyData.uid, id(self._context)))
+
+    @property
+    def tempId(self) -> int:
+        return self._bodyData.uid
+
+    @property
+    def entityToken(self) -> str:
+        token = f"b{self._bodyData.uid}"
+        return f"o{self._context._uid}|{token}" if self._context else token
+
+    @property
+    def name(self) -> str:
+        return self._bodyData.name
+
+    @name.setter
+    def name(self, value: str):
+        self._bodyData.name = value
+
+    @property
+    def isTemporary(self) -> bool:
+        return self._bodyData.isTemporary
+
+    @property
+    def isSolid(self) -> bool:
+        return True
+
+    @property
+    def parentComponent(self) -> Optional["Component"]:
+        return self._bodyData.component
+
+    @property
+    def body(self) -> "BRepBody":
+        return self
+
+    @property
+    def faces(self) -> Collection:
+        return Collection(BRepFace(self._bodyData, f, self._context) for f in range(len(self._bodyData.faces)))
+
+    @property
+    def edges(self) -> Collection:
+        return Collection(BRepEdge(self._bodyData, e, self._context) for e in range(len(self._bodyData.edges)))
+
+    @property
+    def vertices(self) -> Collection:
+        return Collection(BRepVertex(self._bodyData, v, self._context) for v in range(len(self._bodyData.vertices)))
+
+    @property
+    def area(self) -> float:
+        return sum(face.area for face in self._bodyData.faces)
+
+    @property
+    def volume(self) -> float:
+        """divergence theorem over planar faces - ignores cuts and primitives"""
+        return sum(
+            face.area * sum(n * p for n, p in zip(face.normal, face.point)) / 3
+            for face in self._bodyData.faces
+        )
+
+    @property
+    def boundingBox(self) -> core.BoundingBox3D:
+        body = self._bodyData
+        points = [v.point for v in body.vertices]
+        for primitive in body.primitives:
+            points.extend(_primitivePoints(primitive))
+        points = [self._point(p).asArray() for p in points] or [[0.0, 0.0, 0.0]]
+        return core.BoundingBox3D(
+            Point3D(*(min(c) for c in zip(*points))), Point3D(*(max(c) for c in zip(*points)))
+        )
+
+    def deleteMe(self) -> bool:
+        body = self._bodyData
+        if not body.isValid:
+            return False
+        body.isValid = False
+        if body.component:
+            body.component.bRepBodies._items.remove(body)
+        return True
+
+
+# ==============================================================================
+#   Temporary B-rep manager
+# ==============================================================================
+
+
+class TemporaryBRepManager(Base):
+    """Collects primitives instead of doing real geometry - stats count the work a real kernel would do"""
+
+    _classType = "adsk::fusion::TemporaryBRepManager"
+    _instance: Optional["TemporaryBRepManager"] = None
+
+    def __init__(self) -> None:
+        self.resetStats()
+
+    @staticmethod
+    def get() -> "TemporaryBRepManager":
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def resetStats(self):
+        """stand-in only"""
+        self.stats: Dict[str, int] = {
+            "cylinders": 0,
+            "boxes": 0,
+            "booleans": 0,
+            "booleanWork": 0,  # sum of faces in target and tool of every boolean
+            "copies": 0,
+            "transforms": 0,
+            "definitions": 0,  # bodies made by BRepBodyDefinition.createBody
+            "cuts": 0,  # combine features - not temporary B-rep work, but counted here so a run has one set of stats
+            "cutWork": 0,  # faces of the target plus all tool bodies of every combine or hole feature
+            "holeFeatures": 0,
+            "holes": 0,  # hole positions of every hole feature
+            "graphics": 0,  # custom graphics entities drawn
+            "graphicsWork": 0,  # faces of custom graphics bodies, triangles of meshes, segments of lines
+        }
+
+    def _newBody(self, primitive: dict) -> BRepBody:
+        body = _BodyData("temp", True)
+        body.primitives.append(primitive)
+        return BRepBody(body, 0)
+
+    def createCylinderOrCone(
+        self, pointOne: Point3D, radiusOne: float, pointTwo: Point3D, radiusTwo: float
+    ) -> BRepBody:
+        self.stats["cylinders"] += 1
+        return self._newBody({
+            "type": "cylinder",
+            "pointOne": tuple(pointOne.asArray()),
+            "radiusOne": radiusOne,
+            "pointTwo": tuple(pointTwo.asArray()),
+            "radiusTwo": radiusTwo,
+        })
+
+    def createBox(self, box: core.OrientedBoundingBox3D) -> BRepBody:
+        self.stats["boxes"] += 1
+
+        def scaled(vector: Vector3D, length: float) -> Vec:
+            return tuple(c * length for c in vector.asArray())
+
+        return self._newBody({
+            "type": "box",
+            "pointCentre": tuple(box.centerPoint.asArray()),
+            "vectorLength": scaled(box.lengthDirection, box.length),
+            "vectorWidth": scaled(box.widthDirection, box.width),
+            "vectorHeight": scaled(box.heightDirection, box.height),
+        })
+
+    def booleanOperation(self, targetBody: BRepBody, toolBody: BRepBody, booleanType: int) -> bool:
+        target, tool = targetBody._bodyData, toolBody._bodyData
+        self.stats["booleans"] += 1
+        self.stats["booleanWork"] += target.faceCount() + tool.faceCount()
+        if booleanType == BooleanTypes.UnionBooleanType:
+            target.primitives.extend(tool.primitives)
+        else:
+            target.cuts.append(list(tool.primitives))
+        return True
+
+    def copy(self, body: BRepBody) -> BRepBody:
+        self.stats["copies"] += 1
+        return BRepBody(body._bodyData.copy(), 0)
+
+    def transform(self, body: BRepBody, transform: Matrix3D) -> bool:
+        self.stats["transforms"] += 1
+        data = body._bodyData
+        data.primitives = [_transformPrimitive(p, transform) for p in data.primitives]
+        return True
+
+
+# ==============================================================================
+#   B-rep body definitions - topology is checked, the body comes out as a primitive
+# ==============================================================================
+
+
+class BRepVertexDefinition(Base):
+    _classType = "adsk::fusion::BRepVertexDefinition"
+
+    def __init__(self, position: Point3D) -> None:
+        self.position = position.copy()
+
+
+class BRepEdgeDefinition(Base):
+    _classType = "adsk::fusion::BRepEdgeDefinition"
+
+    def __init__(self, startVertex: BRepVertexDefinition, endVertex: BRepVertexDefinition, curve) -> None:
+        self.startVertex = startVertex
+        self.endVertex = endVertex
+        self.modelSpaceCurve = curve
+
+
+class BRepCoEdgeDefinition(Base):
+    _classType = "adsk::fusion::BRepCoEdgeDefinition"
+
+    def __init__(self, edgeDefinition: BRepEdgeDefinition, isOpposedToEdge: bool) -> None:
+        self.edgeDefinition = edgeDefinition
+        self.isOpposedToEdge = isOpposedToEdge
+
+    def _ends(self) -> Tuple[BRepVertexDefinition, BRepVertexDefinition]:
+        edge = self.edgeDefinition
+        return (edge.endVertex, edge.startVertex) if self.isOpposedToEdge else (edge.startVertex, edge.endVertex)
+
+
+class _DefinitionList(Collection):
+    _itemType = None
+
+    def add(self, *args):
+        item = self._itemType(*args)
+        self._items.append(item)
+        return item
+
+
+class BRepCoEdgeDefinitions(_DefinitionList):
+    _itemType = BRepCoEdgeDefinition
+
+
+class BRepLoopDefinition(Base):
+    _classType = "adsk::fusion::BRepLoopDefinition"
+
+    def __init__(self) -> None:
+        self.bRepCoEdgeDefinitions = BRepCoEdgeDefinitions()
+
+
+class BRepLoopDefinitions(_DefinitionList):
+    _itemType = BRepLoopDefinition
+
+
+class BRepFaceDefinition(Base):
+    _classType = "adsk::fusion::BRepFaceDefinition"
+
+    def __init__(self, surfaceGeometry, isParamReversed: bool) -> None:
+        self.surfaceGeometry = surfaceGeometry
+        self.isParamReversed = isParamReversed
+        self.loopDefinitions = BRepLoopDefinitions()
+
+
+class BRepFaceDefinitions(_DefinitionList):
+    _itemType = BRepFaceDefinition
+
+
+class BRepShellDefinition(Base):
+    _classType = "adsk::fusion::BRepShellDefinition"
+
+    def __init__(self) -> None:
+        self.faceDefinitions = BRepFaceDefinitions()
+
+
+class BRepShellDefinitions(_DefinitionList):
+    _itemType = BRepShellDefinition
+
+
+class BRepLumpDefinition(Base):
+    _classType = "adsk::fusion::BRepLumpDefinition"
+
+    def __init__(self) -> None:
+        self.shellDefinitions = BRepShellDefinitions()
+
+
+class BRepLumpDefinitions(_DefinitionList):
+    _itemType = BRepLumpDefinition
+
+
+class BRepBodyDefinition(Base):
+    """
+    Checks the topology a real kernel would need - closed loops, every edge used once in each direction -
+    and makes a temporary body holding one "definition" primitive
+    """
+
+    _classType = "adsk::fusion::BRepBodyDefinition"
+
+    def __init__(self) -> None:
+        self.lumpDefinitions = BRepLumpDefinitions()
+        self.doFullHealing = True
+        self.outcomeInfo: List[str] = []
+        self._vertices: List[BRepVertexDefinition] = []
+
+    @staticmethod
+    def create() -> "BRepBodyDefinition":
+        return BRepBodyDefinition()
+
+    def createVertexDefinition(self, position: Point3D) -> BRepVertexDefinition:
+        vertex = BRepVertexDefinition(position)
+        self._vertices.append(vertex)
+        return vertex
+
+    def createEdgeDefinitionByCurve(
+        self, startVertex: BRepVertexDefinition, endVertex: BRepVertexDefinition, modelSpaceCurve
+    ) -> BRepEdgeDefinition:
+        return BRepEdgeDefinition(startVertex, endVertex, modelSpaceCurve)
+
+    def _check(self) -> List[str]:
+        problems = []
+        uses: Dict[int, List[bool]] = {}
+        faceCount = 0
+        for lump in self.lumpDefinitions:
+            for shell in lump.shellDefinitions:
+                for face in shell.faceDefinitions:
+                    faceCount += 1
+                    for loop in face.loopDefinitions:
+                        coEdges = list(loop.bRepCoEdgeDefinitions)
+                        for coEdge, following in zip(coEdges, coEdges[1:] + coEdges[:1]):
+                            if coEdge._ends()[1] is not following._ends()[0]:
+                                problems.append(f"face {faceCount}: loop is not closed")
+                            uses.setdefault(id(coEdge.edgeDefinition), []).append(coEdge.isOpposedToEdge)
+        for senses in uses.values():
+            if sorted(senses) != [False, True]:
+                problems.append(f"edge used {len(senses)} times, opposed {senses} - shell is not closed and oriented")
+        return problems
+
+    def createBody(self) -> Optional["BRepBody"]:
+        """stand-in counts faces as the work done"""
+        TemporaryBRepManager.get().stats["definitions"] += 1
+        self.outcomeInfo = self._check()
+        if self.outcomeInfo:
+            return None
+        primitive = {
+            "type": "definition",
+            "faces": sum(
+                len(shell.faceDefinitions) for lump in self.lumpDefinitions for shell in lump.shellDefinitions
+            ),
+        }
+        for i, vertex in enumerate(self._vertices):
+            primitive[f"point{i}"] = tuple(vertex.position.asArray())
+        return TemporaryBRepManager.get()._newBody(primitive)
+
+
+# ==============================================================================
+#   Design, components, occurrences and features
+# ==============================================================================
+
+
+def _design() -> "Design":
+    return core.Application.get().activeProduct
+
+
+class UnitsManager(Base):
+    _classType = "adsk::fusion::FusionUnitsManager"
+    _factors = {"mm": 0.1, "cm": 1.0, "m": 100.0, "in": 2.54, "ft": 30.48}
+
+    def __init__(self) -> None:
+        self.defaultLengthUnits = "mm"
+
+    def evaluateExpression(self, expression: str, units: str = "cm") -> float:
+        """Only handles "<number> [unit]" - enough for tool diameters"""
+        text = expression.strip().replace('"', " in")
+        for unit in sorted(self._factors, key=len, reverse=True):
+            if text.endswith(unit):
+                return float(text[: -len(unit)]) * self._factors[unit]
+        return float(text) * self._factors[self.defaultLengthUnits]
+
+
+class TimelineObject(Base):
+    _classType = "adsk::fusion::TimelineObject"
+
+    def __init__(self, timeline: "Timeline", entity) -> None:
+        self._timeline = timeline
+        self.entity = entity
+        self.parentGroup: Optional["TimelineGroup"] = None
+
+    @property
+    def index(self) -> int:
+        return self._timeline._items.index(self)
+
+    def rollTo(self, rollBefore: bool) -> bool:
+        self._timeline.markerPosition = self.index if rollBefore else self.index + 1
+        return True
+
+
+class TimelineGroup(TimelineObject):
+    _classType = "adsk::fusion::TimelineGroup"
+
+    def __init__(self, timeline: "Timeline", start: int, end: int) -> None:
+        super().__init__(timeline, None)
+        self.name = "Group"
+        self.isCollapsed = True
+        self.members = timeline._items[start:end + 1]
+        for member in self.members:
+            member.parentGroup = self
+
+
+class TimelineGroups(Collection):
+    def __init__(self, timeline: "Timeline") -> None:
+        super().__init__()
+        self._timeline = timeline
+
+    def add(self, startIndex: int, endIndex: int) -> TimelineGroup:
+        group = TimelineGroup(self._timeline, startIndex, endIndex)
+        self._items.append(group)
+        return group
+
+
+class Timeline(Collection):
+    _classType = "adsk::fusion::Timeline"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.markerPosition = 0
+        self.timelineGroups = TimelineGroups(self)
+
+    def _add(self, entity) -> TimelineObject:
+        timelineObject = TimelineObject(self, entity)
+        self._items.insert(self.markerPosition, timelineObject)
+        self.markerPosition += 1
+        _design()._recompute(self.markerPosition)
+        return timelineObject
+
+    def moveToEnd(self) -> bool:
+        self.markerPosition = len(self._items)
+        return True
+
+    def _rollBack(self, count: int):
+        """deletes everything added after the first count items - how Fusion drops a preview's features"""
+        for timelineObject in reversed(self._items[count:]):
+            if timelineObject.entity is not None:
+                timelineObject.entity.deleteMe()
+        del self._items[count:]
+        self.markerPosition = min(self.markerPosition, count)
+        self.timelineGroups._items = [
+            group for group in self.timelineGroups._items if all(member in self._items for member in group.members)
+        ]
+
+
+class _Feature(Base):
+    def __init__(self, component: "Component", name: str) -> None:
+        self._component = component
+        self.name = name
+        self._isValid = True
+        self._attributes = None
+        self.healthState = FeatureHealthStates.HealthyFeatureHealthState
+        self.errorOrWarningMessage = ""
+        self.timelineObject = _design().timeline._add(self)
+
+    @property
+    def isValid(self) -> bool:
+        return self._isValid
+
+    @property
+    def parentComponent(self) -> "Component":
+        return self._component
+
+    @property
+    def attributes(self) -> core.Attributes:
+        if self._attributes is None:
+            self._attributes = core.Attributes(lambda: self, _design()._attributeRegistry)
+        return self._attributes
+
+    def deleteMe(self) -> bool:
+        self._isValid = False
+        if self._attributes is not None:
+            [attribute.deleteMe() for attribute in list(self._attributes)]  #findAttributes doesn't find them any more
+        return True
+
+
+class BaseFeature(_Feature):
+    _classType = "adsk::fusion::BaseFeature"
+
+    def __init__(self, component: "Component", name: str) -> None:
+        super().__init__(component, name)
+        self._bodies: List[_BodyData] = []
+        self.isEditing = False
+
+    def startEdit(self) -> bool:
+        self.isEditing = True
+        return True
+
+    def finishEdit(self) -> bool:
+        self.isEditing = False
+        return True
+
+    @property
+    def bodies(self) -> Collection:
+        return Collection(BRepBody(b, 0) for b in self._bodies if b.isValid)
+
+    @property
+    def sourceBodies(self) -> Collection:
+        """all bodies the base feature was created with - later combines don't remove them at this timeline position"""
+        return Collection(BRepBody(b, 0) for b in self._bodies)
+
+    def deleteMe(self) -> bool:
+        for body in self._bodies:
+            BRepBody(body, 0).deleteMe()
+        return super().deleteMe()
+
+    def updateBody(self, body: BRepBody, newBody: BRepBody) -> bool:
+        body._bodyData.primitives = [_copyPrimitive(p) for p in newBody._bodyData.primitives]
+        return True
+
+
+class BaseFeatures(Collection):
+    def __init__(self, component: "Component") -> None:
+        super().__init__()
+        self._component = component
+
+    def add(self) -> BaseFeature:
+        feature = BaseFeature(self._component, f"Base Feature{len(self._items) + 1}")
+        self._items.append(feature)
+        return feature
+
+
+class CombineFeatureInput(Base):
+    _classType = "adsk::fusion::CombineFeatureInput"
+
+    def __init__(self, targetBody: BRepBody, toolBodies: ObjectCollection) -> None:
+        self.targetBody = targetBody
+        self.toolBodies = toolBodies
+        self.isKeepToolBodies = False
+        self.isNewComponent = False
+        self.operation = FeatureOperations.JoinFeatureOperation
+
+
+class CombineFeature(_Feature):
+    _classType = "adsk::fusion::CombineFeature"
+
+    def __init__(self, component: "Component", name: str) -> None:
+        super().__init__(component, name)
+        self._cuts: List[Tuple[_BodyData, List[dict]]] = []
+
+    def deleteMe(self) -> bool:
+        for target, cut in self._cuts:
+            target.cuts.remove(cut)
+        self._cuts = []
+        return super().deleteMe()
+
+
+class CombineFeatures(Collection):
+    def __init__(self, component: "Component") -> None:
+        super().__init__()
+        self._component = component
+
+    def createInput(self, targetBody: BRepBody, toolBodies: ObjectCollection) -> CombineFeatureInput:
+        return CombineFeatureInput(targetBody, toolBodies)
+
+    def add(self, input: CombineFeatureInput) -> CombineFeature:
+        target = input.targetBody._bodyData
+        stats = TemporaryBRepManager.get().stats
+        stats["cuts"] += 1
+        stats["cutWork"] += target.faceCount() + sum(tool._bodyData.faceCount() for tool in input.toolBodies)
+        feature = CombineFeature(self._component, f"Combine{len(self._items) + 1}")
+        for tool in input.toolBodies:
+            cut = list(tool._bodyData.primitives)
+            target.cuts.append(cut)
+            feature._cuts.append((target, cut))
+            if not input.isKeepToolBodies:
+                tool.deleteMe()
+        self._items.append(feature)
+        return feature
+
+
+class HoleFeatureInput(Base):
+    _classType = "adsk::fusion::HoleFeatureInput"
+
+    def __init__(self, holeDiameter: core.ValueInput) -> None:
+        self.holeDiameter = holeDiameter
+        self.tipAngle = core.ValueInput.createByString("118 deg")
+        self.participantBodies: List[BRepBody] = []
+        self._points: List["SketchPoint"] = []
+        self._depth: Optional[core.ValueInput] = None
+
+    def setPositionBySketchPoints(self, sketchPoints: ObjectCollection) -> bool:
+        self._points = list(sketchPoints)
+        return True
+
+    def setDistanceExtent(self, distance: core.ValueInput) -> bool:
+        self._depth = distance
+        return True
+
+
+class HoleFeature(_Feature):
+    _classType = "adsk::fusion::HoleFeature"
+
+    def __init__(self, component: "Component", name: str) -> None:
+        super().__init__(component, name)
+        self._cuts: List[Tuple[_BodyData, List[dict]]] = []
+
+    def deleteMe(self) -> bool:
+        for target, cut in self._cuts:
+            target.cuts.remove(cut)
+        self._cuts = []
+        return super().deleteMe()
+
+
+class HoleFeatures(Collection):
+    def __init__(self, component: "Component") -> None:
+        super().__init__()
+        self._component = component
+
+    def createSimpleInput(self, holeDiameter: core.ValueInput) -> HoleFeatureInput:
+        return HoleFeatureInput(holeDiameter)
+
+    def add(self, input: HoleFeatureInput) -> HoleFeature:
+        """every hole is drilled straight down into its sketch face - recorded as a cylinder cut from the participants"""
+        radius = input.holeDiameter.value / 2
+        depth = input._depth.value
+        holes = []
+        for point in input._points:
+            normal = point.parentSketch._face.geometry.normal
+            start = point.geometry.asArray()
+            holes.append({
+                "type": "cylinder",
+                "pointOne": tuple(start),
+                "radiusOne": radius,
+                "pointTwo": tuple(c - n * depth for c, n in zip(start, normal.asArray())),
+                "radiusTwo": radius,
+            })
+
+        feature = HoleFeature(self._component, f"Hole{len(self._items) + 1}")
+        stats = TemporaryBRepManager.get().stats
+        stats["holeFeatures"] += 1
+        stats["holes"] += len(holes)
+        for body in input.participantBodies:
+            target = body._bodyData
+            stats["cutWork"] += target.faceCount() + 3 * len(holes)
+            for hole in holes:
+                cut = [hole]
+                target.cuts.append(cut)
+                feature._cuts.append((target, cut))
+        self._items.append(feature)
+        return feature
+
+
+class Features(Base):
+    _classType = "adsk::fusion::Features"
+
+    def __init__(self, component: "Component") -> None:
+        self.baseFeatures = BaseFeatures(component)
+        self.combineFeatures = CombineFeatures(component)
+        self.holeFeatures = HoleFeatures(component)
+
+
+class SketchPoint(Base):
+    _classType = "adsk::fusion::SketchPoint"
+
+    def __init__(self, sketch: "Sketch", geometry: Point3D) -> None:
+        self.parentSketch = sketch
+        self.geometry = geometry
+
+    @property
+    def worldGeometry(self) -> Point3D:
+        return self.geometry.copy()
+
+
+class SketchPoints(Collection):
+    def __init__(self, sketch: "Sketch") -> None:
+        super().__init__()
+        self._sketch = sketch
+
+    def add(self, point: Point3D) -> SketchPoint:
+        sketchPoint = SketchPoint(self._sketch, point.copy())
+        self._items.append(sketchPoint)
+        return sketchPoint
+
+
+class Sketch(_Feature):
+    """sketch space is model space here - the face only gives the drilling direction"""
+
+    _classType = "adsk::fusion::Sketch"
+
+    def __init__(self, component: "Component", name: str, face: BRepFace) -> None:
+        super().__init__(component, name)
+        self._face = face
+        self.sketchPoints = SketchPoints(self)
+
+    @property
+    def referencePlane(self) -> BRepFace:
+        return self._face
+
+    def modelToSketchSpace(self, point: Point3D) -> Point3D:
+        return point.copy()
+
+    def sketchToModelSpace(self, point: Point3D) -> Point3D:
+        return point.copy()
+
+
+class Sketches(Collection):
+    def __init__(self, component: "Component") -> None:
+        super().__init__()
+        self._component = component
+
+    def add(self, planarEntity: BRepFace) -> Sketch:
+        sketch = Sketch(self._component, f"Sketch{len(self._items) + 1}", planarEntity)
+        self._items.append(sketch)
+        return sketch
+
+
+class CustomGraphicsCoordinates(Base):
+    _classType = "adsk::fusion::CustomGraphicsCoordinates"
+
+    def __init__(self, coordinates: List[float]) -> None:
+        self.coordinates = list(coordinates)
+
+    @staticmethod
+    def create(coordinates: List[float]) -> "CustomGraphicsCoordinates":
+        return CustomGraphicsCoordinates(coordinates)
+
+    @property
+    def coordinateCount(self) -> int:
+        return len(self.coordinates) // 3
+
+
+class CustomGraphicsSolidColorEffect(Base):
+    _classType = "adsk::fusion::CustomGraphicsSolidColorEffect"
+
+    def __init__(self, color: core.Color) -> None:
+        self.color = color
+
+    @staticmethod
+    def create(color: core.Color) -> "CustomGraphicsSolidColorEffect":
+        return CustomGraphicsSolidColorEffect(color)
+
+
+class CustomGraphicsEntity(Base):
+    def __init__(self, group: "CustomGraphicsGroup", work: int) -> None:
+        self.parentGroup = group
+        self.color = None
+        self.id = ""
+        self.isSelectable = True
+        self.isVisible = True
+        self._isValid = True
+        stats = TemporaryBRepManager.get().stats
+        stats["graphics"] += 1
+        stats["graphicsWork"] += work
+
+    @property
+    def isValid(self) -> bool:
+        return self._isValid and self.parentGroup.isValid
+
+    def deleteMe(self) -> bool:
+        self._isValid = False
+        self.parentGroup._items.remove(self)
+        return True
+
+
+class CustomGraphicsBRepBody(CustomGraphicsEntity):
+    _classType = "adsk::fusion::CustomGraphicsBRepBody"
+
+    def __init__(self, group: "CustomGraphicsGroup", body: BRepBody) -> None:
+        super().__init__(group, body._bodyData.faceCount())
+        self.body = body
+
+
+class CustomGraphicsMesh(CustomGraphicsEntity):
+    _classType = "adsk::fusion::CustomGraphicsMesh"
+
+    def __init__(self, group: "CustomGraphicsGroup", coordinates: CustomGraphicsCoordinates, indexList: List[int]) -> None:
+        super().__init__(group, len(indexList) // 3)
+        self.coordinates = coordinates
+        self.vertexIndexList = list(indexList)
+
+
+class CustomGraphicsLines(CustomGraphicsEntity):
+    _classType = "adsk::fusion::CustomGraphicsLines"
+
+    def __init__(self, group: "CustomGraphicsGroup", coordinates: CustomGraphicsCoordinates, indexList: List[int], isLineStrip: bool) -> None:
+        count = len(indexList) if indexList else coordinates.coordinateCount
+        super().__init__(group, count - 1 if isLineStrip else count // 2)
+        self.coordinates = coordinates
+        self.indexList = list(indexList)
+        self.isLineStrip = isLineStrip
+
+
+class CustomGraphicsGroup(Collection):
+    _classType = "adsk::fusion::CustomGraphicsGroup"
+
+    def __init__(self, groups: "CustomGraphicsGroups") -> None:
+        super().__init__()
+        self._groups = groups
+        self._isValid = True
+        self.id = ""
+
+    @property
+    def isValid(self) -> bool:
+        return self._isValid
+
+    def _add(self, entity: CustomGraphicsEntity) -> CustomGraphicsEntity:
+        self._items.append(entity)
+        return entity
+
+    def addBRepBody(self, body: BRepBody) -> CustomGraphicsBRepBody:
+        return self._add(CustomGraphicsBRepBody(self, body))
+
+    def addMesh(
+        self, coordinates: CustomGraphicsCoordinates, coordinateIndexList: List[int], normalVectors: List[float], normalIndexList: List[int]
+    ) -> CustomGraphicsMesh:
+        return self._add(CustomGraphicsMesh(self, coordinates, coordinateIndexList))
+
+    def addLines(
+        self, coordinates: CustomGraphicsCoordinates, indexList: List[int], isLineStrip: bool, lineStripLengths: List[int] = None
+    ) -> CustomGraphicsLines:
+        return self._add(CustomGraphicsLines(self, coordinates, indexList, isLineStrip))
+
+    def deleteMe(self) -> bool:
+        self._isValid = False
+        self._groups._items.remove(self)
+        return True
+
+
+class CustomGraphicsGroups(Collection):
+    def add(self) -> CustomGraphicsGroup:
+        group = CustomGraphicsGroup(self)
+        self._items.append(group)
+        return group
+
+
+class BRepBodies(Collection):
+    def __init__(self, component: "Component") -> None:
+        super().__init__()
+        self._component = component
+
+    def item(self, index: int) -> BRepBody:
+        return BRepBody(self._items[index], 0)
+
+    def __iter__(self):
+        return (BRepBody(b, 0) for b in list(self._items))
+
+    def __getitem__(self, index):
+        return self.item(index)
+
+    def itemByName(self, name: str) -> Optional[BRepBody]:
+        for body in self:
+            if body.name == name:
+                return body
+        return None
+
+    def add(self, body: BRepBody, baseFeature: BaseFeature = None) -> BRepBody:
+        data = body._bodyData.copy()
+        data.isTemporary = False
+        return self._add(data, baseFeature)
+
+    def _add(self, data: _BodyData, baseFeature: BaseFeature = None) -> BRepBody:
+        data.component = self._component
+        self._items.append(data)
+        if baseFeature:
+            baseFeature._bodies.append(data)
+        return BRepBody(data, 0)
+
+
+class Occurrence(Base):
+    _classType = "adsk::fusion::Occurrence"
+
+    def __init__(self, component: "Component", name: str, transform: Matrix3D) -> None:
+        self._uid = next(_uids)
+        self.component = component
+        self.name = name
+        self._transform = transform.copy()
+        self._attributes = None
+
+    def __eq__(self, other):
+        return other is self
+
+    def __hash__(self):
+        return hash(self._uid)
+
+    @property
+    def transform2(self) -> Matrix3D:
+        return self._transform
+
+    @property
+    def transform(self) -> Matrix3D:
+        return self._transform.copy()
+
+    @property
+    def entityToken(self) -> str:
+        return f"o{self._uid}"
+
+    @property
+    def assemblyContext(self):
+        return None
+
+    @property
+    def nativeObject(self):
+        return None
+
+    @property
+    def bRepBodies(self) -> Collection:
+        return Collection(BRepBody(b, 0, self) for b in self.component.bRepBodies._items)
+
+    @property
+    def attributes(self) -> core.Attributes:
+        if self._attributes is None:
+            self._attributes = core.Attributes(lambda: self, _design()._attributeRegistry)
+        return self._attributes
+
+
+class Occurrences(Collection):
+    def __init__(self, component: "Component") -> None:
+        super().__init__()
+        self._component = component
+
+    def addNewComponent(self, transform: Matrix3D) -> Occurrence:
+        component = Component(_design(), f"Component{len(_design()._components)}")
+        return self.addExistingComponent(component, transform)
+
+    def addExistingComponent(self, component: "Component", transform: Matrix3D) -> Occurrence:
+        occurrence = Occurrence(component, f"{component.name}:{len(self._items) + 1}", transform)
+        self._items.append(occurrence)
+        _design()._occurrences[occurrence._uid] = occurrence
+        return occurrence
+
+
+class Component(Base):
+    _classType = "adsk::fusion::Component"
+
+    def __init__(self, design: "Design", name: str) -> None:
+        self._uid = next(_uids)
+        self.name = name
+        self.parentDesign = design
+        self.bRepBodies = BRepBodies(self)
+        self.features = Features(self)
+        self.sketches = Sketches(self)
+        self.occurrences = Occurrences(self)
+        self.customGraphicsGroups = CustomGraphicsGroups()
+        self._attributes = None
+        design._components.append(self)
+
+    def __eq__(self, other):
+        return other is self
+
+    def __hash__(self):
+        return hash(self._uid)
+
+    @property
+    def entityToken(self) -> str:
+        return f"c{self._uid}"
+
+    @property
+    def attributes(self) -> core.Attributes:
+        if self._attributes is None:
+            self._attributes = core.Attributes(lambda: self, _design()._attributeRegistry)
+        return self._attributes
+
+    def findBRepUsingPoint(self, point: Point3D, entityType: int, proximityTolerance: float = -1.0, visibleEntitiesOnly: bool = True) -> ObjectCollection:
+        tolerance = 1e-6 if proximityTolerance < 0 else proximityTolerance
+        result = ObjectCollection()
+        for body in self.bRepBodies:
+            if entityType == BRepEntityTypes.BRepBodyEntityType:
+                if body.boundingBox.contains(point):
+                    result.add(body)
+            elif entityType == BRepEntityTypes.BRepFaceEntityType:
+                for face in body.faces:
+                    plane = face.geometry
+                    if abs(plane.normal.dotProduct(plane.origin.vectorTo(point))) < tolerance:
+                        result.add(face)
+            elif entityType == BRepEntityTypes.BRepEdgeEntityType:
+                for edge in body.edges:
+                    start, end = edge.startVertex.geometry, edge.endVertex.geometry
+                    if abs(start.distanceTo(point) + point.distanceTo(end) - edge.length) < tolerance:
+                        result.add(edge)
+        return result
+
+
+class Design(Base):
+    _classType = "adsk::fusion::Design"
+
+    def __init__(self) -> None:
+        self._components: List[Component] = []
+        self._occurrences: Dict[int, Occurrence] = {}
+        self._attributeRegistry: List[core.Attribute] = []
+        self.recomputeCount = 0  # stand-in only - number of timeline recomputes
+        self._isComputeDeferred = False
+        self._recomputePending = False
+        self.designType = DesignTypes.ParametricDesignType
+        self.unitsManager = UnitsManager()
+        self.fusionUnitsManager = self.unitsManager
+        self.timeline = Timeline()
+        self.rootComponent = Component(self, "root")
+        self.workspaces = core.Application.get().userInterface.workspaces
+
+    def _recompute(self, markerPosition: int):
+        if self._isComputeDeferred:
+            self._recomputePending = True
+            return
+        self.recomputeCount += 1
+
+    @property
+    def isComputeDeferred(self) -> bool:
+        return self._isComputeDeferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, value: bool):
+        self._isComputeDeferred = bool(value)
+        if not value and self._recomputePending:
+            self._recomputePending = False
+            self.recomputeCount += 1  #everything deferred is computed in one go
+
+    @property
+    def allComponents(self) -> Collection:
+        return Collection(self._components)
+
+    def findAttributes(self, groupName: str, attributeName: str) -> List[core.Attribute]:
+        return core.findAttributes(self._attributeRegistry, groupName, attributeName)
+
+    def findEntityByToken(self, entityToken: str) -> list:
+        context = None
+        if "|" in entityToken:
+            occurrenceToken, entityToken = entityToken.split("|")
+            context = self._occurrences.get(int(occurrenceToken[1:]))
+        bodyToken, _, entityPart = entityToken.partition(":")
+        uid = int(bodyToken[1:])
+        for component in self._components:
+            for data in component.bRepBodies._items:
+                if data.uid != uid:
+                    continue
+                if not entityPart:
+                    return [BRepBody(data, 0, context)]
+                kind = {"f": BRepFace, "e": BRepEdge, "v": BRepVertex}[entityPart[0]]
+                return [kind(data, int(entityPart[1:]), context)]
+        return []
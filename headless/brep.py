@@ -0,0 +1,197 @@
+"""Builds in-memory B-rep solids for the headless adsk stand-in
+
+Solids are described face by face: each face is a list of planar loops of 3D points, the outer loop first.
+Outer loops run counter clockwise seen from outside the body, inner loops clockwise - same convention as Fusion.
+Vertices are shared by position and edges by vertex pair, so adjacency falls out of the loops.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+from adsk import core, fusion
+
+Vec = Tuple[float, float, float]
+Point2D = Tuple[float, float]
+Loop = Sequence[Vec]
+
+
+def newellNormal(loop: Loop) -> Vec:
+    nx = ny = nz = 0.0
+    for (x0, y0, z0), (x1, y1, z1) in zip(loop, list(loop[1:]) + [loop[0]]):
+        nx += (y0 - y1) * (z0 + z1)
+        ny += (z0 - z1) * (x0 + x1)
+        nz += (x0 - x1) * (y0 + y1)
+    return (nx, ny, nz)
+
+
+def _length(v: Vec) -> float:
+    return math.sqrt(sum(c * c for c in v))
+
+
+def _pointOnFace(loop: Loop, normal: Vec) -> Vec:
+    """point just inside the outer loop, next to its first convex vertex"""
+    count = len(loop)
+    for i in range(count):
+        prev, vertex, following = loop[i - 1], loop[i], loop[(i + 1) % count]
+        a = tuple(p - v for p, v in zip(prev, vertex))
+        b = tuple(f - v for f, v in zip(following, vertex))
+        turn = (
+            (-a[1]) * b[2] - (-a[2]) * b[1],
+            (-a[2]) * b[0] - (-a[0]) * b[2],
+            (-a[0]) * b[1] - (-a[1]) * b[0],
+        )
+        if sum(t * n for t, n in zip(turn, normal)) > 0:
+            step = 0.01 * min(_length(a), _length(b))
+            return tuple(
+                v + step * (ac / _length(a) + bc / _length(b)) for v, ac, bc in zip(vertex, a, b)
+            )
+    return loop[0]
+
+
+def solidFromFaces(faces: Sequence[Sequence[Loop]], name: str = "Body") -> fusion._BodyData:
+    body = fusion._BodyData(name, False)
+    vertexIndex = {}
+    edgeIndex = {}
+
+    def vertex(point: Vec) -> int:
+        key = tuple(round(c, 9) for c in point)
+        if key not in vertexIndex:
+            vertexIndex[key] = len(body.vertices)
+            body.vertices.append(fusion._VertexData(tuple(float(c) for c in point)))
+        return vertexIndex[key]
+
+    for loops in faces:
+        outer = loops[0]
+        newell = newellNormal(outer)
+        length = _length(newell)
+        normal = tuple(c / length for c in newell)
+        area = length / 2 - sum(_length(newellNormal(inner)) / 2 for inner in loops[1:])
+        faceIdx = len(body.faces)
+        face = fusion._FaceData(normal, _pointOnFace(outer, normal), area)
+        body.faces.append(face)
+
+        for loopNumber, points in enumerate(loops):
+            loopIdx = len(body.loops)
+            loop = fusion._LoopData(faceIdx, loopNumber == 0)
+            body.loops.append(loop)
+            face.loops.append(loopIdx)
+            indices = [vertex(p) for p in points]
+            for start, end in zip(indices, indices[1:] + indices[:1]):
+                key = (min(start, end), max(start, end))
+                if key not in edgeIndex:
+                    edgeIndex[key] = len(body.edges)
+                    body.edges.append(fusion._EdgeData(start, end))
+                    body.vertices[start].edges.append(edgeIndex[key])
+                    body.vertices[end].edges.append(edgeIndex[key])
+                edgeIdx = edgeIndex[key]
+                coEdgeIdx = len(body.coEdges)
+                body.coEdges.append(
+                    fusion._CoEdgeData(edgeIdx, loopIdx, body.edges[edgeIdx].start != start)
+                )
+                body.edges[edgeIdx].coEdges.append(coEdgeIdx)
+                loop.coEdges.append(coEdgeIdx)
+
+    return body
+
+
+def addSolid(component: fusion.Component, faces: Sequence[Sequence[Loop]], name: str = "Body") -> fusion.BRepBody:
+    return component.bRepBodies._add(solidFromFaces(faces, name))
+
+
+# ==============================================================================
+#   Pocketed plates
+# ==============================================================================
+
+
+@dataclass
+class Pocket:
+    """A pocket cut down from its parent level - polygon is counter clockwise seen from the top"""
+
+    polygon: List[Point2D]
+    depth: float  # measured from the top of the plate
+    children: List["Pocket"] = field(default_factory=list)
+
+
+def rectangle(x: float, y: float, width: float, length: float) -> List[Point2D]:
+    return [(x, y), (x + width, y), (x + width, y + length), (x, y + length)]
+
+
+def _wall(a: Point2D, b: Point2D, zTop: float, zBottom: float) -> List[Vec]:
+    """wall under polygon edge a->b, facing left of the edge (ie into the polygon)"""
+    return [(a[0], a[1], zTop), (b[0], b[1], zTop), (b[0], b[1], zBottom), (a[0], a[1], zBottom)]
+
+
+def _edges(polygon: List[Point2D]):
+    return zip(polygon, polygon[1:] + polygon[:1])
+
+
+def pocketPlateFaces(outline: List[Point2D], thickness: float, pockets: Sequence[Pocket]) -> List[List[List[Vec]]]:
+    """faces of a plate with its bottom at z=0, top at z=thickness, with pockets cut down from the top"""
+    faces = []
+    throughHoles = []
+
+    def at(polygon: List[Point2D], z: float, reverse: bool = False) -> List[Vec]:
+        loop = [(x, y, z) for x, y in polygon]
+        return loop[::-1] if reverse else loop
+
+    def addPocket(pocket: Pocket, zTop: float):
+        zBottom = thickness - pocket.depth
+        for a, b in _edges(pocket.polygon):
+            faces.append([_wall(a, b, zTop, zBottom)])
+        if zBottom <= 1e-9:
+            throughHoles.append(pocket.polygon)
+            return
+        faces.append(
+            [at(pocket.polygon, zBottom)]
+            + [at(child.polygon, zBottom, reverse=True) for child in pocket.children]
+        )
+        for child in pocket.children:
+            addPocket(child, zBottom)
+
+    faces.append([at(outline, thickness)] + [at(p.polygon, thickness, reverse=True) for p in pockets])
+    for a, b in _edges(outline):
+        faces.append([[(a[0], a[1], 0.0), (b[0], b[1], 0.0), (b[0], b[1], thickness), (a[0], a[1], thickness)]])
+    for pocket in pockets:
+        addPocket(pocket, thickness)
+    # bottom face is seen from below - outer loop reversed, through holes run counter clockwise from the top
+    faces.append([at(outline, 0.0, reverse=True)] + [at(hole, 0.0) for hole in throughHoles])
+    return faces
+
+
+def addPocketPlate(
+    component: fusion.Component,
+    outline: List[Point2D],
+    thickness: float,
+    pockets: Sequence[Pocket],
+    name: str = "Plate",
+) -> fusion.BRepBody:
+    return addSolid(component, pocketPlateFaces(outline, thickness, pockets), name)
+
+
+# ==============================================================================
+#   Design set up
+# ==============================================================================
+
+
+def newDesign() -> fusion.Design:
+    """starts a fresh active design and resets the temporary B-rep stats"""
+    app = core.Application.get()
+    app.userInterface.messages.clear()
+    app.userInterface.activeSelections.clear()
+    app.activeProduct = fusion.Design()
+    fusion.TemporaryBRepManager.get().resetStats()
+    return app.activeProduct
+
+
+def addOccurrence(component: fusion.Component, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> fusion.Occurrence:
+    """adds an occurrence of component to the root component, translated by x, y, z"""
+    transform = core.Matrix3D.create()
+    transform.translation = core.Vector3D.create(x, y, z)
+    return core.Application.get().activeProduct.rootComponent.occurrences.addExistingComponent(
+        component, transform
+    )
+
+
+def newComponent(name: str) -> fusion.Component:
+    component = fusion.Component(core.Application.get().activeProduct, name)
+    return component
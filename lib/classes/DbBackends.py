@@ -0,0 +1,387 @@
+"""Tool generation backends - how the dogbones of one component are turned into cuts
+
+Temporary B-rep backends hand tool bodies to the base feature and combine cut, the hole feature backend
+cuts the bodies with hole features directly. chooseBackend picks one per component, Auto estimates the
+cost of each tool body backend from the edge count, corner types and how many dogbones share a start plane and depth.
+"""
+import itertools
+import logging
+import math
+import time
+from collections import defaultdict
+from functools import reduce
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import adsk.core
+import adsk.fusion
+
+from .DbToolCache import PreviewCache, ToolBodyCache, ToolSpec, mergeCoaxial
+from .DbStages import UNION, stageKey
+from ..utils import (
+    Vec,
+    TOLERANCE,
+    vecAdd,
+    vecSub,
+    vecScale,
+    vecDot,
+    vecLength,
+    vecRound,
+    apiPhase,
+    getFaceNormal,
+    Loop,
+    circleProfile,
+    keyholeProfile,
+    extrudeProfiles,
+    mergeToolBodies,
+    getToolBodyCount,
+)
+from ...constants import AUTO_BACKEND, CYLINDER_BACKEND, EXTRUSION_BACKEND, HOLE_BACKEND, CONSOLIDATED_OUTPUT
+
+logger = logging.getLogger("dogbone.DbBackends")
+
+BATCH_MIN_GROUP = 4  # dogbones on the same start plane, same depth - from this many on they're extruded as one profile
+
+# relative costs for the Auto heuristic - roughly what each step takes in the modelling kernel
+INSTANCE_COST = 1.0  # copy and transform of a template
+UNION_COST = 3.0  # one temporary boolean, to join a tool body to its neighbours
+PROFILE_COST = 2.0  # one BRepBodyDefinition body
+FACE_COST = 0.1  # per face of a body definition
+HOLE_FEATURE_COST = 25.0  # sketch plus hole feature in the timeline
+HOLE_COST = 0.5  # per hole position
+
+
+def _planeKey(spec: ToolSpec) -> Hashable:
+    """dogbones with the same key start on the same plane and run the same depth in the same direction"""
+    zAxis = spec.zAxis
+    return (vecRound(zAxis), round(vecDot(spec.start, zAxis), 6), round(spec.height, 6))
+
+
+def planeGroups(specs: Sequence[ToolSpec]) -> List[List[ToolSpec]]:
+    groups = defaultdict(list)
+    for spec in specs:
+        groups[_planeKey(spec)].append(spec)
+    return list(groups.values())
+
+
+def _reach(spec: ToolSpec) -> float:
+    """radius around the hole centre that holds the whole outline"""
+    return spec.radius + max(spec.boxLength, 0.0)
+
+
+def _outline(spec: ToolSpec, origin: Vec, xAxis: Vec, yAxis: Vec) -> Loop:
+    """spec's tool body seen down its centre line, in the plane frame given by origin and axes"""
+    offset = vecSub(spec.start, origin)
+    centre = (vecDot(offset, xAxis), vecDot(offset, yAxis))
+    if not spec.boxLength:
+        return circleProfile(centre, spec.radius)
+    direction = (vecDot(spec.bisector, xAxis), vecDot(spec.bisector, yAxis))
+    return keyholeProfile(spec.radius, spec.boxLength, direction, centre)
+
+
+def _outlineFaces(spec: ToolSpec) -> int:
+    """faces of the extruded outline - 2 caps plus a side per segment"""
+    if not spec.boxLength:
+        return 4
+    return 6 if spec.boxLength >= spec.radius - TOLERANCE else 8
+
+
+def disjointLayers(specs: List[ToolSpec]) -> List[List[ToolSpec]]:
+    """
+    splits specs that share a start plane into layers whose outlines are well apart - lumps of one body mustn't touch
+    greedy, with the specs hashed into a grid of cells at least as big as any 2 reaches, so it stays linear
+    """
+    layers = []
+    pending = specs
+    while pending:
+        cellSize = 2 * max(_reach(spec) for spec in pending)
+        cells = defaultdict(list)
+        layer, rest = [], []
+        for spec in pending:
+            cell = tuple(math.floor(c / cellSize) for c in spec.start)
+            neighbours = (
+                other
+                for offset in itertools.product((-1, 0, 1), repeat=3)
+                for other in cells.get(tuple(c + o for c, o in zip(cell, offset)), ())
+            )
+            if any(vecLength(vecSub(spec.start, other.start)) < _reach(spec) + _reach(other) + TOLERANCE for other in neighbours):
+                rest.append(spec)
+            else:
+                layer.append(spec)
+                cells[cell].append(spec)
+        layers.append(layer)
+        pending = rest
+    return layers
+
+
+def extrudeLayer(specs: List[ToolSpec]) -> Optional[adsk.fusion.BRepBody]:
+    """one tool body for specs on the same plane, apart from each other - all outlines in one profile, extruded once"""
+    frame = specs[0]
+    origin, xAxis, yAxis = frame.start, frame.xAxis, frame.yAxis
+    body = extrudeProfiles([_outline(spec, origin, xAxis, yAxis) for spec in specs], [frame.height] * len(specs))
+    if body:
+        adsk.fusion.TemporaryBRepManager.get().transform(body, frame.transform())
+    return body
+
+
+class ToolBackend:
+    """
+    Turns the tool specs of one component - after the coaxial merge - into cuts
+    makesToolBodies backends implement toolBodies, the others cut the target bodies themselves
+    """
+
+    name = ""
+    makesToolBodies = True
+    isAutomatic = True  # considered by Auto
+
+    def supports(self, specs: Sequence[ToolSpec], faces: Sequence[adsk.fusion.BRepFace]) -> bool:
+        """faces are the planar faces (native) the dogbones may start on"""
+        return bool(specs)
+
+    def cost(self, specs: Sequence[ToolSpec]) -> float:
+        raise NotImplementedError
+
+    def toolBodies(self, specs: Sequence[ToolSpec], cache: ToolBodyCache) -> Tuple[List[adsk.fusion.BRepBody], List[Vec]]:
+        """
+        returns (bodies, centres) - centres are the corner points (mean for a body holding several dogbones),
+        for spatial grouping of the union
+        single dogbones are cache.instance copies - cache can also be a PreviewCache
+        """
+        raise NotImplementedError
+
+    def cut(
+        self,
+        specs: Sequence[ToolSpec],
+        faces: Sequence[adsk.fusion.BRepFace],
+        component: adsk.fusion.Component,
+        targetBodies: Sequence[adsk.fusion.BRepBody],
+    ) -> list:
+        """cuts the dogbones straight into targetBodies - returns the features made"""
+        raise NotImplementedError
+
+
+class CylinderBackend(ToolBackend):
+    """every dogbone is a copy of a cached template - cylinder, or keyhole for acute corners"""
+
+    name = CYLINDER_BACKEND
+
+    def cost(self, specs: Sequence[ToolSpec]) -> float:
+        return len(specs) * (INSTANCE_COST + UNION_COST)
+
+    @apiPhase("getToolBody")
+    def toolBodies(self, specs: Sequence[ToolSpec], cache: ToolBodyCache) -> Tuple[List[adsk.fusion.BRepBody], List[Vec]]:
+        return [cache.instance(spec) for spec in specs], [spec.centre for spec in specs]
+
+
+class ExtrusionBackend(CylinderBackend):
+    """
+    dogbones sharing a start plane and depth are extruded together as one planar profile, once there are
+    BATCH_MIN_GROUP of them - replaces N template copies and N-1 unions. Smaller groups are template copies
+    """
+
+    name = EXTRUSION_BACKEND
+
+    def cost(self, specs: Sequence[ToolSpec]) -> float:
+        cost = 0.0
+        for group in planeGroups(specs):
+            if len(group) < BATCH_MIN_GROUP:
+                cost += super().cost(group)
+                continue
+            cost += PROFILE_COST + UNION_COST + FACE_COST * sum(_outlineFaces(spec) for spec in group)
+        return cost
+
+    @apiPhase("getToolBody")
+    def toolBodies(self, specs: Sequence[ToolSpec], cache: ToolBodyCache) -> Tuple[List[adsk.fusion.BRepBody], List[Vec]]:
+        bodies, centres, single = [], [], []
+        for group in planeGroups(specs):
+            if len(group) < BATCH_MIN_GROUP:
+                single += group
+                continue
+            single += [spec for spec in group if spec.boxLength < 0]  #box behind the hole centre - no outline for it
+            for layer in disjointLayers([spec for spec in group if spec.boxLength >= 0]):
+                body = extrudeLayer(layer) if len(layer) >= BATCH_MIN_GROUP else None
+                if not body:
+                    single += layer
+                    continue
+                bodies.append(body)
+                centres.append(vecScale(reduce(vecAdd, (spec.centre for spec in layer)), 1 / len(layer)))
+
+        logger.debug(f"{len(specs) - len(single)} dogbones extruded as {len(bodies)} planar profiles, {len(single)} single")
+        singleBodies, singleCentres = super().toolBodies(single, cache)
+        return bodies + singleBodies, centres + singleCentres
+
+
+class HoleBackend(ToolBackend):
+    """
+    flat bottomed hole features, one per start face and depth, positioned by sketch points - no tool bodies
+    only for plain (not acute) dogbones starting on one of the faces. Hole dogbones aren't refreshed by
+    the refresh command, so Auto never picks this backend
+    """
+
+    name = HOLE_BACKEND
+    makesToolBodies = False
+    isAutomatic = False
+
+    @staticmethod
+    def _facePlanes(faces: Sequence[adsk.fusion.BRepFace]) -> Dict[Hashable, adsk.fusion.BRepFace]:
+        """start plane key (as _planeKey, without the depth) of dogbones drilled into each face"""
+        planes = {}
+        for face in faces:
+            normal = getFaceNormal(face)
+            normal.scaleBy(-1)
+            direction = tuple(normal.asArray())
+            planes.setdefault((vecRound(direction), round(vecDot(face.pointOnFace.asArray(), direction), 6)), face)
+        return planes
+
+    def supports(self, specs: Sequence[ToolSpec], faces: Sequence[adsk.fusion.BRepFace]) -> bool:
+        planes = self._facePlanes(faces)
+        return bool(specs) and all(not spec.boxLength and _planeKey(spec)[:2] in planes for spec in specs)
+
+    def cost(self, specs: Sequence[ToolSpec]) -> float:
+        depths = {(_planeKey(spec), round(spec.radius, 6)) for spec in specs}
+        return len(depths) * HOLE_FEATURE_COST + len(specs) * HOLE_COST
+
+    def cut(
+        self,
+        specs: Sequence[ToolSpec],
+        faces: Sequence[adsk.fusion.BRepFace],
+        component: adsk.fusion.Component,
+        targetBodies: Sequence[adsk.fusion.BRepBody],
+    ) -> list:
+        planes = self._facePlanes(faces)
+        holes = defaultdict(list)
+        for spec in specs:
+            key = _planeKey(spec)
+            holes[(key[:2], key[2], round(spec.radius, 9))].append(spec)
+
+        features = []
+        sketches = {}
+        for (plane, depth, radius), holeSpecs in holes.items():
+            if plane not in sketches:
+                sketches[plane] = component.sketches.add(planes[plane])
+            sketch = sketches[plane]
+            points = adsk.core.ObjectCollection.create()
+            for spec in holeSpecs:
+                points.add(sketch.sketchPoints.add(sketch.modelToSketchSpace(adsk.core.Point3D.create(*spec.start))))
+
+            holeInput = component.features.holeFeatures.createSimpleInput(adsk.core.ValueInput.createByReal(radius * 2))
+            holeInput.setPositionBySketchPoints(points)
+            holeInput.setDistanceExtent(adsk.core.ValueInput.createByReal(depth))
+            holeInput.tipAngle = adsk.core.ValueInput.createByString("180 deg")  #flat bottom, same as the tool bodies
+            holeInput.participantBodies = list(targetBodies)
+            features.append(component.features.holeFeatures.add(holeInput))
+        logger.debug(f"{len(specs)} dogbones cut as {len(features)} hole features")
+        return list(sketches.values()) + features
+
+
+BACKENDS: Dict[str, ToolBackend] = {
+    backend.name: backend for backend in (CylinderBackend(), ExtrusionBackend(), HoleBackend())
+}
+
+
+def chooseBackend(
+    name: str, specs: Sequence[ToolSpec], faces: Sequence[adsk.fusion.BRepFace] = (), toolBodiesOnly: bool = False
+) -> ToolBackend:
+    """
+    the named backend if it can do these specs, else the cheapest automatic one
+    toolBodiesOnly - for the refresh, which can only update base feature bodies
+    """
+    backend = BACKENDS.get(name)
+    if backend and (backend.makesToolBodies or not toolBodiesOnly) and backend.supports(specs, faces):
+        return backend
+    if name not in (AUTO_BACKEND, None):
+        logger.info(f"{name} can't make these dogbones - choosing automatically")
+    candidates = [backend for backend in BACKENDS.values() if backend.isAutomatic and backend.supports(specs, faces)]
+    backend = min(candidates, key=lambda backend: backend.cost(specs)) if candidates else BACKENDS[CYLINDER_BACKEND]
+    logger.debug(f"backend for {len(specs)} dogbones: {backend.name}")
+    return backend
+
+
+def mergedToolBodies(
+    backend: ToolBackend,
+    specs: List[ToolSpec],
+    occurrenceFaces: list,
+    params,
+    cache: ToolBodyCache,
+    instances: Optional[PreviewCache] = None,
+) -> List[adsk.fusion.BRepBody]:
+    """
+    tool bodies ready for the combine - the backend's, unioned as params.toolBodyMode says,
+    or copies of those made for an identical body with the same dogbones (single body components only)
+    instances - preview cache the backend copies single dogbones from instead of cache, and unions through
+    """
+    topologies = {id(faceObj.topology): faceObj.topology for faceObj in occurrenceFaces}
+    topology = next(iter(topologies.values())) if len(topologies) == 1 else None
+    variant = (backend.name, stageKey(UNION, params))
+    if topology and (bodies := cache.reusedBodies(topology, specs, variant)) is not None:
+        return bodies
+
+    bodies, centres = backend.toolBodies(specs, instances or cache)
+    toolDia = params.toolDia + params.toolDiaOffset
+    count = getToolBodyCount(params.toolBodyMode, centres, toolDia)
+    if instances and count < len(bodies):
+        treeKey = (variant, frozenset(faceObj.componentId for faceObj in occurrenceFaces))
+        bodies = instances.mergeToolBodies(treeKey, bodies, centres, count, toolDia)  #unions of unchanged edges kept from the last preview
+    else:
+        if instances:
+            instances.release(bodies)  #handed to the combine as they are
+        bodies = mergeToolBodies(bodies, centres, count)  #neighbouring tool bodies are unioned first - log n deep
+    logger.debug(f"{len(centres)} tool bodies merged into {len(bodies)} - {backend.name}, {params.toolBodyMode}")
+    if topology:
+        cache.keepBodies(topology, specs, variant, bodies)
+    return bodies
+
+
+def groupTopFaces(occurrenceFaces: list, fromTop: bool) -> Dict[int, adsk.fusion.BRepFace]:
+    """
+    top faces for "From Top Face" - per DbFace.componentId, from its first face: one per occurrence,
+    or per body outside occurrences. Empty unless fromTop
+    """
+    topFaces = {}
+    if not fromTop:
+        return topFaces
+    for faceObj in occurrenceFaces:
+        if faceObj.componentId not in topFaces:
+            topFace = topFaces[faceObj.componentId] = faceObj.topFace
+            logger.info(f"Processing holes from top face - {topFace.tempId}")
+    return topFaces
+
+
+def occurrenceToolSpecs(occurrenceFaces: list, topFaces: Dict[int, adsk.fusion.BRepFace]) -> List[ToolSpec]:
+    """tool specs of every selected edge of a component group, coaxial dogbones merged and duplicate edges dropped"""
+    return mergeCoaxial([
+        edgeObj.toolSpec(topFace=topFaces.get(faceObj.componentId))
+        for faceObj in occurrenceFaces
+        for edgeObj in faceObj.mergedSelectedEdges
+    ])
+
+
+def startFaces(occurrenceFaces: list, topFaces: Dict[int, adsk.fusion.BRepFace]) -> List[adsk.fusion.BRepFace]:
+    """native faces the dogbones of a component group start on"""
+    return list(topFaces.values()) + [faceObj.native for faceObj in occurrenceFaces]
+
+
+def compareBackends(params, selection) -> Dict[str, float]:
+    """
+    Times every backend on the current selection - seconds per backend, summed over the components it can do
+    temporary backends make and union their tool bodies, the hole backend adds its features and deletes them again
+    - nothing is left in the design. Backends that can't do any component are left out
+    """
+    timings = defaultdict(float)
+    for occurrenceFaces, _ in selection.componentGroups(params.timelineOutput == CONSOLIDATED_OUTPUT):
+        topFaces = groupTopFaces(occurrenceFaces, params.fromTop)
+        specs = occurrenceToolSpecs(occurrenceFaces, topFaces)
+        faces = startFaces(occurrenceFaces, topFaces)
+        for name, backend in BACKENDS.items():
+            if not backend.supports(specs, faces):
+                continue
+            start = time.perf_counter()
+            if backend.makesToolBodies:
+                bodies, centres = backend.toolBodies(specs, ToolBodyCache())
+                count = getToolBodyCount(params.toolBodyMode, centres, params.toolDia + params.toolDiaOffset)
+                mergeToolBodies(bodies, centres, count)
+            else:
+                targetBodies = {face.body.name: face.body for face in occurrenceFaces}
+                for entity in reversed(backend.cut(specs, faces, occurrenceFaces[0].component, list(targetBodies.values()))):
+                    entity.deleteMe()
+            timings[name] += time.perf_counter() - start
+    return dict(timings)
@@ -1,17 +1,20 @@
 """Main dogbone classes - Face Entities, Edge Entities and class for keeping a register of entities that have been selected"""
 import logging
 import traceback
-from math import tan, pi
 import json
-from typing import cast, Dict, List
+from contextlib import contextmanager, nullcontext
+from typing import cast, Dict, Hashable, List, Optional, Tuple
 
 import adsk.core
 import adsk.fusion
 
 from .DbData import DbParams
+from .DbTopology import BodyTopology, bodyTopology
+from .DbToolCache import ToolBodyCache, ToolSpec, PreviewCache
+from .DbStages import STAGES, stageKey
 from ..common.errors import FaceInvalidError, EdgeInvalidError
 from ...constants import DB_GROUP, MORTISE_DOGBONE, MINIMAL_DOGBONE
-from ..utils import getFaceNormal, getEdgeVector, getAngleBetweenFaces, messageBox, getCornerEdgesAtFace, getTranslateVectorBetweenFaces, correctedEdgeVector, getTopFace
+from ..utils import getFaceNormal, messageBox, getTranslateVectorBetweenFaces, apiPhase
 logger = logging.getLogger("dogbone.DbClasses")
 
 class Selection:
@@ -26,10 +29,85 @@ class Selection:
         self.edges: List[adsk.fusion.BRepEdge] = []
         self.faces: List[adsk.fusion.BRepFace] = []
 
+        self.topologies: Dict[int, BodyTopology] = {}  # key hash(body.entityToken) value: BodyTopology snapshot
+        self.bodySignatures: Dict[Hashable, BodyTopology] = {}  # key BodyTopology.signature - first body walked with it
+        self.toolBodyCache = ToolBodyCache()  # canonical tool bodies, shared by all edges of the selection
+        self.previewCache = PreviewCache(self.toolBodyCache)  # tool specs and bodies per edge, kept between previews
+        self.previewFaces: Dict[int, "DbFace"] = {}  # key faceId - faces with preview graphics, including removed ones
+        self.isPreview: bool = False
+        self.focus: Optional[adsk.core.Point3D] = None  # last clicked face or edge, native space - previews start drawing there
+        self.previewFingerprint: Optional[Hashable] = None  # fingerprint of the last preview that ran to the end
+
+    @contextmanager
+    def preview(self, params: DbParams):
+        """marks the run inside as a preview - it then takes tool specs and bodies from previewCache (so does a reused one, see reusePreview)"""
+        self.previewCache.start(params)
+        self.isPreview = True
+        try:
+            yield
+
+        finally:
+            self.isPreview = False
+            self.previewCache.finish()
+
+    def fingerprint(self, params: DbParams) -> Hashable:
+        """what a dogbone run depends on - the params every stage reads, and the selected edges of every face with its body signature"""
+        return (
+            tuple(stageKey(stage, params) for stage in STAGES),
+            tuple(sorted(
+                (faceObj.faceId, faceObj.topology.signature, tuple(sorted(edgeObj.edgeId for edgeObj in faceObj.selectedEdges)))
+                for faceObj in self.selectedFaces.values()
+            )),
+        )
+
+    @contextmanager
+    def reusePreview(self, params: DbParams):
+        """
+        for execute - if nothing changed since the last complete preview, the run inside takes its tool specs,
+        bodies and unions from previewCache, as the preview did. yields True if it does
+        """
+        reuse = not params.benchmark and self.previewFingerprint is not None and self.previewFingerprint == self.fingerprint(params)  #a benchmark times a run from scratch
+        self.previewFingerprint = None
+        logger.debug(f"execute {'reuses the last preview' if reuse else 'computes from scratch'}")
+        with self.preview(params) if reuse else nullcontext():
+            yield reuse
+
+    @property
+    def instances(self) -> Optional[PreviewCache]:
+        """where tool bodies are copied from in this run - the preview cache while previewing, else None (the backend's own)"""
+        return self.previewCache if self.isPreview else None
+
+    def toolSpec(self, edgeObj: "DbEdge", topFace: adsk.fusion.BRepFace = None) -> ToolSpec:
+        """edgeObj.toolSpec(topFace) - kept from an earlier preview while previewing"""
+        if self.isPreview:
+            return self.previewCache.toolSpec(edgeObj, topFace)
+        return edgeObj.toolSpec(topFace=topFace)
+
+    def componentGroups(self, consolidated: bool = False) -> List[Tuple[List["DbFace"], int]]:
+        """
+        selected faces grouped by native component - occurrences of the same component share one set of dogbones,
+        made and cut once. A native face selected in several occurrences is taken from the first one, with the edges
+        selected in any of them - see DbFace.mergedSelectedEdges
+        bodies outside occurrences are a group each, unless consolidated - then they share their component's group too
+        returns [([DbFace,...], number of occurrences), ...]
+        """
+        groups: Dict[int, Tuple[Dict[int, "DbFace"], Dict[int, int]]] = {}
+        for occurrenceFaces in self.selectedOccurrences.values():
+            if not occurrenceFaces:
+                continue
+            componentId = occurrenceFaces[0].componentId
+            key = hash(occurrenceFaces[0].component.entityToken) if consolidated else componentId
+            faces, occurrences = groups.setdefault(key, ({}, {}))
+            occurrences[componentId] = occurrences.get(componentId, 0) + 1
+            for faceObj in occurrenceFaces:
+                faces.setdefault(faceObj.nativeFaceId, faceObj)
+        return [(list(faces.values()), max(occurrences.values())) for faces, occurrences in groups.values()]
+
 
 class DbFace:
     logger = logging.getLogger("dogbone.DbFace")
 
+    @apiPhase("DbFace")
     def __init__(
             self,
             face: adsk.fusion.BRepFace,
@@ -66,12 +144,16 @@ class DbFace:
         self.commandInputsEdgeSelect = commandInputsEdgeSelect
         self._selected = True
         self._body = self._native.body #self.face.body.nativeObject if self.face.nativeObject else self.face.body
+        self.topology = bodyTopology(self._body, self.selection.topologies, self.selection.bodySignatures)  #shared by all faces of the same body
+        self._faceIdx = self.topology.faceIdx(self._native)
 
         self._associatedEdgesDict = {}  # Keyed with edge
         self.processedEdges = (
             []
         )  # used for quick checking if an edge is already included (below)
-        self._customGraphicGroup = None  #for future use
+        self._customGraphicGroup = None  #preview graphics of this face's dogbones - see showPreview
+        self._previewGraphics = {}  #key edgeId value (ToolSpec.placement, graphic) - drawn into _customGraphicGroup
+        self._previewDraw = None  #draw function of those graphics
 
         self._restoreState = restoreState
 
@@ -80,78 +162,42 @@ class DbFace:
 
         self.registerEdges()
 
+    @apiPhase("registerEdges")
     def registerEdges(self):
         # ==============================================================================
         #             this is where inside corner edges, dropping down from the face are processed
+        #             all geometry comes from the body topology snapshot - in nativeObject space
         # ==============================================================================
 
-        faceEdgesSet = {hash(edge.entityToken) for edge in self.face.edges}
-        faceVertices = [vertex for vertex in self.face.vertices]
-        allEdges = {}  #dict key:hash(entity code): BrepEdge
-
-        #populate allEdges dict with all edges associated with face vertices
-        for vertex in faceVertices:
-            allEdges.update({hash(edge.entityToken): edge for edge in vertex.edges})
-
-        candidateEdgesId = set(allEdges.keys()) - faceEdgesSet  #remove edges associated with face - just leaves corner edges
-        candidateEdges = [allEdges[edgeId] for edgeId in candidateEdgesId] #create list of corner edges
-
-        for edge in candidateEdges:
-            if not edge.isValid:
-                continue
-            if edge.isDegenerate:
-                continue
-            if edge in self.processedEdges:
+        topology = self.topology
+        candidateEdges, corners = topology.classifyCorners(self._faceIdx, self._params)  #one batch for all corner edges of the face
+        registered = {edgeObj._edgeIdx: edgeObj for edgeObj in self._associatedEdgesDict.values()}  #from before a detection mode change
+        accepted = {edgeIdx for edgeIdx, isAccepted in zip(candidateEdges, corners.isAccepted) if isAccepted}
+        self._associatedEdgesDict = {}
+        self.processedEdges = []
+
+        for edgeIdx, edgeObj in registered.items():
+            if edgeIdx not in accepted:
+                self.selection.selectedEdges.pop(edgeObj.edgeId, None)  #outside the new angle limits
+                self._removeFromEdgeInput(edgeObj.edge)
                 continue
+            self.selection.selectedEdges[edgeObj.edgeId] = self._associatedEdgesDict[edgeObj.edgeId] = edgeObj  #kept as the user left it
+            self.processedEdges.append(edgeObj.edge)
+
+        for edgeIdx in candidateEdges:
+            if edgeIdx not in accepted or edgeIdx in registered:
+                continue  #corner edge not perpendicular to face, not pointing down or outside the detection mode angle limits - or already registered
             try:
-                if edge.geometry.curveType != adsk.core.Curve3DTypes.Line3DCurveType:
-                    continue # make sure corner edge is only a straight line
-                vector: adsk.core.Vector3D = getEdgeVector(edge, refFace=self.face)
-                vector.normalize()
-                if not vector.isParallelTo(self.faceNormal):
-                    continue  #make sure corner edge is perpendicular to top face
-                if vector.isEqualTo(self.faceNormal):
-                    continue #make sure corner edge is down (face normals are always pointing out of body )
-                
-                #make sure faces adjoining corner edge are planes
-                face1, face2 = edge.faces
-                if face1.geometry.objectType != adsk.core.Plane.classType():
-                    continue
-                if face2.geometry.objectType != adsk.core.Plane.classType():
-                    continue
-
-                angle = round(getAngleBetweenFaces(edge) * 180 / pi, 3)
-                if (
-                    (abs(angle - 90) > 0.001)
-                    and not (self._params.acuteAngle or self._params.obtuseAngle)
-                    ):  
-                    continue #Angle outside tolerance and we're just doing 90 corners
-
-                if (
-                        not (self._params.minAngleLimit < angle <= 90)
-                        and self._params.acuteAngle
-                        and not self._params.obtuseAngle
-                    ):
-                    continue  #angle less than lowest limit and doing acute angles
-
-                if (
-                        not (90 <= angle < self._params.maxAngleLimit)
-                        and not self._params.acuteAngle
-                        and self._params.obtuseAngle
-                    ):
-                    continue # angle greater than max limit and doing obtuse angles
-
-                if (
-                        not (self._params.minAngleLimit < angle < self._params.maxAngleLimit)
-                        and self._params.acuteAngle
-                        and self._params.obtuseAngle
-                    ):
-                    continue #angle between min and max and doing both acute and obtuse
-
-                edgeId = hash(edge.entityToken) #this normally created by the DbEdge instantiation, but it's needed earlier (I thmk!)
-                self.selection.selectedEdges[edgeId] = self._associatedEdgesDict[ 
-                    edgeId
-                ] = DbEdge(edge=edge, parentFace=self)
+                nativeEdge = topology.edges[edgeIdx]
+                edge = (
+                    nativeEdge.createForAssemblyContext(self.face.assemblyContext)
+                    if self.face.assemblyContext
+                    else nativeEdge
+                )  #selections and edgeIds are always in the context of the selected face
+                edgeObj = DbEdge(edge=edge, parentFace=self, edgeIdx=edgeIdx)
+                self.selection.selectedEdges[edgeObj.edgeId] = self._associatedEdgesDict[
+                    edgeObj.edgeId
+                ] = edgeObj
                 self.processedEdges.append(edge)
                 self.selection.addingEdges = True
                 if not self._restoreState:
@@ -165,6 +211,18 @@ class DbFace:
                 DbFace.logger.exception(e)
                 messageBox("Failed at edge:\n{}".format(traceback.format_exc()))
 
+    def _removeFromEdgeInput(self, edge: adsk.fusion.BRepEdge):
+        """takes edge out of the edge selection input, if it's selected there"""
+        if self._restoreState or not self.commandInputsEdgeSelect:
+            return
+        edgeInput = self.commandInputsEdgeSelect
+        self.selection.addingEdges = True
+        for i in range(edgeInput.selectionCount):
+            if edgeInput.selection(i).entity.entityToken == edge.entityToken:
+                edgeInput.removeSelection(i)
+                break
+        self.selection.addingEdges = False
+
     def __hash__(self):
         return self.faceId
 
@@ -226,12 +284,13 @@ class DbFace:
         self.selection.addingEdges = False
 
     def reSelectEdges(self):
-        self.__init__(
-            face = self.face,
-            selection = self.selection,  
-            params = self._params, 
-            commandInputsEdgeSelect = self.commandInputsEdgeSelect
-        )
+        """
+        registers the corner edges again after a detection mode change - only the classification stage is redone,
+        the face keeps its topology and edges still accepted keep their DbEdge, selected or not. Newly accepted edges
+        are selected, edges no longer accepted leave the edge input
+        """
+        self._selected = True
+        self.registerEdges()
 
     @property
     def entityToken(self):
@@ -251,6 +310,40 @@ class DbFace:
     def isSelected(self):
         return self._selected
 
+    def prunePreview(self, edgeIds: set, draw):
+        """
+        deletes the preview graphics of edges that aren't in edgeIds any more - all of them if draw,
+        the function the graphics are drawn with, changed (a different level of detail)
+        """
+        if self._previewDraw is not draw or not (self._customGraphicGroup and self._customGraphicGroup.isValid):
+            self.clearPreview()  #level of detail changed, or the graphics went with an undo - nothing drawn can be kept
+            self._previewDraw = draw
+        for edgeId in set(self._previewGraphics) - edgeIds:
+            self._previewGraphics.pop(edgeId)[1].deleteMe()
+
+    def showPreview(self, edgeId: int, spec: ToolSpec, instances: PreviewCache) -> int:
+        """
+        draws the preview graphic of one dogbone into this face's group, with the draw function of the last prunePreview
+        left as it is if it's already shown. returns the number of graphics drawn
+        """
+        shown = self._previewGraphics.get(edgeId)
+        if shown and shown[0] == spec.placement:
+            instances.keep(spec)  #still shown - the body stays cached too
+            return 0
+        if shown:
+            shown[1].deleteMe()
+        if not (self._customGraphicGroup and self._customGraphicGroup.isValid):
+            self._customGraphicGroup = self._component.customGraphicsGroups.add()
+        self._previewGraphics[edgeId] = (spec.placement, self._previewDraw(self._customGraphicGroup, spec, instances))
+        return 1
+
+    def clearPreview(self):
+        if self._customGraphicGroup and self._customGraphicGroup.isValid:
+            self._customGraphicGroup.deleteMe()
+        self._customGraphicGroup = None
+        self._previewGraphics = {}
+        self._previewDraw = None
+
     @property
     def edgeIdSet(self):
         return set(self._associatedEdgesDict.keys())
@@ -263,10 +356,36 @@ class DbFace:
             if edgeObj.isSelected
         ]
     
+    @property
+    def allOccurrences(self) -> List["DbFace"]:
+        """this face as selected in every occurrence of its component - itself first"""
+        return [self] + [
+            faceObj
+            for faceObj in self.selection.selectedFaces.values()
+            if faceObj is not self and faceObj.nativeFaceId == self.nativeFaceId
+        ]
+
+    @property
+    def mergedSelectedEdges(self) -> List["DbEdge"]:
+        """
+        edges selected on this face in any of its occurrences - one per native edge, this face's own where it has it
+        selected. The occurrences share one cut, so an edge deselected here but selected elsewhere is still made
+        """
+        edges = {}
+        for faceObj in self.allOccurrences:
+            for edgeObj in faceObj.selectedEdges:
+                edges.setdefault(edgeObj.nativeEdgeId, edgeObj)
+        return list(edges.values())
+
+    def saveOccurrences(self):
+        """saves the face in every occurrence, and the merged edges it's cut with - a refresh through any of them finds the same"""
+        [faceObj.save() for faceObj in self.allOccurrences]
+        [edgeObj.save() for edgeObj in self.mergedSelectedEdges]
+
     @property
     def body(self):
         return self._body
-    
+
     @property
     def vertices(self):
         '''Returns native vertices'''
@@ -314,6 +433,22 @@ class DbFace:
             else hash(self.face.body.entityToken)
         )
 
+    @property
+    def componentId(self) -> int:
+        """
+        native component of the face - a body outside any occurrence is its own component, as in occurrenceId
+        """
+        return (
+            hash(self.face.assemblyContext.component.entityToken)
+            if self.face.assemblyContext
+            else hash(self.face.body.entityToken)
+        )
+
+    @property
+    def nativeFaceId(self) -> int:
+        """the same for this face selected in any occurrence of its component"""
+        return hash(self._native.entityToken)
+
     def removeFaceFromSelectedOccurrences(self):
         faceList = self.selection.selectedOccurrences[self.occurrenceId]
         faceList.remove(self)
@@ -322,6 +457,11 @@ class DbFace:
     def native(self):
         return self._native
 
+    @property
+    def topFace(self) -> adsk.fusion.BRepFace:
+        """top face of the body, along this face's normal - in the nativeObject context"""
+        return self.topology.faces[self.topology.topFaceIdx(self._faceIdx)]
+
     def revalidate(self) -> adsk.fusion.BRepFace:
         return cast(adsk.fusion.BRepFace, self.component.findBRepUsingPoint(
             self._refPoint, adsk.fusion.BRepEntityTypes.BRepFaceEntityType, -1.0, False
@@ -331,7 +471,8 @@ class DbFace:
 class DbEdge:
     logger = logging.getLogger("dogbone.DbEdge")
 
-    def __init__(self, edge: adsk.fusion.BRepEdge, parentFace: DbFace):
+    @apiPhase("DbEdge")
+    def __init__(self, edge: adsk.fusion.BRepEdge, parentFace: DbFace, edgeIdx: int):
 
 
         self._refPoint = edge.pointOnEdge
@@ -351,36 +492,37 @@ class DbEdge:
         self._edgeId = hash(self.entityToken)
         self._selected = True
         self._parentFace = parentFace
-        self._native = self.edge.nativeObject if self.edge.nativeObject else self.edge
-        self._component = edge.body.parentComponent
+        self._edgeIdx = edgeIdx
+        topology = self._parentFace.topology
+        self._native = topology.edges[edgeIdx]
+        self._component = self._parentFace._component
         self._params = self._parentFace._params
-        self._cornerAngle = getAngleBetweenFaces(edge)
+        self._cornerAngle = topology.cornerAngle(edgeIdx)
 
 # Everything from now on should be in the nativeObject context
 
-        edge0, edge1 = getCornerEdgesAtFace(face=self._parentFace.native, edge=self._native)
+        faceIdx = self._parentFace._faceIdx
+        edge0, edge1 = topology.cornerEdges(faceIdx, edgeIdx)
 
-        shortEdge, longEdge = (edge0, edge1) if edge0.length < edge1.length else (edge1, edge0)  
+        shortEdge, longEdge = (edge0, edge1) if topology.edgeLength(edge0) < topology.edgeLength(edge1) else (edge1, edge0)  
 
-        face0, face1 = (face for face in self.native.faces) #get the 2 adjacent faces of the dogbone edge
+        face0, face1 = topology.edgeFaces[edgeIdx] #get the 2 adjacent faces of the dogbone edge
 
-        self.shortFace, self.longFace = (face0, face1) if shortEdge in face0.edges else (face1, face0)
+        shortFaceIdx, longFaceIdx = (face0, face1) if shortEdge in topology.faceEdges[face0] else (face1, face0)
+        self.shortFace, self.longFace = topology.faces[shortFaceIdx], topology.faces[longFaceIdx]
 
-        _, self.shortFaceNormal = self.shortFace.evaluator.getNormalAtPoint(self.shortFace.pointOnFace)#get their normal vectors
-        _, self.longFaceNormal = self.longFace.evaluator.getNormalAtPoint(self.longFace.pointOnFace)
+        self.shortFaceNormal = adsk.core.Vector3D.create(*topology.faceNormals[shortFaceIdx]) #get their normal vectors
+        self.longFaceNormal = adsk.core.Vector3D.create(*topology.faceNormals[longFaceIdx])
 
         self._customGraphicGroup = None
 
-        self._dogboneCentre = (
-            self.native.startVertex.geometry
-            if self.native.startVertex in self._parentFace.native.vertices
-            else self.native.endVertex.geometry
-        )
+        startPoint, endPoint = topology.edgeEndPoints(faceIdx, edgeIdx)
+
+        self._dogboneCentre = adsk.core.Point3D.create(*startPoint)
 
         self._nativeEndPoints = (
-            (self.native.startVertex.geometry, self.native.endVertex.geometry)
-            if self.native.startVertex in self._parentFace.native.vertices
-            else (self.native.endVertex.geometry, self.native.startVertex.geometry)
+            adsk.core.Point3D.create(*startPoint),
+            adsk.core.Point3D.create(*endPoint),
         )
 
         startPoint, endPoint = self._nativeEndPoints
@@ -432,6 +574,15 @@ class DbEdge:
     def component(self) -> adsk.fusion.Component:
         return self._parentFace.component
 
+    @property
+    def edgeId(self) -> int:
+        return self._edgeId
+
+    @property
+    def nativeEdgeId(self) -> int:
+        """the same for this edge selected in any occurrence of its component"""
+        return hash(self._native.entityToken)
+
     @property
     def cornerAngle(self):
         return self._cornerAngle
@@ -467,7 +618,11 @@ class DbEdge:
         """
         returns the two parent face edges associated with dogbone edge 
         """
-        return getCornerEdgesAtFace(face=self._parentFace.native, edge=self.native)
+        topology = self._parentFace.topology
+        return (
+            topology.edges[edgeIdx]
+            for edgeIdx in topology.cornerEdges(self._parentFace._faceIdx, self._edgeIdx)
+        )
 
     @property
     def cornerVector(self) -> adsk.core.Vector3D:
@@ -501,15 +656,11 @@ class DbEdge:
         return self._hash
 
     @classmethod
-    def __getToolBody(cls,
-                      self,
-                      topFace: adsk.fusion.BRepFace = None):
-        """Creates dogbone tool bodies in the nativeObject space"""
+    def __toolSpec(cls,
+                   self,
+                   topFace: adsk.fusion.BRepFace = None):
+        """Works out where the dogbone tool body goes, in the nativeObject space"""
 
-
-        box = None
-
-        tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
         startPoint, endPoint = self.nativeEndPoints
         startPoint, endPoint = startPoint.copy(), endPoint.copy()
 
@@ -533,9 +684,13 @@ class DbEdge:
         )
 
         if topFace:
-            translateVector = getTranslateVectorBetweenFaces(
-                self._parentFace.native, topFace
-                )
+            topology = self._parentFace.topology
+            topFaceIdx = topology.faceIndex.get(topFace.tempId)
+            translateVector = (
+                adsk.core.Vector3D.create(*topology.translateVector(self._parentFace._faceIdx, topFaceIdx))
+                if topFaceIdx is not None
+                else getTranslateVectorBetweenFaces(self._parentFace.native, topFace)
+            )  #topFace normally comes from the same body snapshot - the vector is then memoised per face pair
             startPoint.translateBy(translateVector)
 
         if params.dbType == MORTISE_DOGBONE:
@@ -560,78 +715,28 @@ class DbEdge:
             f'\n dirVect(normalized): {dirVect.asArray()}'
             f'\n edgeLength: {startPoint.distanceTo(endPoint): .2f}')
 
-        toolbody = tempBrepMgr.createCylinderOrCone(
-            endPoint, effectiveRadius, startPoint, effectiveRadius
+        bisector = self.shortFaceNormal.copy()
+        bisector.add(self.longFaceNormal)  #mortise offsets along a face normal, the clearance box still follows the bisector
+        bisector.normalize()
+        xAxis = dirVect.copy()
+        xAxis.normalize()
+
+        return ToolSpec(
+            dbType=params.dbType,
+            radius=effectiveRadius,
+            centreDistance=centreDistance,
+            cornerAngle=self.cornerAngle,
+            start=startPoint.asArray(),
+            end=endPoint.asArray(),
+            xAxis=xAxis.asArray(),
+            bisector=bisector.asArray(),
+            centre=self.dogboneCentre.asArray(),
+            edgeId=self._edgeId,
         )
 
-        if self.cornerAngle >= pi / 2:
-            return toolbody
-
-        # creating a box that will be used to clear the path the tool takes to the dogbone hole
-        # box width is toolDia
-        # box height is same as edge length
-        # box length is from the hole centre to the point where the tool meets the sides
-
-        edgeHeight = startPoint.distanceTo(endPoint)
-
-        DbEdge.logger.debug("Adding acute angle clearance box")
-        cornerTan = tan(self.cornerAngle / 2)
-
-        boxCentrePoint = startPoint.copy()
-        boxLength = effectiveRadius / cornerTan - centreDistance
-        boxWidth = effectiveRadius * 2
-
-        lengthDirectionVector = self.shortFaceNormal.copy()
-        lengthDirectionVector.add(self.longFaceNormal)
-        lengthDirectionVector.normalize()
-        lengthDirectionVector.scaleBy(boxLength / 2)
-
-        if lengthDirectionVector.length < 0.01:
-            return toolbody
-
-        heightDirectionVector = self.edgeVector.copy()
-        heightDirectionVector.normalize()
-        heightDirectionVector.scaleBy(edgeHeight / 2)
-
-        heightDirectionVector.add(lengthDirectionVector)
-
-        lengthDirectionVector.normalize()
-
-        boxCentrePoint.translateBy(heightDirectionVector)
-
-        cornerVector = self.shortFaceNormal.copy()
-        cornerVector.add(self.longFaceNormal)
-
-        #   rotate centreLine Vector (cornerVector) by 90deg to get width direction vector
-        orthogonalMatrix = adsk.core.Matrix3D.create()
-        orthogonalMatrix.setToRotation(pi / 2, self.edgeVector, boxCentrePoint)
-
-        widthDirectionVector = cornerVector.copy()
-        widthDirectionVector.transformBy(orthogonalMatrix)
-
-        boxLength = 0.001 if (boxLength < 0.001) else boxLength
-
-        boundaryBox = adsk.core.OrientedBoundingBox3D.create(
-            centerPoint=boxCentrePoint,
-            lengthDirection=lengthDirectionVector,
-            widthDirection=widthDirectionVector,
-            length=boxLength,
-            width=boxWidth,
-            height=edgeHeight,
-        )
-
-        box = tempBrepMgr.createBox(boundaryBox)
-
-        tempBrepMgr.booleanOperation(
-            targetBody=toolbody,
-            toolBody=box,
-            booleanType=adsk.fusion.BooleanTypes.UnionBooleanType,
-        )
-
-        return toolbody
-
-    def getToolBody(self, topFace: adsk.fusion.BRepFace = None):
-        return DbEdge.__getToolBody(self, topFace)
+    @apiPhase("getToolBody")
+    def toolSpec(self, topFace: adsk.fusion.BRepFace = None) -> ToolSpec:
+        return DbEdge.__toolSpec(self, topFace)
 
     def addCustomGraphic(self):
         if not self._parentFace._customGraphicGroup:
@@ -46,3 +46,27 @@ def groupContext():
             )
             timelineGroup.name = DB_NAME
         refresh()
+
+@contextmanager
+def deferredCompute(enabled: bool = True):
+    """suspends design recompute while dogbones are added - Fusion computes everything once on the way out"""
+    app = adsk.core.Application.get()
+    design: adsk.fusion.Design = app.activeProduct
+    if not enabled:
+        yield
+        return
+    wasDeferred = design.isComputeDeferred
+    try:
+        design.isComputeDeferred = True
+        yield
+
+    finally:
+        design.isComputeDeferred = wasDeferred  #nested runs leave the compute to the outermost one
+
+def featureErrors(features) -> list:
+    """error messages of the features that failed to compute - check after a deferred compute has run"""
+    return [
+        f"{feature.name}: {feature.errorOrWarningMessage}"
+        for feature in features
+        if feature.isValid and feature.healthState == adsk.fusion.FeatureHealthStates.ErrorFeatureHealthState
+    ]
@@ -41,6 +41,7 @@ class DbParams:
     expandSettingsGroup: bool = True
     logging: int = 0
     benchmark: bool = False
+    apiCount: bool = False
 
     isPromotedCreate: bool = True
     isPromotedRefresh: bool = True
@@ -48,6 +49,12 @@ class DbParams:
     isPromotedRefreshMfg: bool = True
 
     previewEnabled: bool = True
+    previewBudget: float = 250.0  # ms - a preview slower than this steps down a level of detail for the next one
+
+    toolBodyMode: str = "Auto"  # Auto, Single body or Separate bodies - how tool bodies are handed to the combine cut
+    toolBackend: str = "Auto"  # Auto, Cylinders, Planar extrusion or Hole features - how the dogbones are cut
+    timelineOutput: str = "Group per component"  # or Consolidated - one timeline group and one base feature per component for the run
+    deferCompute: bool = False  # suspend design recompute while dogbones are added - one compute at the end
 
     @classmethod
     def read_file(cls,  path: str) -> str:
@@ -0,0 +1,253 @@
+"""Timeline free preview - the dogbone tool bodies drawn as custom graphics over the selected faces
+
+Nothing is added to the timeline and no attributes are written, so a preview costs drawing time rather than
+base features, combines and a recompute. Each DbFace draws into its own custom graphics group, one graphic
+per dogbone, and keeps the graphics of dogbones that didn't change - toggling an edge only draws or deletes its own.
+
+PreviewDetail steps the preview between levels of detail - the full cut, tool bodies, faceted prisms and
+centre line markers - from what earlier previews cost against the budget set in Settings.
+Graphics levels are drawn progressively, nearest the last clicked face or edge first, a slice per custom event;
+any new preview or input change cancels the slices still to come.
+"""
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+import adsk.core
+import adsk.fusion
+
+from .DbBackends import groupTopFaces
+from .DbClasses import Selection
+from .DbData import DbParams
+from .DbToolCache import PreviewCache, ToolSpec
+from ..utils import vecAdd, vecScale
+from ..utils.decorators import eventHandler
+from ...constants import PREVIEW_EVENT
+
+logger = logging.getLogger("dogbone.DbPreview")
+
+PREVIEW_COLOR = (255, 128, 0, 255)  # red, green, blue, opacity of the drawn tool bodies
+FACETS = 8  # sides of a faceted dogbone
+PREVIEW_SLICE = 0.05  # seconds of drawing per slice of a progressive preview - Fusion stays responsive in between
+
+
+def drawToolBody(group: adsk.fusion.CustomGraphicsGroup, spec: ToolSpec, instances: PreviewCache) -> adsk.fusion.CustomGraphicsEntity:
+    """the uncut tool body of a dogbone"""
+    graphic = group.addBRepBody(instances.body(spec))
+    graphic.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(*PREVIEW_COLOR))
+    graphic.isSelectable = False  #clicks go through to the model edges underneath
+    return graphic
+
+
+def drawFacetedBody(group: adsk.fusion.CustomGraphicsGroup, spec: ToolSpec, instances: PreviewCache) -> adsk.fusion.CustomGraphicsEntity:
+    """low polygon prism around the hole centre line, as a mesh - no B-rep, and no clearance box"""
+    ring = [
+        vecAdd(vecScale(spec.xAxis, spec.radius * math.cos(angle)), vecScale(spec.yAxis, spec.radius * math.sin(angle)))
+        for angle in (2 * math.pi * i / FACETS for i in range(FACETS))
+    ]
+    coordinates = [c for end in (spec.start, spec.end) for offset in ring for c in vecAdd(end, offset)]
+    indices = []
+    for i in range(FACETS):
+        j = (i + 1) % FACETS
+        indices += [i, j, FACETS + j, i, FACETS + j, FACETS + i]  #side
+    for i in range(1, FACETS - 1):
+        indices += [0, i + 1, i, FACETS, FACETS + i, FACETS + i + 1]  #bottom and top caps, fanned from the first corner
+    graphic = group.addMesh(adsk.fusion.CustomGraphicsCoordinates.create(coordinates), indices, [], [])
+    graphic.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(*PREVIEW_COLOR))
+    graphic.isSelectable = False
+    return graphic
+
+
+def drawMarker(group: adsk.fusion.CustomGraphicsGroup, spec: ToolSpec, instances: PreviewCache) -> adsk.fusion.CustomGraphicsEntity:
+    """the hole centre line only"""
+    graphic = group.addLines(adsk.fusion.CustomGraphicsCoordinates.create([*spec.start, *spec.end]), [], False)
+    graphic.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(*PREVIEW_COLOR))
+    graphic.isSelectable = False
+    return graphic
+
+
+# (name, draw function) - most detailed first, the full cut has no draw function
+PREVIEW_LEVELS = (
+    ("Cut", None),
+    ("Tool bodies", drawToolBody),
+    ("Faceted", drawFacetedBody),
+    ("Markers", drawMarker),
+)
+
+
+class PreviewRun:
+    """
+    One preview at a graphics level, drawn a slice at a time - dogbones nearest focus first
+    graphics of edges no longer selected are deleted up front, so a slice only ever adds
+    """
+
+    def __init__(self, params: DbParams, selection: Selection, draw=drawToolBody, focus: Optional[adsk.core.Point3D] = None) -> None:
+        self.selection = selection
+        self.dogbones = 0
+        self.drawn = 0
+        self.seconds = 0.0  # drawing time so far, over every slice
+        start = time.perf_counter()
+        selection.previewFingerprint = None  #set again once this run is drawn to the end
+        self._fingerprint = selection.fingerprint(params)
+        selection.previewCache.start(params)
+        pending = []
+        shown = {}
+        for occurrenceFaces, _ in selection.componentGroups():  #occurrences of a component share the native component's graphics
+            topFaces = groupTopFaces(occurrenceFaces, params.fromTop)
+            for faceObj in occurrenceFaces:
+                topFace = topFaces.get(faceObj.componentId)
+                edges = faceObj.mergedSelectedEdges  #selected in any occurrence of the component
+                faceObj.prunePreview({edgeObj.edgeId for edgeObj in edges}, draw)
+                pending += [(faceObj, edgeObj, topFace) for edgeObj in edges]
+                shown[faceObj.faceId] = faceObj
+
+        for faceId, faceObj in selection.previewFaces.items():
+            if shown.get(faceId) is not faceObj:
+                faceObj.clearPreview()  #face removed, or a face of another occurrence shows its dogbones
+        selection.previewFaces = shown
+
+        if focus:
+            centre = focus.asArray()
+            pending.sort(key=lambda item: math.dist(item[1].dogboneCentre.asArray(), centre), reverse=True)
+        else:
+            pending.reverse()
+        self._pending = pending  #popped from the end - nearest focus last in the list
+        self.dogbones = len(pending)
+        self.seconds += time.perf_counter() - start
+
+    @property
+    def isDone(self) -> bool:
+        return not self._pending
+
+    def drawBatch(self, seconds: Optional[float] = None) -> bool:
+        """draws dogbones until seconds have gone by, all of them if None - returns True once every dogbone is shown"""
+        cache = self.selection.previewCache
+        start = time.perf_counter()
+        while self._pending:
+            faceObj, edgeObj, topFace = self._pending.pop()
+            self.drawn += faceObj.showPreview(edgeObj.edgeId, cache.toolSpec(edgeObj, topFace), cache)
+            if seconds is not None and time.perf_counter() - start > seconds:
+                break
+        if not self._pending:
+            cache.finish()  #only now is every unused cache entry known
+            self.selection.previewFingerprint = self._fingerprint
+        self.seconds += time.perf_counter() - start
+        return not self._pending
+
+
+class ProgressivePreview:
+    """
+    Draws a PreviewRun in slices of PREVIEW_SLICE seconds, one slice per custom event, so Fusion redraws and
+    handles input in between. Every start or cancel bumps the generation - events still queued for an
+    older run find it stale and do nothing
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.run: Optional[PreviewRun] = None
+        self._onDone = None
+        self._app = adsk.core.Application.get()
+        self._event = self._app.registerCustomEvent(PREVIEW_EVENT)
+        self.onBatch(event=self._event)
+
+    def start(self, run: PreviewRun, onDone=None) -> bool:
+        """draws the first slice now, the rest from events - returns True if that was all of it"""
+        self.cancel()
+        self.run = run
+        self._onDone = onDone
+        return self._next()
+
+    def _next(self) -> bool:
+        if self.run.drawBatch(PREVIEW_SLICE):
+            run, onDone = self.run, self._onDone
+            self.run = self._onDone = None
+            if onDone:
+                onDone(run)
+            return True
+        self._app.fireCustomEvent(PREVIEW_EVENT, str(self.generation))
+        return False
+
+    @eventHandler(handler_cls=adsk.core.CustomEventHandler)
+    def onBatch(self, args: adsk.core.CustomEventArgs):
+        if not self.run or args.additionalInfo != str(self.generation):
+            return  #cancelled, or superseded by a newer preview
+        self._next()
+        self._app.activeViewport.refresh()
+
+    def cancel(self):
+        """drops the run in progress - graphics drawn so far stay, the next run keeps what it can of them"""
+        self.generation += 1
+        self.run = self._onDone = None
+
+    def stop(self):
+        self.cancel()
+        self._app.unregisterCustomEvent(PREVIEW_EVENT)
+
+
+def clearPreview(selection: Selection):
+    """removes every preview graphic - before execute, and when the dialog closes"""
+    for faceObj in selection.previewFaces.values():
+        faceObj.clearPreview()
+    selection.previewFaces = {}
+
+
+class PreviewDetail:
+    """
+    Level of detail of the preview, stepped from what previews cost
+    a preview over params.previewBudget steps down a level for the next one - a more detailed level comes back
+    as soon as its last measured cost per dogbone fits the budget for the current selection
+    """
+
+    def __init__(self) -> None:
+        self.level = 0  # index into PREVIEW_LEVELS
+        self._costs: Dict[int, float] = {}  # seconds per dogbone, last measured at each level
+        self.progressive = ProgressivePreview()
+
+    def choose(self, dogbones: int, budget: float) -> int:
+        """the most detailed level expected to fit budget seconds - levels not measured yet are tried from the current one down"""
+        for level in range(len(PREVIEW_LEVELS)):
+            cost = self._costs.get(level)
+            if (cost is None and level >= self.level) or (cost is not None and cost * dogbones <= budget):
+                return level
+        return len(PREVIEW_LEVELS) - 1
+
+    def show(self, params: DbParams, selection: Selection, executeHandler, changed: bool = True) -> int:
+        """
+        previews at the chosen level - the full cut through executeHandler, like execute, graphics levels
+        progressively, nearest selection.focus first. returns the level
+        unless changed, graphics on screen (or still being drawn) are left as they are - only the full cut,
+        rolled back by Fusion before every preview, is made again, from the preview cache
+        """
+        if not changed and PREVIEW_LEVELS[self.level][1] is not None:
+            return self.level
+        self.progressive.cancel()  #a newer preview supersedes any still drawing
+        dogbones = sum(len(faceObj.selectedEdges) for faceObj in selection.selectedFaces.values())
+        self.level = level = self.choose(dogbones, params.previewBudget / 1000)
+        name, draw = PREVIEW_LEVELS[level]
+        if draw is not None:
+            self.progressive.start(PreviewRun(params, selection, draw, selection.focus), lambda run: self._measured(level, run))
+            return level
+
+        start = time.perf_counter()
+        clearPreview(selection)
+        selection.previewFingerprint = None
+        with selection.preview(params):  #unchanged edges keep their tool bodies and unions from the last preview
+            executeHandler(params, selection)
+        selection.previewFingerprint = selection.fingerprint(params)  #execute can take the same bodies
+        seconds = time.perf_counter() - start
+        self._costs[level] = seconds / max(dogbones, 1)
+        logger.debug(f"preview {name}: {dogbones} dogbones in {seconds * 1000:.0f} ms")
+        return level
+
+    def _measured(self, level: int, run: PreviewRun):
+        """cost of a completed graphics preview - drawing time only, not the time between slices"""
+        self._costs[level] = run.seconds / max(run.dogbones, 1)
+        logger.debug(f"preview {PREVIEW_LEVELS[level][0]}: {run.drawn} of {run.dogbones} dogbones drawn in {run.seconds * 1000:.0f} ms")
+
+    def cancel(self):
+        self.progressive.cancel()
+
+    def stop(self):
+        """ends any preview still drawing and releases its custom event - when the dialog closes"""
+        self.progressive.stop()
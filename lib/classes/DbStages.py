@@ -0,0 +1,38 @@
+"""Pipeline stages and the DbParams fields each one reads
+
+A dogbone run goes topology -> classification -> geometry -> union -> commit. Each stage keeps its results
+keyed by its stageKey - the params it reads itself - together with whatever identifies its input from the
+stage above (body signature, face and edge ids, tool specs). A param change therefore only invalidates the
+stage that reads it and those downstream; everything upstream is taken from where it is kept:
+
+    topology        BodyTopology snapshot per body - reads no params
+    classification  accepted corner edges per face - BodyTopology.classifyCorners, DbFace.registerEdges
+    geometry        tool spec per edge - PreviewCache.toolSpec
+    union           tool bodies merged for the combine - mergedToolBodies, PreviewCache.mergeToolBodies
+    commit          base features and combines - createStaticDogbones
+"""
+from dataclasses import dataclass
+from typing import Hashable, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    reads: Tuple[str, ...]  # DbParams fields or properties - tool sizes are read evaluated, so "0.25 in" and "6.35 mm" match
+
+
+TOPOLOGY = Stage("topology", ())
+CLASSIFICATION = Stage("classification", ("acuteAngle", "obtuseAngle", "minAngleLimit", "maxAngleLimit"))
+GEOMETRY = Stage("geometry", ("dbType", "toolDia", "toolDiaOffset", "minimalPercent", "longSide", "fromTop"))
+UNION = Stage("union", ("toolBodyMode", "toolBackend"))
+COMMIT = Stage("commit", ("timelineOutput", "deferCompute"))
+
+STAGES = (TOPOLOGY, CLASSIFICATION, GEOMETRY, UNION, COMMIT)  # upstream first
+
+
+def stageKey(stage: Stage, params) -> Hashable:
+    """the params stage reads - what it keeps stays valid while this is unchanged"""
+    return tuple(
+        round(value, 9) if isinstance(value, float) else value
+        for value in (getattr(params, field) for field in stage.reads)
+    )
@@ -0,0 +1,425 @@
+"""Tool body templates - dogbones of the same size and corner angle are copies of one canonical body,
+moved into place with a transform instead of being rebuilt from primitives every time"""
+import logging
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, replace
+from math import tan, pi
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import adsk.core
+import adsk.fusion
+
+from ..utils import (
+    Vec,
+    TOLERANCE,
+    vecAdd,
+    vecSub,
+    vecScale,
+    vecDot,
+    vecCross,
+    vecNormalize,
+    vecRound,
+    RigidTransform,
+    rigidApply,
+    rigidInverse,
+    extrudeProfiles,
+    keyholeProfile,
+    UnionTree,
+)
+
+from .DbStages import GEOMETRY, stageKey
+
+logger = logging.getLogger("dogbone.DbToolCache")
+
+TEMPLATE_CACHE_SIZE = 32  # templates kept - a run rarely has more than a handful of distinct dogbones
+
+
+def canonicalToolBody(radius: float, height: float, boxLength: float = 0.0, bisector=(1.0, 0.0)) -> adsk.fusion.BRepBody:
+    """
+    Builds a dogbone tool body in its canonical frame:
+    cylinder centre on the origin, running up the z axis for height, offset direction along +x
+    boxLength is the acute angle clearance box, running along bisector - the (x, y) direction of the corner bisector
+    """
+    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+    cylinder = lambda: tempBrepMgr.createCylinderOrCone(
+        adsk.core.Point3D.create(0, 0, height), radius, adsk.core.Point3D.create(0, 0, 0), radius
+    )
+    if not boxLength:
+        return cylinder()
+
+    if boxLength > 0:
+        keyhole = extrudeProfiles([keyholeProfile(radius, boxLength, bisector)], [height])  #cylinder and box in one go
+        if keyhole:
+            return keyhole
+
+    # box behind the hole centre (large minimal dogbone offsets) - keep the cylinder and box union
+    toolBody = cylinder()
+    bx, by = bisector
+    box = tempBrepMgr.createBox(
+        adsk.core.OrientedBoundingBox3D.create(
+            centerPoint=adsk.core.Point3D.create(bx * boxLength / 2, by * boxLength / 2, height / 2),
+            lengthDirection=adsk.core.Vector3D.create(bx, by, 0),
+            widthDirection=adsk.core.Vector3D.create(-by, bx, 0),
+            length=max(boxLength, 0.001),
+            width=radius * 2,
+            height=height,
+        )
+    )
+    tempBrepMgr.booleanOperation(
+        targetBody=toolBody,
+        toolBody=box,
+        booleanType=adsk.fusion.BooleanTypes.UnionBooleanType,
+    )
+    return toolBody
+
+
+@dataclass
+class ToolSpec:
+    """
+    Everything needed to make one dogbone tool body, in the nativeObject space
+    the hole centre line runs from start (dogbone face side) to end
+    """
+
+    dbType: str
+    radius: float
+    centreDistance: float
+    cornerAngle: float
+    start: Vec
+    end: Vec
+    xAxis: Vec  # unit hole offset direction - perpendicular to the centre line
+    bisector: Vec  # unit corner bisector - the direction of the acute angle clearance box
+    centre: Vec  # corner point the dogbone belongs to
+    edgeId: int
+
+    @property
+    def isAcute(self) -> bool:
+        return self.cornerAngle < pi / 2
+
+    @property
+    def height(self) -> float:
+        return vecDot(vecSub(self.end, self.start), self.zAxis)
+
+    @property
+    def zAxis(self) -> Vec:
+        return vecNormalize(vecSub(self.end, self.start))
+
+    @property
+    def yAxis(self) -> Vec:
+        return vecCross(self.zAxis, self.xAxis)
+
+    @property
+    def boxLength(self) -> float:
+        """
+        acute angle clearance box - toolDia wide, edge high, from the hole centre to the point where the tool meets the sides
+        0 when there is no box
+        """
+        if not self.isAcute:
+            return 0.0
+        boxLength = self.radius / tan(self.cornerAngle / 2) - self.centreDistance
+        return 0.0 if abs(boxLength / 2) < 0.01 else boxLength
+
+    @property
+    def frameBisector(self) -> Tuple[float, float]:
+        """corner bisector in the canonical frame - (1, 0) unless the hole is offset along a face normal (mortise)"""
+        if not self.isAcute:
+            return (1.0, 0.0)
+        return (round(vecDot(self.bisector, self.xAxis), 9) + 0.0, round(vecDot(self.bisector, self.yAxis), 9) + 0.0)
+
+    @property
+    def key(self) -> Hashable:
+        """template key - obtuse and square corners are plain cylinders, only acute ones depend on the angle"""
+        return (
+            self.dbType,
+            round(self.radius, 9),
+            round(self.centreDistance, 9),
+            round(self.height, 9),
+            (round(self.cornerAngle, 6), self.frameBisector) if self.isAcute else None,
+        )
+
+    @property
+    def placement(self) -> Hashable:
+        """equal for dogbones that make the same tool body in the same place"""
+        return (self.key, vecRound(self.start), vecRound(self.end))
+
+    def build(self) -> adsk.fusion.BRepBody:
+        return canonicalToolBody(self.radius, self.height, self.boxLength, self.frameBisector)
+
+    def transform(self) -> adsk.core.Matrix3D:
+        """moves the canonical frame onto the hole centre line"""
+        transform = adsk.core.Matrix3D.create()
+        transform.setToAlignCoordinateSystems(
+            adsk.core.Point3D.create(0, 0, 0),
+            adsk.core.Vector3D.create(1, 0, 0),
+            adsk.core.Vector3D.create(0, 1, 0),
+            adsk.core.Vector3D.create(0, 0, 1),
+            adsk.core.Point3D.create(*self.start),
+            adsk.core.Vector3D.create(*self.xAxis),
+            adsk.core.Vector3D.create(*self.yAxis),
+            adsk.core.Vector3D.create(*self.zAxis),
+        )
+        return transform
+
+
+def _lineKey(spec: ToolSpec) -> Tuple[Vec, Vec]:
+    """
+    (direction, point) identifying the hole centre line, whichever way it runs
+    direction is sign normalised, point is the foot of the perpendicular from the origin
+    """
+    direction = spec.zAxis
+    if next((c for c in direction if abs(c) > TOLERANCE), 0) < 0:
+        direction = vecScale(direction, -1)
+    point = vecSub(spec.start, vecScale(direction, vecDot(spec.start, direction)))
+    return direction, point
+
+
+def mergeCoaxial(specs: List[ToolSpec]) -> List[ToolSpec]:
+    """
+    Drops duplicate dogbones of the same edge, then replaces coaxial dogbones of the same size and shape,
+    whose depth ranges overlap or touch, with one spanning the combined range
+    - eg stepped pockets, or faces at different depths with "From Top Face"
+    """
+    unique = {}
+    for spec in specs:
+        unique.setdefault((spec.edgeId, vecRound(spec.start), vecRound(spec.end)), spec)  #the same edge selected through several faces
+
+    lines = defaultdict(list)
+    for spec in unique.values():
+        direction, point = _lineKey(spec)
+        shape = (
+            spec.dbType,
+            round(spec.radius, 9),
+            round(spec.centreDistance, 9),
+            (round(spec.cornerAngle, 6), vecRound(spec.bisector)) if spec.isAcute else None,
+        )
+        lines[(shape, vecRound(direction), vecRound(point))].append((spec, direction, point))
+
+    merged = []
+    for members in lines.values():
+        if len(members) == 1:
+            merged.append(members[0][0])
+            continue
+        _, direction, point = members[0]
+        spans = []
+        for spec, _, _ in members:
+            t0, t1 = vecDot(spec.start, direction), vecDot(spec.end, direction)
+            spans.append((min(t0, t1), max(t0, t1), spec))
+        spans.sort(key=lambda span: span[:2])
+        runs = []
+        for low, high, spec in spans:
+            if runs and low <= runs[-1][1] + TOLERANCE:
+                runs[-1][1] = max(runs[-1][1], high)
+                runs[-1][2].append(spec)
+            else:
+                runs.append([low, high, [spec]])
+        for low, high, runSpecs in runs:
+            if len(runSpecs) == 1:
+                merged.append(runSpecs[0])
+                continue
+            merged.append(
+                replace(
+                    runSpecs[0],
+                    start=vecAdd(point, vecScale(direction, low)),
+                    end=vecAdd(point, vecScale(direction, high)),
+                )
+            )
+    if len(merged) < len(specs):
+        logger.debug(f"{len(specs)} dogbones merged into {len(merged)} coaxial tool bodies")
+    return merged
+
+
+def specLayout(specs: List[ToolSpec], transform: Optional[RigidTransform] = None) -> frozenset:
+    """the dogbones of specs, moved by transform - equal for the same dogbones on identical bodies, once moved onto each other"""
+    move = (lambda point: rigidApply(transform, point)) if transform else (lambda point: point)
+    return frozenset((spec.key, vecRound(move(spec.start), 5), vecRound(move(spec.end), 5)) for spec in specs)
+
+
+def _matrix(transform: RigidTransform) -> adsk.core.Matrix3D:
+    rows, translation = transform
+    matrix = adsk.core.Matrix3D.create()
+    matrix.setWithArray([*rows[0], translation[0], *rows[1], translation[1], *rows[2], translation[2], 0, 0, 0, 1])
+    return matrix
+
+
+class ToolBodyCache:
+    """
+    LRU cache of canonical tool bodies
+    templates are never handed out - every instance is a transformed copy, so booleans on it leave the template intact
+    """
+
+    def __init__(self, maxSize: int = TEMPLATE_CACHE_SIZE) -> None:
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self._templates: "OrderedDict[Hashable, adsk.fusion.BRepBody]" = OrderedDict()
+        self._layouts: "OrderedDict[Hashable, List[adsk.fusion.BRepBody]]" = OrderedDict()  # key (body signature, variant, specLayout) - LRU like the templates
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def template(self, key: Hashable, build: Callable[[], adsk.fusion.BRepBody]) -> adsk.fusion.BRepBody:
+        """returns the template for key - built (and the least recently used one dropped) if it isn't cached"""
+        template = self._templates.get(key)
+        if template is not None:
+            self._templates.move_to_end(key)
+            self.hits += 1
+            return template
+
+        self.misses += 1
+        template = self._templates[key] = build()
+        if len(self._templates) > self.maxSize:
+            self._templates.popitem(last=False)
+        logger.debug(f"tool body template {key} added, {len(self._templates)} cached")
+        return template
+
+    def instance(self, spec: ToolSpec) -> adsk.fusion.BRepBody:
+        """copy of the template for spec, moved onto its hole centre line"""
+        tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+        body = tempBrepMgr.copy(self.template(spec.key, spec.build))
+        tempBrepMgr.transform(body, spec.transform())
+        return body
+
+    def keepBodies(self, topology, specs: List[ToolSpec], variant: Hashable, bodies: List[adsk.fusion.BRepBody]):
+        """
+        keeps copies of the finished tool bodies of a body's dogbones, for identical bodies - see BodyTopology.source
+        variant is anything else the bodies depend on, eg the tool body mode. Only bodies other selected bodies are copies of
+        """
+        if topology.source or not topology.copies:
+            return  #copies are matched against their source body - and a body without copies has no one to share with
+        tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+        self._layouts[(topology.signature, variant, specLayout(specs))] = [tempBrepMgr.copy(body) for body in bodies]
+        if len(self._layouts) > self.maxSize:
+            self._layouts.popitem(last=False)
+
+    def reusedBodies(self, topology, specs: List[ToolSpec], variant: Hashable) -> Optional[List[adsk.fusion.BRepBody]]:
+        """
+        tool bodies kept for the source of a copied body, with the same dogbones, moved onto this body
+        None if the body isn't a copy, or its dogbones differ
+        """
+        if not topology.source:
+            return None
+        source, transform = topology.source
+        key = (source.signature, variant, specLayout(specs, rigidInverse(transform)))
+        kept = self._layouts.get(key)
+        if kept is None:
+            return None
+        self._layouts.move_to_end(key)
+        tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+        matrix = _matrix(transform)
+        bodies = [tempBrepMgr.copy(body) for body in kept]
+        for body in bodies:
+            tempBrepMgr.transform(body, matrix)
+        logger.debug(f"{len(specs)} dogbones reused as {len(bodies)} tool bodies from {source.body.name}")
+        return bodies
+
+    def clear(self):
+        self._templates.clear()
+        self._layouts.clear()
+
+
+class PreviewCache:
+    """
+    Tool specs and tool bodies of single edges, kept between previews - a preview only works out the dogbones
+    of new or changed edges. Specs are keyed by (edge id, params, top face id, parent face and its body signature),
+    bodies by where the spec puts them, so merged coaxial dogbones are kept too.
+    Union trees are kept per component group, so toggling an edge only redoes the unions on its path.
+    Whatever a preview didn't use is dropped when it finishes - deselected edges and edges of changed bodies don't linger
+    """
+
+    def __init__(self, cache: ToolBodyCache) -> None:
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._paramsKey: Hashable = None
+        self._specs: Dict[Hashable, ToolSpec] = {}
+        self._bodies: Dict[Hashable, adsk.fusion.BRepBody] = {}
+        self._trees: Dict[Hashable, UnionTree] = {}
+        self._instanceKeys: Dict[int, Tuple[adsk.fusion.BRepBody, Hashable]] = {}  # key id(body) value (body, placement) - copies handed out, not yet released
+        self._usedSpecs = set()
+        self._usedBodies = set()
+        self._usedTrees = set()
+
+    def start(self, params):
+        self._paramsKey = stageKey(GEOMETRY, params)  #evaluated once, the expressions go through the units manager
+        self._usedSpecs.clear()
+        self._usedBodies.clear()
+        self._usedTrees.clear()
+
+    def finish(self):
+        """drops everything the preview didn't use"""
+        for store, used in (
+            (self._specs, self._usedSpecs),
+            (self._bodies, self._usedBodies),
+            (self._trees, self._usedTrees),
+        ):
+            for key in set(store) - used:
+                del store[key]
+        self._instanceKeys.clear()
+        logger.debug(f"preview cache: {self.hits} hits, {self.misses} misses, {len(self._bodies)} tool bodies kept")
+
+    def toolSpec(self, edgeObj, topFace: adsk.fusion.BRepFace = None) -> ToolSpec:
+        """edgeObj.toolSpec(topFace), worked out again only if the edge, its body or the params changed"""
+        faceObj = edgeObj._parentFace
+        key = (
+            edgeObj.edgeId,
+            self._paramsKey,
+            topFace.tempId if topFace else None,
+            faceObj.nativeFaceId,
+            faceObj.topology.signature,
+        )
+        self._usedSpecs.add(key)
+        spec = self._specs.get(key)
+        if spec is None:
+            spec = self._specs[key] = edgeObj.toolSpec(topFace=topFace)
+        return spec
+
+    def body(self, spec: ToolSpec) -> adsk.fusion.BRepBody:
+        """the tool body kept for spec - for drawing, it must not be modified"""
+        key = spec.placement
+        self._usedBodies.add(key)
+        body = self._bodies.get(key)
+        if body is None:
+            self.misses += 1
+            body = self._bodies[key] = self.cache.instance(spec)
+        else:
+            self.hits += 1
+        return body
+
+    def keep(self, spec: ToolSpec):
+        """marks the tool body of spec as still in use, without copying it"""
+        self._usedBodies.add(spec.placement)
+
+    def instance(self, spec: ToolSpec) -> adsk.fusion.BRepBody:
+        """copy of the tool body kept for spec - stands in for ToolBodyCache.instance with the backends"""
+        instance = adsk.fusion.TemporaryBRepManager.get().copy(self.body(spec))
+        self._instanceKeys[id(instance)] = (instance, spec.placement)  #held until released - its id can't go to another body meanwhile
+        return instance
+
+    def release(self, bodies: List[adsk.fusion.BRepBody]) -> List[Optional[Hashable]]:
+        """
+        forgets the copies among bodies that instance handed out - every one, merged or not.
+        returns their placements, None for bodies that didn't come from instance
+        """
+        keys = []
+        for body in bodies:
+            instance, key = self._instanceKeys.pop(id(body), (None, None))
+            keys.append(key if instance is body else None)
+        return keys
+
+    def mergeToolBodies(
+        self, treeKey: Hashable, bodies: List[adsk.fusion.BRepBody], centres: List[Vec], count: int, cellSize: float
+    ) -> List[adsk.fusion.BRepBody]:
+        """
+        mergeToolBodies through the union tree kept for treeKey - only unions touching changed bodies are redone
+        bodies that didn't come from instance (eg planar profiles) count as changed every time
+        """
+        self._usedTrees.add(treeKey)
+        tree = self._trees.get(treeKey)
+        if tree is None or abs(tree.cellSize - cellSize) > TOLERANCE:
+            tree = self._trees[treeKey] = UnionTree(cellSize)
+        return tree.union(self.release(bodies), bodies, centres, count)
+
+    def clear(self):
+        self._specs.clear()
+        self._bodies.clear()
+        self._trees.clear()
+        self._instanceKeys.clear()
@@ -0,0 +1,344 @@
+"""Body topology snapshot - walks a body once and keeps face, edge and vertex data in compact lists,
+so corner classification and tool body maths don't need to go back to the Fusion API for every lookup"""
+import logging
+from functools import reduce
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import adsk.core
+import adsk.fusion
+
+from ..utils import (
+    Vec,
+    vecSub,
+    vecDot,
+    vecScale,
+    vecLength,
+    vecNormalize,
+    vecIsParallel,
+    vecAdd,
+    RigidTransform,
+    rigidTransform,
+    rigidRotate,
+    cornerAngle,
+    classifyCorners,
+    CornerClassification,
+)
+from .DbStages import CLASSIFICATION, stageKey
+
+logger = logging.getLogger("dogbone.DbTopology")
+
+
+class BodyTopology:
+    """
+    Snapshot of a (native) BRepBody
+
+    faces, edges and vertices are referenced by their index in the snapshot lists
+    the *Index dicts map the Fusion tempId of an entity to its snapshot index
+    """
+
+    def __init__(self, body: adsk.fusion.BRepBody) -> None:
+        self.body = body
+
+        self.faces: List[adsk.fusion.BRepFace] = []
+        self.faceIndex: Dict[int, int] = {}
+        self.faceNormals: List[Vec] = []
+        self.facePoints: List[Vec] = []  # a point on each face - together with the normal defines the face plane
+        self.faceIsPlanar: List[bool] = []
+        self.faceEdges: List[Set[int]] = []
+        self.faceVertices: List[Set[int]] = []
+
+        self.edges: List[adsk.fusion.BRepEdge] = []
+        self.edgeIndex: Dict[int, int] = {}
+        self.edgeVertices: List[Tuple[int, int]] = []  # (startVertex, endVertex)
+        self.edgeIsLine: List[bool] = []
+        self.edgeIsDegenerate: List[bool] = []
+        self.edgeFaces: List[List[int]] = []
+        self.edgeIsOpposed: List[List[bool]] = []  # coEdge.isOpposedToEdge, in the same order as edgeFaces
+
+        self.vertices: List[adsk.fusion.BRepVertex] = []
+        self.vertexIndex: Dict[int, int] = {}
+        self.vertexPoints: List[Vec] = []
+        self.vertexEdges: List[Set[int]] = []
+
+        self._topFaces: Dict[Vec, int] = {}  # key rounded face normal
+        self._translateVectors: Dict[Tuple[int, int], Vec] = {}  # key (fromFace, toFace)
+        self._classifications: Dict[Hashable, tuple] = {}  # key (faceIdx, classification stage key) - classifyCorners results
+        self._signature: Optional[Hashable] = None
+
+        # identical body walked earlier - same faces, edges and vertices at the same indices, moved by transform
+        self.source: Optional[Tuple["BodyTopology", RigidTransform]] = None
+        self.copies = 0  # later bodies found to be moved copies of this one
+
+        self._build()
+
+    def _build(self):
+        planeType = adsk.core.Plane.classType()
+        lineType = adsk.core.Curve3DTypes.Line3DCurveType
+
+        for face in self.body.faces:
+            faceIdx = len(self.faces)
+            self.faces.append(face)
+            self.faceIndex[face.tempId] = faceIdx
+            self.faceIsPlanar.append(face.geometry.objectType == planeType)
+            pointOnFace = face.pointOnFace
+            _, normal = face.evaluator.getNormalAtPoint(pointOnFace)
+            self.faceNormals.append(tuple(normal.asArray()))
+            self.facePoints.append(tuple(pointOnFace.asArray()))
+            faceEdges = set()
+            faceVertices = set()
+
+            for loop in face.loops:
+                for coEdge in loop.coEdges:
+                    edgeIdx = self._addEdge(coEdge.edge, lineType)
+                    self.edgeFaces[edgeIdx].append(faceIdx)
+                    self.edgeIsOpposed[edgeIdx].append(coEdge.isOpposedToEdge)
+                    faceEdges.add(edgeIdx)
+                    faceVertices.update(self.edgeVertices[edgeIdx])
+
+            self.faceEdges.append(faceEdges)
+            self.faceVertices.append(faceVertices)
+
+        logger.debug(
+            f"topology: {len(self.faces)} faces, {len(self.edges)} edges, {len(self.vertices)} vertices"
+        )
+
+    def _addEdge(self, edge: adsk.fusion.BRepEdge, lineType) -> int:
+        tempId = edge.tempId
+        if (edgeIdx := self.edgeIndex.get(tempId)) is not None:
+            return edgeIdx
+
+        edgeIdx = len(self.edges)
+        self.edges.append(edge)
+        self.edgeIndex[tempId] = edgeIdx
+        startIdx = self._addVertex(edge.startVertex)
+        endIdx = self._addVertex(edge.endVertex)
+        self.edgeVertices.append((startIdx, endIdx))
+        self.edgeIsLine.append(edge.geometry.curveType == lineType)
+        self.edgeIsDegenerate.append(edge.isDegenerate)
+        self.edgeFaces.append([])
+        self.edgeIsOpposed.append([])
+        self.vertexEdges[startIdx].add(edgeIdx)
+        self.vertexEdges[endIdx].add(edgeIdx)
+        return edgeIdx
+
+    def _addVertex(self, vertex: adsk.fusion.BRepVertex) -> int:
+        tempId = vertex.tempId
+        if (vertexIdx := self.vertexIndex.get(tempId)) is not None:
+            return vertexIdx
+
+        vertexIdx = len(self.vertices)
+        self.vertices.append(vertex)
+        self.vertexIndex[tempId] = vertexIdx
+        self.vertexPoints.append(tuple(vertex.geometry.asArray()))
+        self.vertexEdges.append(set())
+        return vertexIdx
+
+    @property
+    def signature(self) -> Hashable:
+        """
+        the same for bodies that are identical up to a rigid transform, with their topology in the same order
+        (eg copy pasted bodies) - face, edge and vertex counts, area, volume and each vertex's distance from the centroid
+        """
+        if self._signature is None:
+            count = len(self.vertexPoints)
+            centroid = vecScale(reduce(vecAdd, self.vertexPoints, (0.0, 0.0, 0.0)), 1 / max(count, 1))
+            self._signature = (
+                len(self.faces),
+                len(self.edges),
+                count,
+                round(self.body.area, 4),
+                round(self.body.volume, 4),
+                tuple(round(vecLength(vecSub(point, centroid)), 4) for point in self.vertexPoints),
+            )
+        return self._signature
+
+    def isMovedTo(self, other: "BodyTopology", transform: RigidTransform, tolerance: float = 1e-6) -> bool:
+        """
+        True if other has this body's faces, edges and vertices, connected the same way at the same indices,
+        with every face normal turned by transform - vertex positions alone don't show how they are connected
+        """
+        return (
+            other.edgeVertices == self.edgeVertices
+            and other.faceEdges == self.faceEdges
+            and other.edgeFaces == self.edgeFaces
+            and other.edgeIsOpposed == self.edgeIsOpposed
+            and other.faceIsPlanar == self.faceIsPlanar
+            and other.edgeIsLine == self.edgeIsLine
+            and other.edgeIsDegenerate == self.edgeIsDegenerate
+            and all(
+                vecLength(vecSub(rigidRotate(transform, normal), otherNormal)) < tolerance
+                for normal, otherNormal in zip(self.faceNormals, other.faceNormals)
+            )
+        )
+
+    def faceIdx(self, face: adsk.fusion.BRepFace) -> int:
+        return self.faceIndex[face.tempId]
+
+    def edgeLength(self, edgeIdx: int) -> float:
+        startIdx, endIdx = self.edgeVertices[edgeIdx]
+        return vecLength(vecSub(self.vertexPoints[endIdx], self.vertexPoints[startIdx]))
+
+    def cornerVertex(self, faceIdx: int, edgeIdx: int) -> int:
+        """
+        returns the vertex of the edge that sits on the face
+        """
+        startIdx, endIdx = self.edgeVertices[edgeIdx]
+        return startIdx if startIdx in self.faceVertices[faceIdx] else endIdx
+
+    def edgeEndPoints(self, faceIdx: int, edgeIdx: int) -> Tuple[Vec, Vec]:
+        """
+        returns edge end points, starting with the point on the face
+        """
+        startIdx, endIdx = self.edgeVertices[edgeIdx]
+        if startIdx not in self.faceVertices[faceIdx]:
+            startIdx, endIdx = endIdx, startIdx
+        return self.vertexPoints[startIdx], self.vertexPoints[endIdx]
+
+    def candidateEdges(self, faceIdx: int) -> Set[int]:
+        """
+        returns edges that touch the face vertices but don't belong to the face - ie the corner edges
+        """
+        edges = set()
+        for vertexIdx in self.faceVertices[faceIdx]:
+            edges.update(self.vertexEdges[vertexIdx])
+        return edges - self.faceEdges[faceIdx]
+
+    def cornerEdges(self, faceIdx: int, edgeIdx: int) -> Tuple[int, int]:
+        """
+        returns the 2 face edges that meet the dogbone edge at the face
+        """
+        vertexIdx = self.cornerVertex(faceIdx, edgeIdx)
+        commonEdges = self.vertexEdges[vertexIdx] & self.faceEdges[faceIdx]
+        if len(commonEdges) != 2:
+            raise NameError("returnVal len != 2")
+        return tuple(commonEdges)
+
+    def coEdgeVector(self, edgeIdx: int) -> Vec:
+        """
+        returns edge vector oriented along the coEdge of the edge's first face
+        """
+        startIdx, endIdx = self.edgeVertices[edgeIdx]
+        if self.edgeIsOpposed[edgeIdx][0]:
+            startIdx, endIdx = endIdx, startIdx
+        return vecSub(self.vertexPoints[endIdx], self.vertexPoints[startIdx])
+
+    def cornerAngle(self, edgeIdx: int) -> float:
+        """
+        returns radian angle between the two faces of the edge, 0 if either face isn't planar
+        """
+        faces = self.edgeFaces[edgeIdx]
+        if len(faces) != 2:
+            return 0
+        face1, face2 = faces
+        if not (self.faceIsPlanar[face1] and self.faceIsPlanar[face2]):
+            return 0
+        return cornerAngle(
+            self.coEdgeVector(edgeIdx), self.faceNormals[face1], self.faceNormals[face2]
+        )
+
+    def classifyCorners(self, faceIdx: int, params) -> Tuple[List[int], CornerClassification]:
+        """
+        classifies all candidate corner edges of a face in one batch
+        returns the candidate edges (straight, non-degenerate, between 2 planar faces) and their classification
+        taken from the source body if this one is a copy - the results only depend on angles, not position
+        """
+        if self.source:
+            return self.source[0].classifyCorners(faceIdx, params)
+        key = (faceIdx, stageKey(CLASSIFICATION, params))
+        if (result := self._classifications.get(key)) is None:
+            result = self._classifications[key] = self._classifyCorners(faceIdx, params)
+        return result
+
+    def _classifyCorners(self, faceIdx: int, params) -> Tuple[List[int], CornerClassification]:
+        candidates = []
+        edgeVectors = []
+        coEdgeReversed = []
+        normals1 = []
+        normals2 = []
+        faceVertices = self.faceVertices[faceIdx]
+
+        for edgeIdx in self.candidateEdges(faceIdx):
+            if self.edgeIsDegenerate[edgeIdx] or not self.edgeIsLine[edgeIdx]:
+                continue
+            faces = self.edgeFaces[edgeIdx]
+            if len(faces) != 2:
+                continue
+            face1, face2 = faces
+            if not (self.faceIsPlanar[face1] and self.faceIsPlanar[face2]):
+                continue
+            startIdx, endIdx = self.edgeVertices[edgeIdx]
+            awayFromStart = startIdx in faceVertices
+            if not awayFromStart:
+                startIdx, endIdx = endIdx, startIdx
+            candidates.append(edgeIdx)
+            edgeVectors.append(vecNormalize(vecSub(self.vertexPoints[endIdx], self.vertexPoints[startIdx])))
+            coEdgeReversed.append(awayFromStart == self.edgeIsOpposed[edgeIdx][0])
+            normals1.append(self.faceNormals[face1])
+            normals2.append(self.faceNormals[face2])
+
+        return candidates, classifyCorners(
+            edgeVectors, coEdgeReversed, normals1, normals2, self.faceNormals[faceIdx], params
+        )
+
+
+    def topFaceIdx(self, faceIdx: int) -> int:
+        """
+        returns the planar face, parallel to the face, that is furthest along the face normal - see dbutils.getTopFace
+        resolved from the snapshot planes, and cached per normal direction
+        """
+        normal = self.faceNormals[faceIdx]
+        key = tuple(round(c, 6) for c in normal)
+        if (topIdx := self._topFaces.get(key)) is not None:
+            return topIdx
+
+        topIdx, topDistance = faceIdx, vecDot(self.facePoints[faceIdx], normal)
+        for idx, faceNormal in enumerate(self.faceNormals):
+            if not self.faceIsPlanar[idx] or not vecIsParallel(normal, faceNormal):
+                continue
+            distance = vecDot(self.facePoints[idx], normal)
+            if distance >= topDistance:  # last of equals wins - same as getTopFace
+                topIdx, topDistance = idx, distance
+
+        self._topFaces[key] = topIdx
+        return topIdx
+
+    def translateVector(self, fromFaceIdx: int, toFaceIdx: int) -> Vec:
+        """
+        returns the vector along the fromFace normal, between the planes of the 2 faces - see dbutils.getTranslateVectorBetweenFaces
+        """
+        key = (fromFaceIdx, toFaceIdx)
+        if (vector := self._translateVectors.get(key)) is None:
+            normal = self.faceNormals[fromFaceIdx]
+            distance = vecDot(vecSub(self.facePoints[toFaceIdx], self.facePoints[fromFaceIdx]), normal)
+            vector = self._translateVectors[key] = vecScale(normal, distance)
+        return vector
+
+
+def bodyTopology(
+    body: adsk.fusion.BRepBody, cache: Dict[int, BodyTopology], signatures: Optional[Dict[Hashable, BodyTopology]] = None
+) -> BodyTopology:
+    """
+    returns the snapshot of a body - taken from cache if the body has already been walked
+    with signatures, a new snapshot is matched against earlier bodies of the same signature - see BodyTopology.source
+    """
+    key = hash(body.entityToken)
+    if (topology := cache.get(key)) is None:
+        topology = cache[key] = BodyTopology(body)
+        if signatures is not None:
+            matchSource(topology, signatures)
+    return topology
+
+
+def matchSource(topology: BodyTopology, signatures: Dict[Hashable, BodyTopology]):
+    """
+    sets topology.source if an earlier body has the same signature and really is a moved copy - same vertices, edges
+    and faces, in the same order - else registers it. A body that only matches some of that is classified on its own
+    """
+    source = signatures.get(topology.signature)
+    transform = source and rigidTransform(source.vertexPoints, topology.vertexPoints)
+    if transform and source.isMovedTo(topology, transform):
+        topology.source = (source, transform)
+        source.copies += 1
+        logger.debug(f"topology: body {topology.body.name} is a copy of {source.body.name}")
+    elif source is None:
+        signatures[topology.signature] = topology
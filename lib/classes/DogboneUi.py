@@ -6,14 +6,17 @@ import adsk.core
 import adsk.fusion
 import logging
 
-from ..utils import getFaceNormal
+from ..utils import getFaceNormal, apiCounter
 from . import DbParams, Selection, DbFace
+from .DbStages import CLASSIFICATION, stageKey
+from .DbPreview import PreviewDetail, clearPreview
 from ..utils.decorators import eventHandler, parseDecorator
 from ..common.log import LEVELS, startLogger, stopLogger
 from ..utils.util import calcId
 from ...constants import (
     ACUTE_ANGLE,
     ANGLE_DETECTION_GROUP,
+    API_COUNT,
     BENCHMARK,
     DEPTH_EXTENT,
     DOGBONE_TYPE,
@@ -36,10 +39,24 @@ from ...constants import (
     ON_SHORT_SIDE,
     PARAMETRIC,
     PREVIEW_ENABLE,
+    PREVIEW_BUDGET,
     SETTINGS_GROUP,
     STATIC,
     TOOL_DIAMETER,
     TOOL_DIAMETER_OFFSET,
+    TOOL_BODY_MODE,
+    AUTO_TOOL_BODIES,
+    SINGLE_TOOL_BODY,
+    SEPARATE_TOOL_BODIES,
+    TOOL_BACKEND,
+    AUTO_BACKEND,
+    CYLINDER_BACKEND,
+    EXTRUSION_BACKEND,
+    HOLE_BACKEND,
+    TIMELINE_OUTPUT,
+    PER_COMPONENT_OUTPUT,
+    CONSOLIDATED_OUTPUT,
+    DEFER_COMPUTE,
     EDGE_TOOLTIP,
     FACE_TOOLTIP,
     EDGE_TOOLTIP_PREVIEW,
@@ -50,6 +67,28 @@ from ...constants import (
 _appPath = os.path.dirname(os.path.abspath(__file__))
 logger = logging.getLogger('dogbone.ui')
 
+# inputs that can change what the preview shows - any other (logging, benchmark, group expansion ...) leaves it as it is
+PREVIEW_INPUTS = {
+    FACE_SELECT,
+    EDGE_SELECT,
+    TOOL_DIAMETER,
+    TOOL_DIAMETER_OFFSET,
+    DOGBONE_TYPE,
+    MINIMAL_PERCENT,
+    MORTISE_TYPE,
+    DEPTH_EXTENT,
+    MODE_ROW,
+    ACUTE_ANGLE,
+    OBTUSE_ANGLE,
+    MIN_SLIDER,
+    MAX_SLIDER,
+    PREVIEW_ENABLE,
+    PREVIEW_BUDGET,
+    TOOL_BODY_MODE,
+    TOOL_BACKEND,
+    TIMELINE_OUTPUT,
+}
+
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection,PyMethodMayBeStatic
 class DogboneUi:
     """
@@ -80,6 +119,10 @@ class DogboneUi:
 
         self.selection = Selection()
         self.previewActive = True
+        self.previewDetail = PreviewDetail()
+        self.previewDirty = True  # a PREVIEW_INPUTS input changed since the last preview
+        self.previewedState = None  # selection fingerprint and budget the preview on screen was made from
+        self.classificationKey = stageKey(CLASSIFICATION, self.param)  # detection mode the selected faces' edges were registered with
 
         self.inputs = command.commandInputs
 
@@ -88,6 +131,8 @@ class DogboneUi:
         else:
             startLogger()
 
+        self.countApiCalls()
+
         self.create_ui()
         self.onInputChanged(event=command.inputChanged)
         self.onValidate(event=command.validateInputs)
@@ -96,6 +141,14 @@ class DogboneUi:
         self.onExecutePreview(event=command.executePreview)
         self.onKeyDown(event=command.keyDown)
         self.onKeyUp(event=command.keyUp)
+        self.onDestroy(event=command.destroy)
+
+    def countApiCalls(self):
+        """starts or stops the api call counter to match the settings"""
+        if self.param.apiCount:
+            apiCounter.start()
+        else:
+            apiCounter.stop()
 
     def create_ui(self):
         self.face_select()
@@ -120,6 +173,8 @@ class DogboneUi:
         self.param.toolDiaStr = inputs[TOOL_DIAMETER].expression
         self.param.toolDiaOffsetStr = inputs[TOOL_DIAMETER_OFFSET].expression
         self.param.benchmark = inputs[BENCHMARK].value
+        self.param.apiCount = inputs[API_COUNT].value
+        self.countApiCalls()
         self.param.dbType = inputs[DOGBONE_TYPE].selectedItem.name
         self.param.minimalPercent = inputs[MINIMAL_PERCENT].value
         self.param.fromTop = inputs[DEPTH_EXTENT].selectedItem.name == FROM_TOP_FACE
@@ -132,6 +187,11 @@ class DogboneUi:
         self.param.expandModeGroup = (inputs[MODE_GROUP]).isExpanded
         self.param.expandSettingsGroup = (inputs[SETTINGS_GROUP]).isExpanded
         self.param.previewEnabled = inputs[PREVIEW_ENABLE].value
+        self.param.previewBudget = inputs[PREVIEW_BUDGET].value
+        self.param.toolBodyMode = inputs[TOOL_BODY_MODE].selectedItem.name
+        self.param.toolBackend = inputs[TOOL_BACKEND].selectedItem.name
+        self.param.timelineOutput = inputs[TIMELINE_OUTPUT].selectedItem.name
+        self.param.deferCompute = inputs[DEFER_COMPUTE].value
 
         mainlogger = logging.getLogger("dogbone")
 
@@ -160,6 +220,7 @@ class DogboneUi:
         )
         logger.debug(f"param.toolDiaOffset = {self.param.toolDiaOffset}")
         logger.debug(f"param.benchmark = {self.param.benchmark}")
+        logger.debug(f"param.apiCount = {self.param.apiCount}")
         logger.debug(f"param.mortiseType = {self.param.longSide}")
         logger.debug(f"param.expandModeGroup = {self.param.expandModeGroup}")
         logger.debug(
@@ -168,26 +229,48 @@ class DogboneUi:
 
     @eventHandler(handler_cls=adsk.core.CommandEventHandler)
     def onExecutePreview(self, args:adsk.core.CommandEventArgs):
-        if self.previewActive and self.param.previewEnabled:
-            args.isValidResult = True
-            self.executeHandler(self.param, self.selection)
+        if not (self.previewActive and self.param.previewEnabled):
+            self.previewDetail.cancel()
+            clearPreview(self.selection)
+            self.previewedState = None
+            self.previewDirty = True  #the state is worked out again when the preview comes back
+            return
+        changed = self.previewedState is None
+        if self.previewDirty:
+            state = (self.selection.fingerprint(self.param), self.param.previewBudget)
+            changed = changed or state != self.previewedState  #an input can change and end up where it was
+            self.previewedState = state
+            self.previewDirty = False
+        self.previewDetail.show(self.param, self.selection, self.executeHandler, changed)  #as detailed as the budget allows
 
     @eventHandler(handler_cls=adsk.core.CommandEventHandler)
     def onExecute(self, args):
-        self.executeHandler(self.param, self.selection)
+        self.previewDetail.cancel()
+        clearPreview(self.selection)
+        with self.selection.reusePreview(self.param):  #unchanged since the last preview - its tool bodies and unions are committed as they are
+            self.executeHandler(self.param, self.selection)
+
+    @eventHandler(handler_cls=adsk.core.CommandEventHandler)
+    def onDestroy(self, args):
+        self.previewDetail.stop()
+        clearPreview(self.selection)  #custom graphics aren't rolled back with the command
+        self.selection.toolBodyCache.clear()  #templates and kept layouts are temporary B-reps - released with the dialog
+        self.selection.previewCache.clear()  #so are the specs, bodies and unions kept between previews
+        apiCounter.stop()  #patched classes are shared with every other add-in - never leave them behind
 
     @eventHandler(handler_cls=adsk.core.KeyboardEventHandler)
     def onKeyDown(self, args:adsk.core.KeyboardEventArgs):
-        keyCode = args.keyCode
-        modifier = args.modifierMask  
-        self.previewActive = not keyCode == adsk.core.KeyCodes.ControlKeyCode
+        """holding ctrl hides the preview - other keys don't touch it"""
+        if args.keyCode != adsk.core.KeyCodes.ControlKeyCode or not self.previewActive:
+            return
+        self.previewActive = False
         self.command.doExecutePreview()
 
     @eventHandler(handler_cls=adsk.core.KeyboardEventHandler)
     def onKeyUp(self, args):
-        keyCode = args.keyCode
-        modifier = args.modifierMask  
-        self.previewActive = keyCode == adsk.core.KeyCodes.ControlKeyCode  
+        if args.keyCode != adsk.core.KeyCodes.ControlKeyCode or self.previewActive:
+            return
+        self.previewActive = True
         self.command.doExecutePreview()
   
 
@@ -332,6 +415,8 @@ class DogboneUi:
     def onInputChanged(self, args: adsk.core.InputChangedEventArgs):
         input: adsk.core.CommandInput = args.input
         logger.debug(f"input changed- {input.id}")
+        if input.id in PREVIEW_INPUTS:
+            self.previewDirty = True  #the next preview compares fingerprints - other inputs leave it on screen
 
         # TODO: instead of finding the elements again via id, better to take the reference. Then the casting is
         # not necessary anymore and the code becomes way slimmer
@@ -417,6 +502,10 @@ class DogboneUi:
                 or input.id == MAX_SLIDER
                 or input.id == MODE_ROW
         ):  # refresh edges after specific input changes
+            classificationKey = stageKey(CLASSIFICATION, self.param)
+            if classificationKey == self.classificationKey:
+                return  #eg the mode row - the same edges are accepted, nothing to register again
+            self.classificationKey = classificationKey
             previewState = self.previewActive #need to disable preview, otherwise the wrong entities are displayed/Selected 
             self.previewActive = False
             self.command.doExecutePreview()
@@ -426,9 +515,6 @@ class DogboneUi:
             focusState:adsk.core.SelectionCommandInput = input.parentCommand.commandInputs.itemById(FACE_SELECT).hasFocus
             edgeSelectCommand.hasFocus = True
 
-            for edgeObj in self.selection.selectedEdges.values():
-                self.ui.activeSelections.removeByEntity(edgeObj.edge)
-
             for faceObj in self.selection.selectedFaces.values():
                 faceObj.reSelectEdges()
 
@@ -527,6 +613,7 @@ class DogboneUi:
                     activeOccurrenceId
                 ] = faces  # adds a face to a list of faces associated with this occurrence
                 self.selection.selectedFaces.update({faceObj.faceId: faceObj for faceObj in createdFace})
+                self.selection.focus = createdFace[0].refPoint
 
                 for face_id in addedFaces:
                     self.selection.selectedFaces[face_id].selectAll()
@@ -551,11 +638,16 @@ class DogboneUi:
             changedEdgeIdSet = set(
                 map(calcId, changedSelectionList)
             )  # converts list of edges to a list of their edgeIds
-            missingEdges = set(self.selection.selectedEdges.keys()) - changedEdgeIdSet
-            # noinspection PyStatementEffect
+            missingEdges = [
+                edgeObj
+                for edgeId, edgeObj in self.selection.selectedEdges.items()
+                if edgeObj.isSelected and edgeId not in changedEdgeIdSet
+            ]  #selected before this click, not any more - edges deselected by earlier clicks aren't in it
 
-            for missingEdge in missingEdges:
-                self.selection.selectedEdges[missingEdge].deselect()
+            for edgeObj in missingEdges:
+                edgeObj.deselect()
+            if missingEdges:
+                self.selection.focus = missingEdges[-1].dogboneCentre  #the edge just clicked
 
             # Note - let the user manually unselect the face if they want to choose a different face
 
@@ -574,6 +666,7 @@ class DogboneUi:
             self.selection.selectedEdges[
                 calcId(edge)
             ].select()  # Get selectedFace then get selectedEdge, then call function
+            self.selection.focus = self.selection.selectedEdges[calcId(edge)].dogboneCentre
 
     def detection_mode(self):
         angleDetectionGroupInputs: adsk.core.GroupCommandInput = (
@@ -693,10 +786,18 @@ class DogboneUi:
         previewEnabled.tooltip = "Activates live preview"
         previewEnabled.tooltipDescription =(
                                             "<br>Use ctrl-click when preview is active"
-                                            "<br><br>Warning:"
-                                            "<br>the number of edges selected,"
-                                            "<br>along with the power of your computer and"
-                                            "<br>graphics card may result in a delay in showing the preview"
+                                            "<br><br>The preview shows the full cut while it's quick enough, "
+                                            "then steps down to tool bodies drawn over the model, faceted dogbones "
+                                            "and finally centre line markers - see Preview budget"
+        )
+
+        previewBudget = group.children.addValueInput(
+            PREVIEW_BUDGET, "Preview budget (ms)", "", adsk.core.ValueInput.createByReal(self.param.previewBudget)
+        )
+        previewBudget.tooltip = "Longest a preview should take"
+        previewBudget.tooltipDescription = (
+            "When a preview takes longer than this, the next one is drawn in less detail. "
+            "Full detail comes back once the selection is small enough."
         )
 
         benchMark = group.children.addBoolValueInput(
@@ -704,7 +805,17 @@ class DogboneUi:
         )
         benchMark.tooltip = "Enables benchmarking"
         benchMark.tooltipDescription = (
-            "When enabled, shows overall time taken to process all selected dogbones."
+            "When enabled, shows overall time taken to process all selected dogbones, "
+            "and the time each tool generation method takes on the same selection."
+        )
+
+        apiCount = group.children.addBoolValueInput(
+            API_COUNT, "Count API calls", True, "", self.param.apiCount
+        )
+        apiCount.tooltip = "Counts Fusion API calls"
+        apiCount.tooltipDescription = (
+            "When enabled, shows the number of Fusion API calls made per dogbone edge, broken down by phase."
+            "<br>Call site details are written to the log. Slows processing down while enabled."
         )
 
         log: adsk.core.DropDownCommandInput = (
@@ -724,6 +835,68 @@ class DogboneUi:
         log.listItems.add("Debug", self.param.logging == 10)
         log.listItems.add("Info", self.param.logging == 20)
 
+        toolBodyMode: adsk.core.DropDownCommandInput = (
+            group.children.addDropDownCommandInput(
+                TOOL_BODY_MODE,
+                "Tool bodies",
+                adsk.core.DropDownStyles.TextListDropDownStyle,
+            )
+        )
+        toolBodyMode.tooltip = "How dogbone tool bodies are passed to the cut"
+        toolBodyMode.tooltipDescription = (
+            "Single body: all tool bodies are unioned first, then cut once.\n"
+            "Separate bodies: no unions - the cut uses every tool body.\n"
+            "Auto: separate bodies for a few dogbones, one body when they overlap a lot, "
+            "otherwise small unioned clusters of neighbouring dogbones."
+        )
+        for mode in (AUTO_TOOL_BODIES, SINGLE_TOOL_BODY, SEPARATE_TOOL_BODIES):
+            toolBodyMode.listItems.add(mode, self.param.toolBodyMode == mode)
+
+        toolBackend: adsk.core.DropDownCommandInput = (
+            group.children.addDropDownCommandInput(
+                TOOL_BACKEND,
+                "Tool generation",
+                adsk.core.DropDownStyles.TextListDropDownStyle,
+            )
+        )
+        toolBackend.tooltip = "How the dogbone cuts are generated"
+        toolBackend.tooltipDescription = (
+            "Cylinders: every dogbone is a copy of a cached tool body.\n"
+            "Planar extrusion: dogbones starting on the same plane, at the same depth, are extruded as one profile.\n"
+            "Hole features: flat bottomed hole features instead of tool bodies - plain corners starting on the "
+            "selected (or top) face only, and not updated by Refresh.\n"
+            "Auto: the quickest tool body method for the number and type of dogbones.\n"
+            "Enable benchmark to time every method on the selection."
+        )
+        for backend in (AUTO_BACKEND, CYLINDER_BACKEND, EXTRUSION_BACKEND, HOLE_BACKEND):
+            toolBackend.listItems.add(backend, self.param.toolBackend == backend)
+
+        timelineOutput: adsk.core.DropDownCommandInput = (
+            group.children.addDropDownCommandInput(
+                TIMELINE_OUTPUT,
+                "Timeline output",
+                adsk.core.DropDownStyles.TextListDropDownStyle,
+            )
+        )
+        timelineOutput.tooltip = "How the dogbones appear in the timeline"
+        timelineOutput.tooltipDescription = (
+            "Group per component: a timeline group for each component (and each body outside components).\n"
+            "Consolidated: one timeline group for the whole run, with one base feature per component - "
+            "fewer timeline objects for Fusion to recompute on later edits and undo."
+        )
+        for output in (PER_COMPONENT_OUTPUT, CONSOLIDATED_OUTPUT):
+            timelineOutput.listItems.add(output, self.param.timelineOutput == output)
+
+        deferCompute = group.children.addBoolValueInput(
+            DEFER_COMPUTE, "Defer compute", True, "", self.param.deferCompute
+        )
+        deferCompute.tooltip = "Computes the design once, after all dogbones are added"
+        deferCompute.tooltipDescription = (
+            "When enabled, Fusion doesn't recompute the design after every dogbone feature - "
+            "it computes once at the end of Create and Refresh.<br>"
+            "Features that fail to compute are reported with their component afterwards."
+        )
+
     def offset(self):
 
         ui = self.inputs.addValueInput(
@@ -1,4 +1,9 @@
 from .DbClasses import *
 from .DbContext import *
 from .DbData import *
-from .DogboneUi import *
\ No newline at end of file
+from .DogboneUi import *
+from .DbTopology import *
+from .DbToolCache import *
+from .DbBackends import *
+from .DbPreview import *
+from .DbStages import *
\ No newline at end of file
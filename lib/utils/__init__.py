@@ -1,3 +1,7 @@
+from .apiCounter import *
 from .dbutils import *
 from .decorators import *
-from .util import *
\ No newline at end of file
+from .geometry import *
+from .profile import *
+from .union import *
+from .util import *
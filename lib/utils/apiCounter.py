@@ -0,0 +1,209 @@
+"""Opt-in Fusion API call counter
+
+Counts property reads and method calls made on the adsk entity classes, keyed by phase and call site.
+Counting patches the classes themselves rather than wrapping the entities, so objects handed back to the API
+are untouched - the patches are removed again by stop().
+Only the outermost call is counted, calls the API makes on itself are not round-trips.
+"""
+import logging
+import os
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import adsk.core
+import adsk.fusion
+
+logger = logging.getLogger("dogbone.apiCounter")
+
+COUNTED_CLASSES = {
+    adsk.core: (
+        "Point3D",
+        "Vector3D",
+        "Matrix3D",
+        "Plane",
+        "Line3D",
+        "InfiniteLine3D",
+        "Cylinder",
+        "BoundingBox3D",
+        "OrientedBoundingBox3D",
+        "ObjectCollection",
+        "Attributes",
+        "Attribute",
+        "UnitsManager",
+    ),
+    adsk.fusion: (
+        "BRepBody",
+        "BRepBodies",
+        "BRepFace",
+        "BRepFaces",
+        "BRepLoop",
+        "BRepLoops",
+        "BRepCoEdge",
+        "BRepCoEdges",
+        "BRepEdge",
+        "BRepEdges",
+        "BRepVertex",
+        "BRepVertices",
+        "SurfaceEvaluator",
+        "TemporaryBRepManager",
+        "Occurrence",
+        "Component",
+        "Design",
+        "UnitsManager",
+        "FusionUnitsManager",
+        "BaseFeature",
+        "BaseFeatures",
+        "CombineFeatures",
+    ),
+}
+
+
+class ApiCounter:
+    """
+    counts - Counter keyed by (phase, call site, "Class.member")
+    call site is "file:line function" of the add-in code making the call
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self._phases: List[str] = ["other"]
+        self._depth = 0
+        self._patched: List[Tuple[type, str, object, bool]] = []  # (class, name, original, was own attribute)
+
+    @property
+    def isActive(self) -> bool:
+        return bool(self._patched)
+
+    def start(self):
+        """patches the counted classes - does nothing if already counting"""
+        if self.isActive:
+            return
+        self.reset()
+        patchedClasses = set()
+        for module, classNames in COUNTED_CLASSES.items():
+            for className in classNames:
+                cls = getattr(module, className, None)
+                if isinstance(cls, type) and cls not in patchedClasses:
+                    patchedClasses.add(cls)
+                    self._patchClass(cls)
+        logger.info(f"counting api calls - {len(self._patched)} members patched")
+
+    def stop(self):
+        """removes all patches, in reverse order so double patched members unwind correctly"""
+        for cls, name, original, isOwn in reversed(self._patched):
+            if isOwn:
+                setattr(cls, name, original)
+            else:
+                delattr(cls, name)
+        self._patched = []
+
+    def reset(self):
+        self.counts.clear()
+
+    @contextmanager
+    def phase(self, name: str):
+        """names the work being counted - nested phases count against the innermost"""
+        self._phases.append(name)
+        try:
+            yield
+        finally:
+            self._phases.pop()
+
+    def total(self, phase: str = None) -> int:
+        return sum(
+            count for (countPhase, _, _), count in self.counts.items() if phase in (None, countPhase)
+        )
+
+    def byPhase(self) -> Dict[str, int]:
+        phases = Counter()
+        for (phase, _, _), count in self.counts.items():
+            phases[phase] += count
+        return dict(phases.most_common())
+
+    def summary(self, edgeCount: int) -> str:
+        """one line per phase - edgeCount is the number of dogbone edges the counted work was done for"""
+        perEdge = max(edgeCount, 1)
+        lines = [f"{self.total() / perEdge:.1f} API calls per edge ({self.total()} calls, {edgeCount} edges)"]
+        lines += [
+            f"    {phase}: {count / perEdge:.1f} per edge" for phase, count in self.byPhase().items()
+        ]
+        return "\n".join(lines)
+
+    def report(self, edgeCount: int, top: int = 10) -> str:
+        """summary plus the busiest call sites of each phase"""
+        lines = [self.summary(edgeCount)]
+        for phase in self.byPhase():
+            lines.append(f"{phase}:")
+            calls = [
+                (count, site, member)
+                for (countPhase, site, member), count in self.counts.items()
+                if countPhase == phase
+            ]
+            for count, site, member in sorted(calls, reverse=True)[:top]:
+                lines.append(f"    {count:>8}  {member:<40} {site}")
+        return "\n".join(lines)
+
+    def _count(self, member: str):
+        frame = sys._getframe(2)  # _count <- wrapper <- call site
+        site = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+        self.counts[(self._phases[-1], site, member)] += 1
+
+    def _counting(self, member: str, func):
+        counter = self
+
+        def wrapper(*args, **kwargs):
+            if counter._depth:
+                return func(*args, **kwargs)
+            counter._count(member)
+            counter._depth += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counter._depth -= 1
+
+        wrapper.__name__ = getattr(func, "__name__", member)
+        wrapper.__doc__ = getattr(func, "__doc__", None)
+        return wrapper
+
+    def _patchClass(self, cls: type):
+        for name in dir(cls):
+            if name.startswith("_"):
+                continue
+            attribute = None
+            for base in cls.__mro__:
+                if name in base.__dict__:
+                    attribute = base.__dict__[name]
+                    break
+            member = f"{cls.__name__}.{name}"
+
+            if isinstance(attribute, property):
+                if attribute.fget is None:
+                    continue
+                patched = property(
+                    self._counting(member, attribute.fget), attribute.fset, attribute.fdel, attribute.__doc__
+                )
+            elif isinstance(attribute, staticmethod):
+                patched = staticmethod(self._counting(member, attribute.__func__))
+            elif isinstance(attribute, classmethod):
+                patched = classmethod(self._counting(member, attribute.__func__))
+            elif callable(attribute) and not isinstance(attribute, type):
+                patched = self._counting(member, attribute)
+            else:
+                continue  # constants and nested classes
+
+            isOwn = name in cls.__dict__
+            self._patched.append((cls, name, cls.__dict__.get(name), isOwn))
+            setattr(cls, name, patched)
+
+
+apiCounter = ApiCounter()
+
+
+def apiPhase(name: str):
+    """
+    names the API calls made inside - use as a context manager or as a decorator
+    costs next to nothing when the counter isn't running
+    """
+    return apiCounter.phase(name)
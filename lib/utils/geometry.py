@@ -0,0 +1,216 @@
+"""Pure python vector helpers - work on plain (x, y, z) tuples so hot loops don't need Fusion API round-trips"""
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+Vec = Tuple[float, float, float]
+
+TOLERANCE = 1e-6
+
+
+def vecAdd(a: Vec, b: Vec) -> Vec:
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def vecSub(a: Vec, b: Vec) -> Vec:
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def vecScale(a: Vec, s: float) -> Vec:
+    return (a[0] * s, a[1] * s, a[2] * s)
+
+
+def vecDot(a: Vec, b: Vec) -> float:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def vecCross(a: Vec, b: Vec) -> Vec:
+    return (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    )
+
+
+def vecLength(a: Vec) -> float:
+    return math.sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+
+
+def vecNormalize(a: Vec) -> Vec:
+    length = vecLength(a)
+    if length < TOLERANCE:
+        return a
+    return (a[0] / length, a[1] / length, a[2] / length)
+
+
+def vecRound(a: Vec, digits: int = 6) -> Vec:
+    """rounded copy - for use in dict keys"""
+    return (round(a[0], digits) + 0.0, round(a[1], digits) + 0.0, round(a[2], digits) + 0.0)  #+0.0 folds -0.0 into 0.0
+
+
+def vecAngle(a: Vec, b: Vec) -> float:
+    """
+    returns radian angle between two vectors - same as Vector3D.angleTo
+    """
+    lengths = vecLength(a) * vecLength(b)
+    if lengths < TOLERANCE:
+        return 0.0
+    return math.acos(max(-1.0, min(1.0, vecDot(a, b) / lengths)))
+
+
+def vecIsParallel(a: Vec, b: Vec) -> bool:
+    """
+    True if both vectors lie on the same line, irrespective of direction - same as Vector3D.isParallelTo
+    """
+    lengths = vecLength(a) * vecLength(b)
+    if lengths < TOLERANCE:
+        return False
+    return vecLength(vecCross(a, b)) / lengths < TOLERANCE
+
+
+RigidTransform = Tuple[Tuple[Vec, Vec, Vec], Vec]  # (rotation rows, translation) - rotate, then translate
+
+
+def rigidApply(transform: RigidTransform, point: Vec) -> Vec:
+    rows, translation = transform
+    return vecAdd((vecDot(rows[0], point), vecDot(rows[1], point), vecDot(rows[2], point)), translation)
+
+
+def rigidRotate(transform: RigidTransform, vector: Vec) -> Vec:
+    rows, _ = transform
+    return (vecDot(rows[0], vector), vecDot(rows[1], vector), vecDot(rows[2], vector))
+
+
+def rigidInverse(transform: RigidTransform) -> RigidTransform:
+    rows, translation = transform
+    inverse = tuple(zip(*rows))
+    return inverse, vecScale(rigidRotate((inverse, translation), translation), -1)
+
+
+def _pointFrame(points: Sequence[Vec], i: int, j: int, k: int) -> Tuple[Vec, Vec, Vec]:
+    """right handed orthonormal frame from 3 points - x towards j, y towards k"""
+    xAxis = vecNormalize(vecSub(points[j], points[i]))
+    zAxis = vecNormalize(vecCross(xAxis, vecSub(points[k], points[i])))
+    return xAxis, vecCross(zAxis, xAxis), zAxis
+
+
+def rigidTransform(fromPoints: Sequence[Vec], toPoints: Sequence[Vec], tolerance: float = 1e-5) -> Optional[RigidTransform]:
+    """
+    rotation and translation moving every fromPoint onto the toPoint of the same index - None if there isn't one
+    (different counts, a mirror image, or not the same shape)
+    """
+    if len(fromPoints) != len(toPoints) or not fromPoints:
+        return None
+    # frame points - the first point, the one farthest from it, and the one farthest from the line between them
+    j = max(range(len(fromPoints)), key=lambda n: vecLength(vecSub(fromPoints[n], fromPoints[0])))
+    axis = vecNormalize(vecSub(fromPoints[j], fromPoints[0]))
+    k = max(
+        range(len(fromPoints)),
+        key=lambda n: vecLength(vecCross(axis, vecSub(fromPoints[n], fromPoints[0]))),
+    )
+    if vecLength(vecCross(axis, vecSub(fromPoints[k], fromPoints[0]))) < tolerance:
+        return None  # points on a line - no unique rotation
+
+    fromFrame, toFrame = _pointFrame(fromPoints, 0, j, k), _pointFrame(toPoints, 0, j, k)
+    rows = tuple(
+        tuple(sum(toFrame[n][r] * fromFrame[n][c] for n in range(3)) for c in range(3)) for r in range(3)
+    )  #toFrame transposed times fromFrame
+    transform = (rows, (0.0, 0.0, 0.0))
+    transform = (rows, vecSub(toPoints[0], rigidApply(transform, fromPoints[0])))
+    for a, b in zip(fromPoints, toPoints):
+        if vecLength(vecSub(rigidApply(transform, a), b)) > tolerance:
+            return None
+    return transform
+
+
+def cornerAngle(edgeVec: Vec, normal1: Vec, normal2: Vec) -> float:
+    """
+    returns radian angle between the two faces meeting at an edge - see dbutils.getAngleBetweenFaces
+    edgeVec must already be oriented along the coEdge of face1
+    """
+    normalAngle = vecAngle(normal1, normal2)
+    cross = vecCross(normal2, normal1)
+    if vecDot(edgeVec, cross) < 0:
+        return (math.pi * 2) - (math.pi - normalAngle)
+    return math.pi - normalAngle
+
+
+@dataclass
+class CornerClassification:
+    """Per corner results of classifyCorners - all lists are in the same order as the kernel inputs"""
+
+    angles: List[float]  # radian angle between the 2 faces meeting at the corner edge
+    isInside: List[bool]  # True for inside (concave) corners
+    isPerpendicular: List[bool]  # True if the corner edge drops straight down from the face
+    isAccepted: List[bool]  # True if the corner passes the perpendicular check and the detection mode angle limits
+
+
+def isAngleAccepted(angle: float, params) -> bool:
+    """
+    applies the detection mode rules to a corner angle in degrees (rounded to 3 decimals)
+    params needs acuteAngle, obtuseAngle, minAngleLimit and maxAngleLimit - normally DbParams
+    """
+    acute, obtuse = params.acuteAngle, params.obtuseAngle
+    if (abs(angle - 90) > 0.001) and not (acute or obtuse):
+        return False  # Angle outside tolerance and we're just doing 90 corners
+    if not (params.minAngleLimit < angle <= 90) and acute and not obtuse:
+        return False  # angle less than lowest limit and doing acute angles
+    if not (90 <= angle < params.maxAngleLimit) and not acute and obtuse:
+        return False  # angle greater than max limit and doing obtuse angles
+    if not (params.minAngleLimit < angle < params.maxAngleLimit) and acute and obtuse:
+        return False  # angle between min and max and doing both acute and obtuse
+    return True
+
+
+def classifyCorners(
+    edgeVectors: Sequence[Vec],
+    coEdgeReversed: Sequence[bool],
+    normals1: Sequence[Vec],
+    normals2: Sequence[Vec],
+    faceNormal: Vec,
+    params,
+) -> CornerClassification:
+    """
+    Batch corner classification for every candidate edge of a face in one call
+
+    edgeVectors - normalised edge vectors pointing away from the selected face
+    coEdgeReversed - True if edgeVector runs against the coEdge of the edge's first face
+    normals1, normals2 - normals of the edge's first and second face
+    faceNormal - normal of the selected face
+    """
+    angles = []
+    isInside = []
+    isPerpendicular = []
+    isAccepted = []
+    acos, sqrt, pi = math.acos, math.sqrt, math.pi
+    fx, fy, fz = faceNormal
+
+    for (ex, ey, ez), reverse, (ax, ay, az), (bx, by, bz) in zip(
+        edgeVectors, coEdgeReversed, normals1, normals2
+    ):
+        # angle between normals
+        lengths = sqrt((ax * ax + ay * ay + az * az) * (bx * bx + by * by + bz * bz))
+        cosine = (ax * bx + ay * by + az * bz) / lengths if lengths > TOLERANCE else 1.0
+        normalAngle = acos(max(-1.0, min(1.0, cosine)))
+
+        # normal2 x normal1 against coEdge direction - opposed means a convex (outside) corner
+        cx, cy, cz = by * az - bz * ay, bz * ax - bx * az, bx * ay - by * ax
+        direction = ex * cx + ey * cy + ez * cz
+        inside = (-direction if reverse else direction) >= 0
+        angle = pi - normalAngle if inside else pi + normalAngle
+
+        # edge parallel to face normal, and pointing down into the body
+        ix, iy, iz = ey * fz - ez * fy, ez * fx - ex * fz, ex * fy - ey * fx
+        perpendicular = (
+            sqrt(ix * ix + iy * iy + iz * iz) < TOLERANCE
+            and not (abs(ex - fx) < TOLERANCE and abs(ey - fy) < TOLERANCE and abs(ez - fz) < TOLERANCE)
+        )
+
+        angles.append(angle)
+        isInside.append(inside)
+        isPerpendicular.append(perpendicular)
+        isAccepted.append(
+            perpendicular and isAngleAccepted(round(angle * 180 / pi, 3), params)
+        )
+
+    return CornerClassification(angles, isInside, isPerpendicular, isAccepted)
@@ -0,0 +1,149 @@
+"""Planar profiles extruded straight into temporary solids - one BRepBodyDefinition, no booleans
+
+Profiles are closed loops of lines and convex (counter clockwise) arcs on the xy plane, themselves running
+counter clockwise seen from +z. Every loop becomes its own lump, extruded from z=0 up to its height,
+so the loops of one call must not overlap.
+"""
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import adsk.core
+import adsk.fusion
+
+from .geometry import TOLERANCE
+
+Point2D = Tuple[float, float]
+
+logger = logging.getLogger("dogbone.profile")
+
+
+@dataclass(frozen=True)
+class Segment:
+    """line from start to end - or, with a centre, an arc running counter clockwise around it"""
+
+    start: Point2D
+    end: Point2D
+    centre: Optional[Point2D] = None
+
+
+Loop = List[Segment]
+
+
+def circleProfile(centre: Point2D, radius: float) -> Loop:
+    """circle as 2 half arcs - every side face then has 4 edges, no seams to heal"""
+    cx, cy = centre
+    right, left = (cx + radius, cy), (cx - radius, cy)
+    return [Segment(right, left, centre), Segment(left, right, centre)]
+
+
+def keyholeProfile(
+    radius: float, slotLength: float, direction: Point2D = (1.0, 0.0), centre: Point2D = (0.0, 0.0)
+) -> Loop:
+    """
+    outline of a circle joined by a slot, radius * 2 wide, running slotLength from the centre along direction
+    - ie the union of a dogbone cylinder and its acute angle clearance box, seen down the edge
+    slotLength must be positive
+    """
+    ux, uy = direction
+    cx, cy = centre
+
+    def at(u: float, v: float) -> Point2D:
+        return (cx + u * ux - v * uy, cy + u * uy + v * ux)  #slot coordinates to xy - u along direction, v across it
+
+    back = [Segment(at(0, radius), at(0, -radius), centre)]  #half circle behind the slot
+    if slotLength >= radius - TOLERANCE:
+        return back + [
+            Segment(at(0, -radius), at(slotLength, -radius)),
+            Segment(at(slotLength, -radius), at(slotLength, radius)),
+            Segment(at(slotLength, radius), at(0, radius)),
+        ]
+    # short slot - the circle still bulges past the slot end
+    chord = math.sqrt(radius * radius - slotLength * slotLength)
+    return back + [
+        Segment(at(0, -radius), at(slotLength, -radius)),
+        Segment(at(slotLength, -radius), at(slotLength, -chord)),
+        Segment(at(slotLength, -chord), at(slotLength, chord), centre),
+        Segment(at(slotLength, chord), at(slotLength, radius)),
+        Segment(at(slotLength, radius), at(0, radius)),
+    ]
+
+
+def _sweep(segment: Segment) -> float:
+    """counter clockwise angle of an arc segment, 0 to 2pi"""
+    cx, cy = segment.centre
+    startAngle = math.atan2(segment.start[1] - cy, segment.start[0] - cx)
+    endAngle = math.atan2(segment.end[1] - cy, segment.end[0] - cx)
+    sweep = (endAngle - startAngle) % (2 * math.pi)
+    return sweep or 2 * math.pi
+
+
+def extrudeProfiles(loops: Sequence[Loop], heights: Sequence[float]) -> adsk.fusion.BRepBody:
+    """
+    temporary body with every loop extruded from z=0 up by its height, each loop a lump of its own
+    """
+    point = adsk.core.Point3D.create
+    vector = adsk.core.Vector3D.create
+    zAxis = vector(0, 0, 1)
+
+    bodyDef = adsk.fusion.BRepBodyDefinition.create()
+    for loop, height in zip(loops, heights):
+        shellDef = bodyDef.lumpDefinitions.add().shellDefinitions.add()
+
+        bottom = [bodyDef.createVertexDefinition(point(*s.start, 0)) for s in loop]
+        top = [bodyDef.createVertexDefinition(point(*s.start, height)) for s in loop]
+        count = len(loop)
+
+        def curve(segment: Segment, z: float):
+            if segment.centre is None:
+                return adsk.core.Line3D.create(point(*segment.start, z), point(*segment.end, z))
+            centre = point(*segment.centre, z)
+            reference = vector(segment.start[0] - segment.centre[0], segment.start[1] - segment.centre[1], 0)
+            radius = reference.length
+            reference.normalize()
+            return adsk.core.Arc3D.createByCenter(centre, zAxis, reference, radius, 0, _sweep(segment))
+
+        bottomEdges = [
+            bodyDef.createEdgeDefinitionByCurve(bottom[i], bottom[(i + 1) % count], curve(s, 0))
+            for i, s in enumerate(loop)
+        ]
+        topEdges = [
+            bodyDef.createEdgeDefinitionByCurve(top[i], top[(i + 1) % count], curve(s, height))
+            for i, s in enumerate(loop)
+        ]
+        uprights = [
+            bodyDef.createEdgeDefinitionByCurve(
+                bottom[i], top[i], adsk.core.Line3D.create(point(*s.start, 0), point(*s.start, height))
+            )
+            for i, s in enumerate(loop)
+        ]
+
+        # caps - the bottom faces down, so its loop runs backwards
+        bottomFace = shellDef.faceDefinitions.add(adsk.core.Plane.create(point(0, 0, 0), vector(0, 0, -1)), False)
+        coEdges = bottomFace.loopDefinitions.add().bRepCoEdgeDefinitions
+        for edge in reversed(bottomEdges):
+            coEdges.add(edge, True)
+
+        topFace = shellDef.faceDefinitions.add(adsk.core.Plane.create(point(0, 0, height), zAxis), False)
+        coEdges = topFace.loopDefinitions.add().bRepCoEdgeDefinitions
+        for edge in topEdges:
+            coEdges.add(edge, False)
+
+        # sides - outward is to the right of a counter clockwise segment
+        for i, s in enumerate(loop):
+            if s.centre is None:
+                dx, dy = s.end[0] - s.start[0], s.end[1] - s.start[1]
+                surface = adsk.core.Plane.create(point(*s.start, 0), vector(dy, -dx, 0))
+            else:
+                surface = adsk.core.Cylinder.create(point(*s.centre, 0), zAxis, math.dist(s.start, s.centre))
+            coEdges = shellDef.faceDefinitions.add(surface, False).loopDefinitions.add().bRepCoEdgeDefinitions
+            coEdges.add(bottomEdges[i], False)
+            coEdges.add(uprights[(i + 1) % count], False)
+            coEdges.add(topEdges[i], True)
+            coEdges.add(uprights[i], True)
+
+    body = bodyDef.createBody()
+    if not body:
+        logger.error(f"profile extrusion failed: {bodyDef.outcomeInfo}")
+    return body
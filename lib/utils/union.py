@@ -0,0 +1,247 @@
+"""Spatially balanced union of dogbone tool bodies
+
+Folding every tool body into one growing body makes each boolean work against everything unioned so far - quadratic overall.
+Here the tool bodies are split at the median of their widest axis, recursively, and the halves unioned back up,
+so every boolean joins 2 neighbouring groups of similar size and the reduction is log n deep.
+
+Median splits move whenever the set of bodies changes, so UnionTree keeps its partial unions on a fixed grid instead -
+between previews, adding or removing one body only redoes the booleans on its path to the root.
+"""
+import heapq
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import adsk.fusion
+
+from .geometry import Vec, TOLERANCE
+from ...constants import SINGLE_TOOL_BODY, SEPARATE_TOOL_BODIES
+
+SEPARATE_MAX_BODIES = 8  # up to this many, every tool body goes to the combine as it is - no temporary booleans at all
+MORTON_OFFSET = 1 << 20  # grid cells are offset by this, so codes of cells either side of the origin stay positive
+CLUSTER_SIZE = 16  # otherwise tool bodies are pre-unioned in clusters of about this size
+OVERLAP_LIMIT = 0.25  # unless more than this fraction overlap a neighbour - then it's all unioned into one body
+
+logger = logging.getLogger("dogbone.union")
+
+
+def medianSplit(indices: List[int], centres: Sequence[Vec]):
+    """
+    splits indices in 2 at the median of the widest axis of their centres
+    returns (lower half, upper half)
+    """
+    axis = max(
+        range(3),
+        key=lambda a: max(centres[i][a] for i in indices) - min(centres[i][a] for i in indices),
+    )
+    ordered = sorted(indices, key=lambda i: centres[i][axis])
+    middle = len(ordered) // 2
+    return ordered[:middle], ordered[middle:]
+
+
+def spatialClusters(centres: Sequence[Vec], count: int) -> List[List[int]]:
+    """
+    splits the centres (by index) into exactly min(count, len(centres)) groups of neighbouring items - at least 1
+    the largest group is split until there are enough
+    """
+    if not centres:
+        return []
+    heap = [(-len(centres), 0, list(range(len(centres))))]
+    tieBreak = 1
+    while len(heap) < count and -heap[0][0] > 1:
+        _, _, indices = heapq.heappop(heap)
+        for half in medianSplit(indices, centres):
+            heapq.heappush(heap, (-len(half), tieBreak, half))
+            tieBreak += 1
+    return [indices for _, _, indices in sorted(heap, key=lambda item: item[1])]
+
+
+def overlapRatio(centres: Sequence[Vec], distance: float) -> float:
+    """
+    fraction of centres that have another centre closer than distance - ie tool bodies of that diameter overlap
+    hashed into a grid of distance sized cells, so it stays linear
+    """
+    if len(centres) < 2 or distance <= 0:
+        return 0.0
+    cells = defaultdict(list)
+    for i, centre in enumerate(centres):
+        cells[tuple(math.floor(c / distance) for c in centre)].append(i)
+
+    limit = distance * distance
+    overlapping = 0
+    for i, centre in enumerate(centres):
+        cx, cy, cz = (math.floor(c / distance) for c in centre)
+        if any(
+            j != i and sum((a - b) ** 2 for a, b in zip(centre, centres[j])) < limit
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            for dz in (-1, 0, 1)
+            for j in cells.get((cx + dx, cy + dy, cz + dz), ())
+        ):
+            overlapping += 1
+    return overlapping / len(centres)
+
+
+def getToolBodyCount(mode: str, centres: Sequence[Vec], toolDia: float) -> int:
+    """
+    number of bodies the tool bodies should be merged into before the combine cut
+    Single body - everything unioned, the combine cuts once
+    Separate bodies - no temporary booleans, the combine cuts with every tool body
+    Auto - separate while there are only a few, one body if they overlap a lot (the combine would have to resolve
+        every tool/tool intersection on each recompute), else clusters so unions stay local and the combine gets n/CLUSTER_SIZE bodies
+    """
+    count = len(centres)
+    if mode == SINGLE_TOOL_BODY:
+        return 1
+    if mode == SEPARATE_TOOL_BODIES or count <= SEPARATE_MAX_BODIES:
+        return count
+    if overlapRatio(centres, toolDia) > OVERLAP_LIMIT:
+        return 1
+    return math.ceil(count / CLUSTER_SIZE)
+
+
+def mergeToolBodies(
+    bodies: Sequence[adsk.fusion.BRepBody], centres: Sequence[Vec], count: int
+) -> List[adsk.fusion.BRepBody]:
+    """
+    unions the tool bodies into count spatially compact bodies (fewer if there aren't enough bodies)
+    """
+    return [
+        balancedUnion([bodies[i] for i in group], [centres[i] for i in group])
+        for group in spatialClusters(centres, count)
+    ]
+
+
+def balancedUnion(bodies: Sequence[adsk.fusion.BRepBody], centres: Sequence[Vec]) -> Optional[adsk.fusion.BRepBody]:
+    """
+    unions temporary bodies - centres are a representative point of each body (eg the dogbone centre)
+    the bodies are consumed, the result is one of them - None if there are no bodies
+    """
+    if not bodies:
+        return None
+    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+
+    def reduce(indices: List[int]) -> adsk.fusion.BRepBody:
+        if len(indices) == 1:
+            return bodies[indices[0]]
+        lower, upper = medianSplit(indices, centres)
+        target = reduce(lower)
+        tempBrepMgr.booleanOperation(target, reduce(upper), adsk.fusion.BooleanTypes.UnionBooleanType)
+        return target
+
+    logger.debug(f"balanced union of {len(bodies)} bodies")
+    return reduce(list(range(len(bodies))))
+
+
+def _spread(value: int) -> int:
+    """the low 21 bits of value, moved to every third bit"""
+    value &= 0x1FFFFF
+    value = (value | value << 32) & 0x1F00000000FFFF
+    value = (value | value << 16) & 0x1F0000FF0000FF
+    value = (value | value << 8) & 0x100F00F00F00F00F
+    value = (value | value << 4) & 0x10C30C30C30C30C3
+    value = (value | value << 2) & 0x1249249249249249
+    return value
+
+
+def mortonCode(centre: Vec, cellSize: float) -> int:
+    """z-order code of the grid cell holding centre - cells sharing a code prefix are neighbours"""
+    x, y, z = (math.floor(c / cellSize) + MORTON_OFFSET for c in centre)
+    return _spread(x) | _spread(y) << 1 | _spread(z) << 2
+
+
+class _Node:
+    __slots__ = ("members", "body", "children")
+
+    def __init__(self, members: frozenset, body: adsk.fusion.BRepBody, children: List["_Node"]) -> None:
+        self.members = members
+        self.body = body
+        self.children = children
+
+
+class UnionTree:
+    """
+    Partial unions of tool bodies, kept from one call to the next
+    bodies are leaves of a binary tree over the z-order codes of their grid cells - the tree only depends on where
+    the bodies are, so a body added or removed changes nothing but the nodes on its path to the root.
+    Nodes with the same members as last time are reused; only those on changed paths are unioned again
+    """
+
+    def __init__(self, cellSize: float) -> None:
+        self.cellSize = max(cellSize, TOLERANCE)
+        self.booleans = 0  # union booleans done by the last call
+        self._nodes: Dict[Tuple[int, int], Tuple[frozenset, adsk.fusion.BRepBody]] = {}  # key (level, code)
+
+    def union(
+        self,
+        keys: Sequence[Optional[Hashable]],
+        bodies: Sequence[adsk.fusion.BRepBody],
+        centres: Sequence[Vec],
+        count: int = 1,
+    ) -> List[adsk.fusion.BRepBody]:
+        """
+        unions the bodies into count spatially compact bodies (fewer if there aren't enough bodies)
+        keys identify the bodies between calls - a body with key None is always new.
+        The bodies are consumed, the results belong to the tree and must not be modified
+        """
+        if not bodies:
+            self._nodes = {}
+            return []
+        tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+        self.booleans = 0
+        nodes = {}
+
+        def node(nodeId: Tuple[int, int], members: frozenset, children: List[_Node], make) -> _Node:
+            cached = self._nodes.get(nodeId)
+            body = cached[1] if cached and cached[0] == members else make()
+            nodes[nodeId] = (members, body)
+            return _Node(members, body, children)
+
+        def unionInto(target: adsk.fusion.BRepBody, tools) -> adsk.fusion.BRepBody:
+            for tool in tools:
+                tempBrepMgr.booleanOperation(target, tool, adsk.fusion.BooleanTypes.UnionBooleanType)
+                self.booleans += 1
+            return target
+
+        cells = defaultdict(list)
+        for i, centre in enumerate(centres):
+            cells[mortonCode(centre, self.cellSize)].append(i)
+        level = {
+            code: node(
+                (0, code),
+                frozenset(object() if keys[i] is None else keys[i] for i in indices),
+                [],
+                lambda indices=indices: unionInto(bodies[indices[0]], [bodies[i] for i in indices[1:]]),
+            )
+            for code, indices in cells.items()
+        }
+
+        depth = 0
+        while len(level) > 1:
+            depth += 1
+            parents = defaultdict(list)
+            for code, child in level.items():
+                parents[code >> 1].append(child)
+            level = {
+                code: children[0] if len(children) == 1 else node(  #a lone child just moves up a level
+                    (depth, code),
+                    children[0].members | children[1].members,
+                    children,
+                    lambda children=children: unionInto(tempBrepMgr.copy(children[0].body), [children[1].body]),
+                )
+                for code, children in parents.items()
+            }
+        self._nodes = nodes  #nodes off the current tree are dropped
+
+        # the largest node is split until there are enough
+        root = next(iter(level.values()))
+        heap = [(-len(root.members), 0, root)]
+        tieBreak = 1
+        while len(heap) < count and heap[0][2].children:
+            _, _, largest = heapq.heappop(heap)
+            for child in largest.children:
+                heapq.heappush(heap, (-len(child.members), tieBreak, child))
+                tieBreak += 1
+        logger.debug(f"union tree of {len(bodies)} bodies: {self.booleans} booleans, {len(heap)} bodies")
+        return [item[2].body for item in sorted(heap, key=lambda item: item[1])]
@@ -0,0 +1,61 @@
+"""Tests run the add-in on the headless adsk stand-in - see headless/__init__.py"""
+import os
+import sys
+from dataclasses import fields
+
+import pytest
+
+_addinPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _addinPath not in sys.path:
+    sys.path.insert(0, _addinPath)
+
+from headless import load  # noqa: E402 - puts the stand-in adsk package on sys.path first
+
+import adsk.core  # noqa: E402
+import adsk.fusion  # noqa: E402
+
+classes = load("lib.classes")
+utils = load("lib.utils")
+constants = load("constants")
+createMain = load("commands.createCommand.main")
+createEntry = load("commands.createCommand.entry")
+refreshMain = load("commands.refreshCommand.main")
+
+
+def makeParams(**overrides) -> "classes.DbParams":
+    """dialog defaults - ignoring any saved defaults.dat - with overrides"""
+    params = classes.DbParams()
+    for dataclassField in fields(classes.DbParams):
+        setattr(params, dataclassField.name, dataclassField.default)
+    for name, value in overrides.items():
+        setattr(params, name, value)
+    return params
+
+
+def rounded(values, digits: int = 6) -> tuple:
+    return tuple(round(value, digits) + 0.0 for value in values)  #+ 0.0 folds -0.0 into 0.0
+
+
+def primitiveKey(primitive: dict) -> tuple:
+    """a cut primitive as comparable values - positions rounded"""
+    return tuple(
+        sorted(
+            (key, rounded(value) if isinstance(value, tuple) else round(value, 6) if isinstance(value, float) else value)
+            for key, value in primitive.items()
+        )
+    )
+
+
+def cutGeometry(bodies) -> dict:
+    """per body name, the sorted primitives of every tool body cut from it - what the dogbones did to the part"""
+    return {
+        body.name: sorted(sorted(primitiveKey(p) for p in cut) for cut in body._bodyData.cuts)
+        for body in bodies
+    }
+
+
+@pytest.fixture(autouse=True)
+def freshStats():
+    adsk.fusion.TemporaryBRepManager.get().resetStats()
+    adsk.core.Application.get().userInterface.messages.clear()
+    yield
@@ -0,0 +1,76 @@
+"""The batch corner classification kernel against the per-edge checks DbFace.registerEdges used to make"""
+from math import pi
+
+import pytest
+
+import adsk.core
+
+from conftest import constants, utils, makeParams
+from benchmarks.generators import GENERATORS
+from benchmarks.pipeline import selectFaces
+
+DB_TYPES = (constants.NORMAL_DOGBONE, constants.MINIMAL_DOGBONE, constants.MORTISE_DOGBONE)
+ANGLE_SETTINGS = (  #(acuteAngle, obtuseAngle, minAngleLimit, maxAngleLimit) - the angled parts have 60 and 120 degree corners
+    (False, False, 89.0, 91.0),
+    (True, False, 50.0, 91.0),
+    (True, False, 89.0, 91.0),
+    (False, True, 89.0, 130.0),
+    (False, True, 89.0, 110.0),
+    (True, True, 50.0, 130.0),
+    (True, True, 70.0, 110.0),
+)
+
+
+def legacyCornerEdges(face: adsk.fusion.BRepFace, params) -> set:
+    """tempIds of the corner edges of face the per-edge checks accept - getEdgeVector, getAngleBetweenFaces and the angle limits"""
+    faceNormal = utils.getFaceNormal(face)
+    faceEdges = {edge.tempId for edge in face.edges}
+    candidates = {edge.tempId: edge for vertex in face.vertices for edge in vertex.edges if edge.tempId not in faceEdges}
+    accepted = set()
+    for edge in candidates.values():
+        if not edge.isValid or edge.isDegenerate:
+            continue
+        if edge.geometry.curveType != adsk.core.Curve3DTypes.Line3DCurveType:
+            continue
+        vector = utils.getEdgeVector(edge, refFace=face)
+        vector.normalize()
+        if not vector.isParallelTo(faceNormal) or vector.isEqualTo(faceNormal):
+            continue
+        face1, face2 = edge.faces
+        if face1.geometry.objectType != adsk.core.Plane.classType() or face2.geometry.objectType != adsk.core.Plane.classType():
+            continue
+        angle = round(utils.getAngleBetweenFaces(edge) * 180 / pi, 3)
+        if abs(angle - 90) > 0.001 and not (params.acuteAngle or params.obtuseAngle):
+            continue
+        if not (params.minAngleLimit < angle <= 90) and params.acuteAngle and not params.obtuseAngle:
+            continue
+        if not (90 <= angle < params.maxAngleLimit) and not params.acuteAngle and params.obtuseAngle:
+            continue
+        if not (params.minAngleLimit < angle < params.maxAngleLimit) and params.acuteAngle and params.obtuseAngle:
+            continue
+        accepted.add(edge.tempId)
+    return accepted
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+def test_kernel_accepts_the_same_edges_as_the_per_edge_checks(generator):
+    accepted = {}
+    for dbType in DB_TYPES:
+        for acuteAngle, obtuseAngle, minAngleLimit, maxAngleLimit in ANGLE_SETTINGS:
+            case = GENERATORS[generator](24)
+            params = makeParams(**{
+                **case.params,
+                "dbType": dbType,
+                "acuteAngle": acuteAngle,
+                "obtuseAngle": obtuseAngle,
+                "minAngleLimit": minAngleLimit,
+                "maxAngleLimit": maxAngleLimit,
+            })
+            selection = selectFaces(case, params)
+            for faceObj in selection.selectedFaces.values():
+                registered = {edgeObj.native.tempId for edgeObj in faceObj._associatedEdgesDict.values()}
+                assert registered == legacyCornerEdges(faceObj.native, params)
+                accepted[params.acuteAngle, params.obtuseAngle, params.minAngleLimit, params.maxAngleLimit] = len(registered)
+    assert max(accepted.values()) > 0
+    if generator == "angled":
+        assert len(set(accepted.values())) > 2  #90 degrees only, either kind of corner, both
@@ -0,0 +1,191 @@
+"""The whole create and refresh pipeline on the benchmark parts - the options that only change how the work is
+organised must leave the cut itself as it was"""
+import json
+from dataclasses import replace
+
+import pytest
+
+import adsk.core
+
+from conftest import classes, constants, utils, createMain, refreshMain, makeParams, primitiveKey
+from benchmarks.generators import GENERATORS
+from benchmarks.pipeline import runCase, selectFaces
+
+EDGES = 24
+
+
+def createDogbones(generator: str, **overrides):
+    """builds the part, selects its faces and cuts the dogbones - returns the case and its selection"""
+    case = GENERATORS[generator](EDGES)
+    params = makeParams(**{**case.params, **overrides})
+    selection = selectFaces(case, params)
+    createMain.createStaticDogbones(params, selection)
+    return case, selection
+
+
+def targetBodies(case):
+    return {face.body.nativeObject or face.body for face in case.faces}
+
+
+def toolBodyGeometry(baseFeature) -> list:
+    return sorted(primitiveKey(primitive) for body in baseFeature.sourceBodies for primitive in body._bodyData.primitives)
+
+
+def toolPrimitives(case) -> list:
+    """every primitive cut from the part, however the tool bodies were grouped"""
+    return sorted(
+        primitiveKey(primitive)
+        for body in targetBodies(case)
+        for cut in body._bodyData.cuts
+        for primitive in cut
+    )
+
+
+@pytest.mark.parametrize("generator", list(GENERATORS))
+def test_generator_runs_clean(generator):
+    result = runCase(GENERATORS[generator](EDGES))
+    assert result.errors == []
+    assert result.edges > 0
+    assert result.stats["createStaticDogbones"]["cuts"] > 0
+
+
+@pytest.mark.parametrize("generator", ["pockets", "angled", "stacked"])
+def test_tool_body_modes_cut_the_same(generator):
+    cuts = {}
+    for mode in (constants.SINGLE_TOOL_BODY, constants.SEPARATE_TOOL_BODIES, constants.AUTO_TOOL_BODIES):
+        case, _ = createDogbones(generator, toolBodyMode=mode)
+        cuts[mode] = toolPrimitives(case)
+    assert cuts[constants.SINGLE_TOOL_BODY]
+    assert cuts[constants.SINGLE_TOOL_BODY] == cuts[constants.SEPARATE_TOOL_BODIES] == cuts[constants.AUTO_TOOL_BODIES]
+
+
+@pytest.mark.parametrize("fromTop", [False, True])
+def test_tool_body_mode_sets_the_bodies_cut(fromTop):
+    counts = {}
+    for mode in (constants.SINGLE_TOOL_BODY, constants.SEPARATE_TOOL_BODIES, constants.AUTO_TOOL_BODIES):
+        case, selection = createDogbones("stepped", toolBodyMode=mode, fromTop=fromTop, toolBackend=constants.CYLINDER_BACKEND)
+        design = adsk.core.Application.get().activeProduct
+        baseFeatures = [attribute.parent for attribute in design.findAttributes(constants.DB_GROUP, "re:basefeature:.*")]
+        counts[mode] = sum(len(list(baseFeature.sourceBodies)) for baseFeature in baseFeatures)
+    dogbones = sum(len(faceObj.selectedEdges) for faceObj in selection.selectedFaces.values())
+    assert counts[constants.SINGLE_TOOL_BODY] == 1
+    assert counts[constants.SEPARATE_TOOL_BODIES] == dogbones  #one cylinder per dogbone, none unioned
+    assert 1 < counts[constants.AUTO_TOOL_BODIES] < dogbones  #clustered - neither extreme
+
+
+def componentSpecs(generator: str):
+    """(tool specs, start faces) of every component group of the part"""
+    case = GENERATORS[generator](EDGES)
+    params = makeParams(**case.params)
+    selection = selectFaces(case, params)
+    for occurrenceFaces, _ in selection.componentGroups():
+        topFaces = classes.groupTopFaces(occurrenceFaces, params.fromTop)
+        yield classes.occurrenceToolSpecs(occurrenceFaces, topFaces), classes.startFaces(occurrenceFaces, topFaces)
+
+
+@pytest.mark.parametrize("generator, holes", [
+    ("pockets", True),
+    ("stepped", True),
+    ("instances", True),
+    ("angled", False),  #acute corners need the clearance box
+    ("stacked", False),  #From Top Face - dogbones don't start on a face a hole can be drilled from
+])
+def test_auto_chooses_the_backend_by_face_group(generator, holes):
+    for specs, faces in componentSpecs(generator):
+        few = specs[:classes.BATCH_MIN_GROUP - 1]
+        assert classes.chooseBackend(constants.AUTO_BACKEND, specs, faces).name == constants.EXTRUSION_BACKEND
+        assert classes.chooseBackend(constants.AUTO_BACKEND, few, faces).name == constants.CYLINDER_BACKEND  #too few to batch
+        hole = constants.HOLE_BACKEND if holes else constants.EXTRUSION_BACKEND  #only when asked for, and able to
+        assert classes.chooseBackend(constants.HOLE_BACKEND, specs, faces).name == hole
+        assert classes.chooseBackend(constants.HOLE_BACKEND, specs, faces, toolBodiesOnly=True).name == constants.EXTRUSION_BACKEND
+
+
+def shifted(spec, heights: float, **changes):
+    """spec moved along its centre line by heights times its height"""
+    offset = utils.vecScale(spec.zAxis, spec.height * heights)
+    return replace(spec, start=utils.vecAdd(spec.start, offset), end=utils.vecAdd(spec.end, offset), **changes)
+
+
+def test_coaxial_dogbones_merge_when_their_depths_touch():
+    specs, _ = next(componentSpecs("pockets"))
+    merge = classes.mergeCoaxial
+    assert len(merge(specs)) == len(specs)  #no two corners share a centre line
+    assert len(merge(specs + specs)) == len(specs)  #the same edge through 2 faces
+    stacked = merge(specs + [shifted(spec, 1, edgeId=-spec.edgeId) for spec in specs])
+    assert len(stacked) == len(specs)  #one above the other, touching
+    assert {round(spec.height, 6) for spec in stacked} == {round(2 * specs[0].height, 6)}
+    assert len(merge(specs + [shifted(spec, 2, edgeId=-spec.edgeId) for spec in specs])) == 2 * len(specs)  #a gap between
+    wider = [shifted(spec, 1, edgeId=-spec.edgeId, radius=2 * spec.radius) for spec in specs]
+    assert len(merge(specs + wider)) == 2 * len(specs)  #a different tool
+
+
+@pytest.mark.parametrize("generator", ["multiBody", "instances"])
+def test_timeline_outputs_cut_the_same(generator):
+    perComponent, _ = createDogbones(generator, timelineOutput=constants.PER_COMPONENT_OUTPUT)
+    consolidated, _ = createDogbones(generator, timelineOutput=constants.CONSOLIDATED_OUTPUT)
+    assert toolPrimitives(perComponent)
+    assert toolPrimitives(perComponent) == toolPrimitives(consolidated)
+
+
+def test_deferred_compute_cuts_the_same_with_one_recompute():
+    immediate, _ = createDogbones("stepped")
+    deferred, _ = createDogbones("stepped", deferCompute=True)
+    design = adsk.core.Application.get().activeProduct  #the deferred run's design
+    assert toolPrimitives(immediate) == toolPrimitives(deferred)
+    assert design.recomputeCount == 1
+
+
+@pytest.mark.parametrize("generator", ["pockets", "stepped", "multiBody"])
+def test_refresh_rebuilds_the_same_tool_bodies(generator):
+    createDogbones(generator)
+    design = adsk.core.Application.get().activeProduct
+    baseFeatures = [attribute.parent for attribute in design.findAttributes(constants.DB_GROUP, "re:basefeature:.*")]
+    before = [toolBodyGeometry(baseFeature) for baseFeature in baseFeatures]
+    assert before and all(before)
+    refreshMain.updateDogBones()
+    assert [toolBodyGeometry(baseFeature) for baseFeature in baseFeatures] == before
+
+
+def occurrenceSelection(deselected):
+    """the shelf placed twice - deselected[i] native edge indexes, in edge order, deselected in occurrence i"""
+    case = GENERATORS["instances"](8, copies=2)
+    params = makeParams(toolBackend=constants.CYLINDER_BACKEND)  #a cylinder per dogbone
+    selection = selectFaces(case, params)
+    for faceObj, indexes in zip(selection.selectedFaces.values(), deselected):
+        edges = sorted(faceObj.selectedEdges, key=lambda edgeObj: edgeObj.nativeEdgeId)
+        [edges[index].deselect() for index in indexes]
+    return case, params, selection
+
+
+def test_occurrences_cut_edges_selected_in_any_of_them():
+    expected, params, selection = occurrenceSelection([[], []])
+    createMain.createStaticDogbones(params, selection)
+    case, params, selection = occurrenceSelection([[0, 1], [2]])
+    createMain.createStaticDogbones(params, selection)
+    assert len(toolPrimitives(case)) == 4
+    assert toolPrimitives(case) == toolPrimitives(expected)
+    for faceObj in selection.selectedFaces.values():
+        for edgeObj in faceObj._associatedEdgesDict.values():
+            assert json.loads(edgeObj.edge.attributes.itemByName(constants.DB_GROUP, "params:").value)["selected"]
+
+
+def test_occurrences_skip_edges_deselected_in_all_of_them():
+    expected, params, selection = occurrenceSelection([[3], [3]])
+    assert len(selection.selectedFaces) == 2
+    assert all(len(faceObj.mergedSelectedEdges) == 3 for faceObj in selection.selectedFaces.values())
+    createMain.createStaticDogbones(params, selection)
+    full, params, selection = occurrenceSelection([[], []])
+    createMain.createStaticDogbones(params, selection)
+    assert len(toolPrimitives(expected)) == 3 and len(toolPrimitives(full)) == 4
+
+
+def test_tool_bodies_are_kept_only_for_copied_bodies():
+    for generator, kept in (("pockets", range(0, 1)), ("copies", range(1, 3))):  #nothing to share with - or at most maxSize kept
+        case = GENERATORS[generator](24)
+        params = makeParams(**case.params)
+        selection = selectFaces(case, params)
+        selection.toolBodyCache.maxSize = 2
+        for mode in (constants.SINGLE_TOOL_BODY, constants.SEPARATE_TOOL_BODIES, constants.AUTO_TOOL_BODIES):
+            params.toolBodyMode = mode  #a new layout per run
+            createMain.createStaticDogbones(params, selection)
+            assert len(selection.toolBodyCache._layouts) in kept
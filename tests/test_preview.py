@@ -0,0 +1,171 @@
+"""The dialog on the headless stand-in - a full cut preview, rolled back by Fusion, must not replace execute"""
+import math
+
+import adsk.core
+import adsk.fusion
+
+from conftest import classes, constants, createEntry, createMain, makeParams
+from benchmarks.generators import GENERATORS
+from benchmarks.pipeline import selectFaces
+from test_pipeline import EDGES, createDogbones, toolPrimitives
+
+CYLINDERS = {"toolBackend": constants.CYLINDER_BACKEND}  #tool bodies built and unioned with booleans
+
+
+def openDialog(generator: str, **overrides):
+    """builds the part and clicks its faces in a new dialog - returns the case, command and DogboneUi"""
+    case = GENERATORS[generator](EDGES)
+    params = makeParams(**{**case.params, **overrides})
+    command = adsk.core.Command()
+    ui = classes.DogboneUi(params, command, createEntry.createDogbones)
+    faceInput = command.commandInputs.itemById(constants.FACE_SELECT)
+    for face in case.faces:
+        faceInput.addSelection(face)
+        command.changeInput(faceInput)
+    return case, command, ui
+
+
+def test_execute_runs_after_a_cut_preview():
+    case, command, ui = openDialog("pockets")
+    command.doExecutePreview()
+    assert ui.previewDetail.level == 0  #the full cut
+    executed = []
+    executeHandler = ui.executeHandler
+    ui.executeHandler = lambda params, selection: executed.append(executeHandler(params, selection))
+    command.doExecute()
+    assert len(executed) == 1
+    assert not adsk.core.Application.get().userInterface.messages
+    expected, _ = createDogbones("pockets")
+    assert toolPrimitives(case) == toolPrimitives(expected)  #the preview's cut was rolled back, not kept twice
+
+
+def test_execute_reuses_the_cut_preview():
+    case, command, ui = openDialog("pockets", **CYLINDERS)
+    stats = adsk.fusion.TemporaryBRepManager.get().stats  #a new design starts new stats
+    command.doExecutePreview()
+    stats["booleans"] = 0
+    command.doExecute()
+    assert stats["booleans"] == 0  #tool bodies and unions taken from the preview
+    expected, _ = createDogbones("pockets", **CYLINDERS)
+    assert toolPrimitives(case) == toolPrimitives(expected)
+
+
+def test_execute_rebuilds_after_a_change_since_the_preview():
+    case, command, ui = openDialog("pockets", **CYLINDERS)
+    stats = adsk.fusion.TemporaryBRepManager.get().stats  #a new design starts new stats
+    command.doExecutePreview()
+    ui.param.toolDiaStr = "0.5 in"
+    stats["booleans"] = 0
+    command.doExecute()
+    assert stats["booleans"] > 0
+    expected, _ = createDogbones("pockets", toolDiaStr="0.5 in", **CYLINDERS)
+    assert toolPrimitives(case) == toolPrimitives(expected)
+
+
+def test_preview_releases_every_tool_body_it_hands_out():
+    case = GENERATORS["pockets"](EDGES)
+    for mode in (constants.SEPARATE_TOOL_BODIES, constants.SINGLE_TOOL_BODY):  #handed to the combine as they are, and merged
+        params = makeParams(toolBodyMode=mode, **CYLINDERS)
+        selection = selectFaces(case, params)
+        with selection.preview(params):
+            createMain.createStaticDogbones(params, selection)
+            assert selection.previewCache.misses
+            assert not selection.previewCache._instanceKeys
+
+
+def clickEdge(command, edgeObj):
+    """deselects a selected edge the way a click in the dialog does"""
+    edgeInput = command.commandInputs.itemById(constants.EDGE_SELECT)
+    index = next(i for i in range(edgeInput.selectionCount) if edgeInput.selection(i).entity.entityToken == edgeObj.entityToken)
+    edgeInput.removeSelection(index)
+    command.changeInput(edgeInput)
+
+
+def toggleInput(command, inputId: str):
+    boolInput = command.commandInputs.itemById(inputId)
+    boolInput.value = not boolInput.value
+    command.changeInput(boolInput)
+
+
+def test_detection_mode_change_registers_only_the_difference():
+    case, command, ui = openDialog("angled")  #60 and 120 degree corners, both accepted
+    edgeInput = command.commandInputs.itemById(constants.EDGE_SELECT)
+    acute = [edgeObj for edgeObj in ui.selection.selectedEdges.values() if edgeObj.cornerAngle < math.pi / 2]
+    assert len(ui.selection.selectedEdges) == edgeInput.selectionCount == 24 and acute
+    clickEdge(command, acute[0])
+    assert edgeInput.selectionCount == 23
+
+    toggleInput(command, constants.OBTUSE_ANGLE)
+    assert len(ui.selection.selectedEdges) == 12 and edgeInput.selectionCount == 11
+    toggleInput(command, constants.OBTUSE_ANGLE)
+    assert len(ui.selection.selectedEdges) == 24 and edgeInput.selectionCount == 23
+    assert not acute[0].isSelected  #the user's deselection is kept
+    assert sum(edgeObj.isSelected for edgeObj in ui.selection.selectedEdges.values()) == 23
+
+
+def test_deselecting_edges_in_a_row_focuses_each_clicked_edge():
+    case, command, ui = openDialog("pockets")
+    first, second = list(ui.selection.selectedEdges.values())[:2]
+    clickEdge(command, first)
+    assert ui.selection.focus is first.dogboneCentre
+    clickEdge(command, second)
+    assert ui.selection.focus is second.dogboneCentre  #not the edge deselected before
+    assert not first.isSelected and not second.isSelected
+    assert sum(edgeObj.isSelected for edgeObj in ui.selection.selectedEdges.values()) == len(ui.selection.selectedEdges) - 2
+
+
+def timelineTypes() -> list:
+    timeline = adsk.core.Application.get().activeProduct.timeline
+    return [timeline.item(i).entity.objectType for i in range(timeline.count)]
+
+
+def test_benchmark_runs_only_on_execute():
+    _, command, _ = openDialog("pockets")
+    command.doExecutePreview()
+    expected = timelineTypes()
+    _, command, ui = openDialog("pockets", benchmark=True)
+    stats = adsk.fusion.TemporaryBRepManager.get().stats  #a new design starts new stats
+    command.doExecutePreview()
+    assert ui.previewDetail.level == 0  #the full cut
+    assert timelineTypes() == expected  #no backend comparison while previewing
+    assert stats["holeFeatures"] == 0
+    assert not adsk.core.Application.get().userInterface.messages
+    command.doExecute()
+    assert stats["holeFeatures"] > 0
+    assert adsk.core.Application.get().userInterface.messages
+
+
+def test_closing_the_dialog_releases_both_caches():
+    _, command, ui = openDialog("pockets", **CYLINDERS)
+    command.doExecutePreview()
+    cache = ui.selection.previewCache
+    assert cache._specs and cache._bodies and ui.selection.toolBodyCache._templates
+    command.doExecute()  #then destroy
+    assert not (cache._specs or cache._bodies or cache._trees)
+    assert not ui.selection.toolBodyCache._templates
+
+
+def test_keys_leave_the_preview_as_it_is():
+    case, command, ui = openDialog("pockets", **CYLINDERS)
+    stats = adsk.fusion.TemporaryBRepManager.get().stats  #a new design starts new stats
+    command.doExecutePreview()
+    previewed = ui.previewedState
+    stats["booleans"] = 0
+    command.pressKey(adsk.core.KeyCodes.ShiftKeyCode)
+    assert ui.previewActive and ui.previewedState == previewed  #not a ctrl key - nothing previewed again
+    command.pressKey(adsk.core.KeyCodes.ControlKeyCode)  #hidden while held, then back
+    assert ui.previewActive and not ui.previewDirty
+    assert ui.previewedState == previewed
+    assert stats["booleans"] == 0  #the same cut, from the preview cache
+    expected, _ = createDogbones("pockets", **CYLINDERS)
+    assert toolPrimitives(case) == toolPrimitives(expected)
+
+
+def test_only_preview_inputs_mark_the_preview_dirty():
+    _, command, ui = openDialog("pockets")
+    command.doExecutePreview()
+    assert not ui.previewDirty
+    toggleInput(command, constants.BENCHMARK)
+    assert not ui.previewDirty
+    toggleInput(command, constants.PREVIEW_ENABLE)
+    assert ui.previewDirty
@@ -0,0 +1,133 @@
+"""Tool bodies - built as a keyhole profile or as cylinder and box, fresh or from a cached template, they cut the same"""
+import math
+import sys
+
+import pytest
+
+import adsk.fusion
+
+from conftest import classes, constants, utils, primitiveKey
+from test_pipeline import createDogbones, targetBodies
+
+TOLERANCE = 1e-6
+CYLINDERS = {"toolBackend": constants.CYLINDER_BACKEND}  #a canonical tool body per dogbone
+
+
+def inLoop(loop, point, steps: int = 180) -> bool:
+    """even-odd test against the loop, arcs split into short lines"""
+    outline = []
+    for segment in loop:
+        if segment.centre is None:
+            outline.append(segment.start)
+            continue
+        cx, cy = segment.centre
+        radius = math.dist(segment.start, segment.centre)
+        startAngle = math.atan2(segment.start[1] - cy, segment.start[0] - cx)
+        sweep = (math.atan2(segment.end[1] - cy, segment.end[0] - cx) - startAngle) % (2 * math.pi) or 2 * math.pi
+        count = max(2, int(steps * sweep / (2 * math.pi)))
+        outline += [
+            (cx + radius * math.cos(startAngle + sweep * i / count), cy + radius * math.sin(startAngle + sweep * i / count))
+            for i in range(count)
+        ]
+    inside = False
+    x, y = point
+    for (x0, y0), (x1, y1) in zip(outline, outline[1:] + outline[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def depth(primitive: dict, point) -> float:
+    """how far inside a cylinder or box primitive the point is - negative outside"""
+    if primitive["type"] == "cylinder":
+        start, end = primitive["pointOne"], primitive["pointTwo"]
+        axis = utils.vecSub(end, start)
+        length = utils.vecLength(axis)
+        along = utils.vecDot(utils.vecSub(point, start), axis) / length
+        radial = utils.vecLength(utils.vecSub(utils.vecSub(point, start), utils.vecScale(axis, along / length)))
+        return min(primitive["radiusOne"] - radial, along, length - along)
+    offset = utils.vecSub(point, primitive["pointCentre"])
+    return min(
+        utils.vecLength(vector) / 2 - abs(utils.vecDot(offset, vector)) / utils.vecLength(vector)
+        for vector in (primitive["vectorLength"], primitive["vectorWidth"], primitive["vectorHeight"])
+    )
+
+
+@pytest.mark.parametrize("boxLength", [0.1, 0.25, 0.3, 0.6, 1.5])  #slots shorter than, equal to and longer than the radius
+@pytest.mark.parametrize("degrees", [0, 35, 150, 270])
+def test_keyhole_profile_is_cylinder_and_box(boxLength, degrees):
+    radius = 0.3
+    bisector = (math.cos(math.radians(degrees)), math.sin(math.radians(degrees)))
+    loop = utils.keyholeProfile(radius, boxLength, bisector)
+    checked = 0
+    for i in range(-24, 25):
+        for j in range(-24, 25):
+            point = (i * (boxLength + radius) / 12, j * (boxLength + radius) / 12)
+            along = point[0] * bisector[0] + point[1] * bisector[1]
+            across = -point[0] * bisector[1] + point[1] * bisector[0]
+            circle = radius - math.hypot(*point)
+            box = min(along, boxLength - along, radius - abs(across))
+            if min(abs(circle), abs(box)) < 1e-3 or (circle < 0 and abs(box) < 1e-3):
+                continue  #too close to a boundary for the split arcs
+            assert inLoop(loop, point) == (circle > 0 or box > 0), point
+            checked += 1
+    assert checked > 1500
+
+
+def test_keyhole_dogbones_cut_where_cylinder_and_box_do(monkeypatch):
+    keyholeCase, _ = createDogbones("angled", **CYLINDERS)
+    monkeypatch.setattr(sys.modules[classes.canonicalToolBody.__module__], "extrudeProfiles", lambda loops, heights: None)
+    unionCase, _ = createDogbones("angled", **CYLINDERS)  #the cylinder and box union the keyhole replaced
+
+    keyholes = [p for body in targetBodies(keyholeCase) for cut in body._bodyData.cuts for p in cut]
+    unions = [p for body in targetBodies(unionCase) for cut in body._bodyData.cuts for p in cut]
+    definitions = [p for p in keyholes if p["type"] == "definition"]
+    boxes = [p for p in unions if p["type"] == "box"]
+    assert definitions and len(definitions) == len(boxes)  #one keyhole per acute corner
+    assert sorted(p["pointOne"] for p in keyholes if p["type"] == "cylinder") == sorted(
+        p["pointOne"] for p in unions if p["type"] == "cylinder" and not any(depth(box, p["pointOne"]) > -TOLERANCE for box in boxes)
+    )  #the square and obtuse corners are left as they were
+    for definition in definitions:
+        points = [value for key, value in definition.items() if key.startswith("point")]
+        for point in points:
+            assert abs(max(depth(primitive, point) for primitive in unions)) < TOLERANCE  #on the surface of the union
+
+
+def placedBody(spec):
+    """spec's tool body built from scratch and moved into place, without a template"""
+    body = spec.build()
+    adsk.fusion.TemporaryBRepManager.get().transform(body, spec.transform())
+    return body
+
+
+def bodyGeometry(body) -> list:
+    return sorted(primitiveKey(primitive) for primitive in body._bodyData.primitives)
+
+
+@pytest.mark.parametrize("generator", ["pockets", "angled", "stepped"])
+def test_template_instances_are_fresh_builds(generator):
+    _, selection = createDogbones(generator, **CYLINDERS)
+    faces = list(selection.selectedFaces.values())
+    specs = classes.occurrenceToolSpecs(faces, classes.groupTopFaces(faces, False))
+    cache = classes.ToolBodyCache()
+    tempBrepMgr = adsk.fusion.TemporaryBRepManager.get()
+    for spec in specs:
+        first = cache.instance(spec)
+        tempBrepMgr.booleanOperation(first, placedBody(specs[0]), adsk.fusion.BooleanTypes.UnionBooleanType)  #instances are free to change
+        assert bodyGeometry(cache.instance(spec)) == bodyGeometry(placedBody(spec))
+    assert cache.hits >= len(specs) and cache.misses < len(specs)  #every second instance at least came from a template
+
+
+def test_templates_are_dropped_least_recently_used_first():
+    built = []
+    cache = classes.ToolBodyCache(maxSize=2)
+    template = lambda key: cache.template(key, lambda: built.append(key) or object())
+    template("a"), template("b"), template("a")
+    template("c")  #b is the least recently used
+    assert len(cache) == 2 and built == ["a", "b", "c"]
+    template("a"), template("c")
+    assert built == ["a", "b", "c"]
+    template("b")
+    assert built == ["a", "b", "c", "b"] and (cache.hits, cache.misses) == (3, 4)
+    template("a")  #went out for b
+    assert built[-1] == "a"
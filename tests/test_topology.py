@@ -0,0 +1,39 @@
+"""Body topology snapshots - a copied body takes its corner classification from the body it's a copy of"""
+from conftest import classes
+from benchmarks.generators import GENERATORS
+
+
+def copiedTopologies():
+    """snapshots of two copy pasted plates, the first registered as a source"""
+    case = GENERATORS["copies"](8, count=2)
+    source, copy = (classes.BodyTopology(face.body.nativeObject or face.body) for face in case.faces)
+    signatures = {}
+    classes.matchSource(source, signatures)
+    return source, copy, signatures
+
+
+def test_copy_takes_its_source():
+    source, copy, signatures = copiedTopologies()
+    classes.matchSource(copy, signatures)
+    assert copy.source and copy.source[0] is source
+
+
+def test_same_vertices_differently_connected_is_not_a_copy():
+    source, copy, signatures = copiedTopologies()
+    copy.edgeVertices[0], copy.edgeVertices[1] = copy.edgeVertices[1], copy.edgeVertices[0]  #vertices where they were
+    classes.matchSource(copy, signatures)
+    assert copy.source is None
+
+
+def test_faces_in_another_order_are_not_a_copy():
+    source, copy, signatures = copiedTopologies()
+    copy.faceEdges[0], copy.faceEdges[1] = copy.faceEdges[1], copy.faceEdges[0]
+    classes.matchSource(copy, signatures)
+    assert copy.source is None
+
+
+def test_turned_face_normal_is_not_a_copy():
+    source, copy, signatures = copiedTopologies()
+    copy.faceNormals[0] = tuple(-c for c in copy.faceNormals[0])
+    classes.matchSource(copy, signatures)
+    assert copy.source is None